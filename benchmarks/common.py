@@ -0,0 +1,88 @@
+# benchmarks/common.py
+"""
+common.py — Deterministic inputs shared by the benchmarks: a model-free
+stand-in embedder, a synthetic text corpus and synthetic vectors.
+
+Everything is seeded, so two runs (or two releases) measure the same work.
+"""
+
+import time
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+
+class StandInEmbedder:
+    """
+    Feature-hashing embedder with HFEmbedder's interface (embed, embed_single,
+    embedding_dim) and no model to download.
+
+    Benchmarks that run through it measure ragkitpy's own overhead —
+    chunking, batching, indexing, search — not transformer encode time.
+
+    Args:
+        dim (int): Embedding dimension. Default: 384 (all-MiniLM-L6-v2)
+    """
+
+    def __init__(self, dim: int = 384):
+        self.embedding_dim = dim
+        self.model_name = "stand-in-hashing"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            hashes = np.array([zlib.crc32(word.encode("utf-8")) for word in text.lower().split()], dtype=np.int64)
+            signs = np.where(hashes & 1, 1.0, -1.0).astype(np.float32)
+            np.add.at(out[i], (hashes >> 1) % self.embedding_dim, signs)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+    def embed_single(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+def make_vocabulary(size: int = 5000, seed: int = 0) -> List[str]:
+    """Pseudo-words of 3-10 letters."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return ["".join(rng.choice(letters, rng.integers(3, 11))) for _ in range(size)]
+
+
+def make_text(n_words: int, vocabulary: List[str], seed: int = 0) -> str:
+    """Text with Zipf-distributed word frequencies and a sentence break every ~15 words."""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.2, n_words), len(vocabulary)) - 1
+    words = [vocabulary[r] for r in ranks.tolist()]
+    for i in range(14, n_words, 15):
+        words[i] += "."
+    return " ".join(words)
+
+
+def make_vectors(n: int, dim: int, n_clusters: int = 100, seed: int = 0) -> np.ndarray:
+    """Gaussian-mixture vectors, which have the cluster structure ANN indexes rely on."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n)
+    return centers[labels] + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """p50 / p95 / p99 / mean of a list of durations, in milliseconds."""
+    ms = np.asarray(seconds) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def best_of(repeats: int, func, *args) -> float:
+    """Fastest wall time of several calls, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
@@ -0,0 +1,55 @@
+# benchmarks/compare.py
+"""
+compare.py — Diff two benchmark reports written by run.py.
+
+Usage:
+    python benchmarks/compare.py old.json new.json [--threshold 10]
+
+Prints every numeric result side by side with its relative change, marking
+changes larger than the threshold (in percent).
+"""
+
+import argparse
+import json
+from typing import Any, Dict
+
+
+def flatten(tree: Any, prefix: str = "") -> Dict[str, float]:
+    """Map dotted paths to the numeric leaves of a report's "results"."""
+    if isinstance(tree, dict):
+        flat: Dict[str, float] = {}
+        for key, value in tree.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(tree, (int, float)) and not isinstance(tree, bool):
+        return {prefix: float(tree)}
+    return {}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two ragkitpy benchmark reports.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Flag changes larger than this many percent")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    before, after = flatten(old["results"]), flatten(new["results"])
+    print(f"{'metric':<55} {old['ragkitpy_version']:>12} {new['ragkitpy_version']:>12} {'change':>9}")
+    for name in sorted(set(before) | set(after)):
+        a, b = before.get(name), after.get(name)
+        if a is None or b is None:
+            print(f"{name:<55} {a if a is not None else '-':>12} {b if b is not None else '-':>12}")
+            continue
+        change = (b - a) / abs(a) * 100 if a else 0.0
+        flag = "  *" if abs(change) > args.threshold else ""
+        print(f"{name:<55} {a:>12.4g} {b:>12.4g} {change:>+8.1f}%{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# benchmarks/run.py
+"""
+run.py — Offline performance suite for ragkitpy. Writes one JSON document.
+
+Usage:
+    python benchmarks/run.py --scale quick --output results.json
+    python benchmarks/run.py --scale full --only query,indexes
+    python benchmarks/run.py --only indexes --index-types flat,sq8,pq,ivf_pq
+    python benchmarks/compare.py old.json new.json
+
+Benchmarks:
+    chunker   chunk_text / iter_chunks throughput (MB/s)
+    ingest    IngestionEngine end to end on generated files (chunks/s), with
+              the time spent in each stage (ragkitpy.metrics)
+    query     single and batched query latency, p50/p95/p99, per query mode
+    indexes   per index type: build time, search latency, recall@10 against
+              exact search and memory per million vectors
+
+No model is downloaded: text is embedded with a deterministic stand-in
+(common.StandInEmbedder), so results reflect ragkitpy itself rather than
+transformer encode time, and are comparable between releases.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Benchmark the checkout this script lives in, not an installed release
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import (   # noqa: E402
+    StandInEmbedder, best_of, latency_summary, make_text, make_vectors, make_vocabulary,
+)
+
+SCALES = {
+    "smoke": {   # Checks that the suite runs (see tests/test_benchmarks.py)
+        "chunker_mb": 0.1,
+        "documents": 5,
+        "words_per_document": 300,
+        "queries": 10,
+        "batch_size": 4,
+        "index_vectors": 1000,
+        "index_queries": 10,
+        "index_types": ("flat", "hnsw"),
+    },
+    "quick": {
+        "chunker_mb": 2,
+        "documents": 100,
+        "words_per_document": 2000,
+        "queries": 200,
+        "batch_size": 32,
+        "index_vectors": 20_000,
+        "index_queries": 200,
+        # PQ codebook training takes minutes on one core; add them with --index-types
+        "index_types": ("flat", "fp16", "sq8", "ivf_flat", "hnsw"),
+    },
+    "full": {
+        "chunker_mb": 50,
+        "documents": 1000,
+        "words_per_document": 5000,
+        "queries": 1000,
+        "batch_size": 32,
+        "index_vectors": 200_000,
+        "index_queries": 1000,
+        "index_types": ("flat", "fp16", "sq8", "pq", "ivf_flat", "ivf_pq", "hnsw"),
+    },
+}
+
+BENCHMARKS = ("chunker", "ingest", "query", "indexes")
+CHUNK_SIZE, OVERLAP, TOP_K = 500, 50, 10
+
+
+def bench_chunker(config: Dict[str, Any]) -> Dict[str, Any]:
+    from ragkitpy.chunker import chunk_text, iter_chunks
+
+    vocabulary = make_vocabulary()
+    text = make_text(int(config["chunker_mb"] * 1e6 / 7.5), vocabulary)
+    mb = len(text.encode("utf-8")) / 1e6
+    blocks = [text[i:i + 65536] for i in range(0, len(text), 65536)]
+
+    in_memory = best_of(3, chunk_text, text, CHUNK_SIZE, OVERLAP)
+    streaming = best_of(3, lambda: sum(1 for _ in iter_chunks(blocks, CHUNK_SIZE, OVERLAP)))
+    return {
+        "input_mb": mb,
+        "chunks": len(chunk_text(text, CHUNK_SIZE, OVERLAP)),
+        "chunk_text_mb_per_sec": mb / in_memory,
+        "iter_chunks_mb_per_sec": mb / streaming,
+    }
+
+
+def bench_ingest(config: Dict[str, Any], embedder: StandInEmbedder, workdir: str):
+    from ragkitpy import metrics
+    from ragkitpy.ingest import IngestionEngine
+    from ragkitpy.vectorstore import VectorStore
+
+    vocabulary = make_vocabulary()
+    paths = []
+    for d in range(config["documents"]):
+        path = os.path.join(workdir, f"doc_{d:05d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_text(config["words_per_document"], vocabulary, seed=d))
+        paths.append(path)
+
+    store = VectorStore(dim=embedder.embedding_dim, metric="cosine")
+    engine = IngestionEngine(embedder, store, chunk_size=CHUNK_SIZE, overlap=OVERLAP)
+    metrics.registry.reset()
+    stats = engine.run(paths)
+    return store, {
+        "documents": stats.documents,
+        "chunks": stats.chunks,
+        "seconds": stats.seconds,
+        "chunks_per_sec": stats.chunks_per_sec,
+        "docs_per_sec": stats.docs_per_sec,
+        "stages": {
+            stage: {key: values[key] for key in ("seconds", "items_per_sec", "p95_ms")}
+            for stage, values in metrics.registry.snapshot().items()
+        },
+    }
+
+
+def bench_query(config: Dict[str, Any], embedder: StandInEmbedder, store) -> Dict[str, Any]:
+    vocabulary = make_vocabulary()
+    questions = [make_text(8, vocabulary, seed=10_000 + q) for q in range(config["queries"])]
+
+    def time_each(run_query) -> List[float]:
+        run_query(questions[0])   # Warm up
+        times = []
+        for question in questions:
+            start = time.perf_counter()
+            run_query(question)
+            times.append(time.perf_counter() - start)
+        return times
+
+    results: Dict[str, Any] = {"corpus_chunks": store.total_chunks, "top_k": TOP_K}
+    results["dense"] = latency_summary(time_each(
+        lambda q: store.search(embedder.embed_single(q), top_k=TOP_K)))
+    results["lexical"] = latency_summary(time_each(
+        lambda q: store.search_lexical(q, top_k=TOP_K)))
+    results["hybrid"] = latency_summary(time_each(
+        lambda q: store.search_hybrid(embedder.embed_single(q), q, top_k=TOP_K)))
+
+    batch_size = config["batch_size"]
+    batches = [questions[i:i + batch_size] for i in range(0, len(questions), batch_size)]
+    times = []
+    for batch in batches:
+        start = time.perf_counter()
+        store.search_batch(embedder.embed(batch), top_k=TOP_K)
+        times.append(time.perf_counter() - start)
+    results["batched"] = dict(
+        latency_summary(times),
+        batch_size=batch_size,
+        queries_per_sec=len(questions) / sum(times),
+    )
+    return results
+
+
+def bench_indexes(config: Dict[str, Any], dim: int, workdir: str) -> Dict[str, Any]:
+    from ragkitpy.vectorstore import VectorStore
+
+    n, n_queries = config["index_vectors"], config["index_queries"]
+    data = make_vectors(n + n_queries, dim)
+    vectors, queries = data[:n], data[n:]
+    chunks = [""] * n   # Text is measured by the ingest benchmark
+
+    results = {}
+    for index_type in config["index_types"]:
+        store = VectorStore(dim=dim, index_type=index_type)
+        start = time.perf_counter()
+        with store.bulk_write():
+            for lo in range(0, n, 10_000):
+                store.add(vectors[lo:lo + 10_000], chunks[lo:lo + 10_000])
+        build = time.perf_counter() - start
+
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            store.search(query, top_k=TOP_K)
+            times.append(time.perf_counter() - start)
+
+        directory = os.path.join(workdir, index_type)
+        store.save(directory)
+        stored = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        results[index_type] = dict(
+            latency_summary(times),
+            trained=store.is_trained,
+            build_seconds=build,
+            recall_at_10=store.evaluate_recall(queries, top_k=TOP_K, vectors=vectors),
+            index_bytes_per_vector=store.bytes_per_vector(),
+            disk_mb_per_million_vectors=stored / n * 1e6 / 2 ** 20,
+        )
+    return {"vectors": n, "dim": dim, "by_index_type": results}
+
+
+def run(
+    scale: str = "quick",
+    only: Sequence[str] = BENCHMARKS,
+    dim: int = 384,
+    index_types: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Run the selected benchmarks and return the JSON-serializable report."""
+    import faiss
+    import ragkitpy
+
+    config = dict(SCALES[scale])
+    if index_types:
+        config["index_types"] = tuple(index_types)
+    embedder = StandInEmbedder(dim)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(sys.stderr):
+        if "chunker" in only:
+            results["chunker"] = bench_chunker(config)
+        if "ingest" in only or "query" in only:
+            store, ingest = bench_ingest(config, embedder, workdir)
+            if "ingest" in only:
+                results["ingest"] = ingest
+            if "query" in only:
+                results["query"] = bench_query(config, embedder, store)
+        if "indexes" in only:
+            results["indexes"] = bench_indexes(config, dim, workdir)
+
+    return {
+        "ragkitpy_version": ragkitpy.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "faiss": getattr(faiss, "__version__", "unknown"),
+        },
+        "scale": scale,
+        "config": dict(config, index_types=list(config["index_types"]), dim=dim,
+                       chunk_size=CHUNK_SIZE, overlap=OVERLAP),
+        "results": results,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the ragkitpy benchmark suite.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--index-types", default=None,
+                        help="Comma-separated index types for the indexes benchmark "
+                             "(default: depends on --scale)")
+    parser.add_argument("--output", default="-", help="JSON file to write ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    index_types = args.index_types.split(",") if args.index_types else None
+    report = json.dumps(run(args.scale, only, args.dim, index_types), indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,61 @@
+# ragkitpy/__init__.py
+"""
+ragkitpy — A lightweight RAG pipeline toolkit powered by HuggingFace 🤗
 
-# Leave empty until modules are implemented
\ No newline at end of file
+Quick start:
+    >>> from ragkitpy import RAGPipeline
+    >>> rag = RAGPipeline()
+    >>> rag.load_document("my_file.pdf")
+    >>> results = rag.query("What is this about?")
+
+Public names are imported lazily, on first access, so tools that only need
+the loader or chunker never pay for numpy, FAISS or torch.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+__version__ = "0.1.1"
+__author__ = "Srinath Dhumnor"
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "RAGPipeline": "ragkitpy.pipeline",
+    "AsyncRAGPipeline": "ragkitpy.serving",
+    "load_file": "ragkitpy.loader",
+    "stream_file": "ragkitpy.loader",
+    "chunk_text": "ragkitpy.chunker",
+    "HFEmbedder": "ragkitpy.embedder",
+    "ONNXEmbedder": "ragkitpy.embedder",
+    "HashingEmbedder": "ragkitpy.embedder",
+    "EmbeddingCache": "ragkitpy.cache",
+    "VectorStore": "ragkitpy.vectorstore",
+    "ShardedVectorStore": "ragkitpy.sharded",
+    "IngestionEngine": "ragkitpy.ingest",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from ragkitpy.cache import EmbeddingCache
+    from ragkitpy.chunker import chunk_text
+    from ragkitpy.embedder import HashingEmbedder, HFEmbedder, ONNXEmbedder
+    from ragkitpy.ingest import IngestionEngine
+    from ragkitpy.loader import load_file, stream_file
+    from ragkitpy.pipeline import RAGPipeline
+    from ragkitpy.serving import AsyncRAGPipeline
+    from ragkitpy.sharded import ShardedVectorStore
+    from ragkitpy.vectorstore import VectorStore
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'ragkitpy' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value   # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,312 @@
+# ragkitpy/bm25.py
+"""
+bm25.py — In-process BM25 keyword index, kept row-aligned with the vector store.
+
+Dense embeddings are poor at exact identifiers (error codes, SKUs, function
+names); BM25 catches those. Postings live in flat NumPy arrays in CSR layout:
+one contiguous slice per term, sorted by impact (the term's BM25 weight in
+that row), so a query can read just the head of each slice and stop early.
+New rows go into small segments that are merged geometrically, like an
+LSM tree, so appending stays cheap however large the index is.
+
+Writers append to a BM25Index; readers search an immutable _Postings object
+taken from freeze(), so searches can run in other threads while rows are
+being added.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ragkitpy.storage import GrowableArray
+
+_TOKEN = re.compile(r"\w+(?:[-.:/]\w+)*")
+_WORD = re.compile(r"\w+")
+
+# Longer tokens (URLs, base64 blobs, hashes) are not indexed whole, only by
+# their parts up to this length, so one odd token can't bloat the vocabulary
+MAX_TOKEN_LENGTH = 64
+
+COLUMNS = ("bm25_vocab", "bm25_ptr", "bm25_rows", "bm25_tfs", "bm25_doc_len")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens. Compound identifiers such as "ERR-404" or
+    "os.path.join" are kept whole and also split into their parts. Tokens
+    longer than MAX_TOKEN_LENGTH characters are dropped.
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) <= MAX_TOKEN_LENGTH:
+            tokens.append(token)
+        parts = _WORD.findall(token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if len(part) <= MAX_TOKEN_LENGTH)
+    return tokens
+
+
+class _Segment(NamedTuple):
+    """Postings of a run of added rows, in CSR layout over the terms it contains."""
+    terms: np.ndarray     # Sorted ids of the terms with postings here
+    ptr: np.ndarray       # terms[i] owns rows[ptr[i]:ptr[i + 1]], best impact first
+    rows: np.ndarray
+    tfs: np.ndarray
+    impacts: np.ndarray
+
+    def postings(self, term: int) -> Tuple[int, int]:
+        """(lo, hi) bounds of a term's postings (empty if it has none here)."""
+        i = int(np.searchsorted(self.terms, term))
+        if i < len(self.terms) and self.terms[i] == term:
+            return int(self.ptr[i]), int(self.ptr[i + 1])
+        return 0, 0
+
+    def expanded_terms(self) -> np.ndarray:
+        """Term id of every posting."""
+        return np.repeat(self.terms, np.diff(self.ptr))
+
+
+class _Postings(NamedTuple):
+    """Immutable, searchable state of a BM25Index at one point in time."""
+    vocab: Dict[str, int]            # Shared with the index; ids >= n_terms are ignored
+    n_terms: int
+    segments: Tuple[_Segment, ...]   # Oldest (and largest) first
+    doc_len: np.ndarray              # Tokens per row
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        live: Optional[np.ndarray] = None,
+        postings_limit: Optional[int] = 4096,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """See BM25Index.search()."""
+        vocab = self.vocab
+        n_terms = self.n_terms
+        term_ids = sorted({vocab[t] for t in tokenize(query) if vocab.get(t, n_terms) < n_terms})
+        if not term_ids or top_k <= 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        n_rows = len(self.doc_len)
+        rows, weights = [], []
+        for t in term_ids:
+            bounds = [segment.postings(t) for segment in self.segments]
+            df = sum(hi - lo for lo, hi in bounds)
+            idf = np.float32(np.log1p((n_rows - df + 0.5) / (df + 0.5)))
+            for segment, (lo, hi) in zip(self.segments, bounds):
+                if postings_limit is not None:
+                    hi = min(hi, lo + postings_limit)
+                if hi > lo:
+                    rows.append(segment.rows[lo:hi])
+                    weights.append(segment.impacts[lo:hi] * idf)
+        if not rows:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        candidates, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights)).astype(np.float32)
+        if live is not None:
+            keep = live[candidates]
+            candidates, scores = candidates[keep], scores[keep]
+
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((candidates, -scores))   # Ties broken by row
+        return scores[order], candidates[order].astype(np.int64)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the rows of a VectorStore.
+
+    Rows are appended with add() in the same order as vectors, so row i here
+    is row i of the FAISS index. New rows are buffered and indexed as a new
+    segment by the next search() or freeze(). A segment is merged with the
+    one before it once it grows to half that one's size, so there are
+    O(log n) segments and each posting is re-sorted O(log n) times overall:
+    frequent small freezes cost time proportional to the rows they add, not
+    to the size of the index. Impacts are computed with the average row
+    length at the time a segment is built or merged.
+
+    Args:
+        k1 (float): Term-frequency saturation. Default: 1.2
+        b (float): Document-length normalization. Default: 0.75
+
+    Example:
+        >>> index = BM25Index()
+        >>> index.add(["Error ERR-404: not found", "All systems nominal"])
+        >>> scores, rows = index.search("ERR-404", top_k=1)
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self._segments: List[_Segment] = []   # Replaced, never modified in place
+        # (terms, rows, tfs) batches added since the last freeze
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._doc_len = GrowableArray(np.int32)   # Append-only, so snapshots can share it
+        self._total_len = 0
+        self._postings = self._freeze_segments()
+
+    def add(self, texts: Sequence[str]) -> None:
+        """Index a batch of texts as the next rows."""
+        terms: List[int] = []
+        rows: List[int] = []
+        tfs: List[int] = []
+        doc_len = np.zeros(len(texts), dtype=np.int32)
+        vocab = self.vocab
+        first_row = len(self._doc_len)
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_len[i] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                terms.append(vocab.setdefault(term, len(vocab)))
+                rows.append(first_row + i)
+                tfs.append(tf)
+
+        self._pending.append((
+            np.array(terms, dtype=np.int64),
+            np.array(rows, dtype=np.int32),
+            np.array(tfs, dtype=np.int32),
+        ))
+        self._doc_len.extend(doc_len)
+        self._total_len += int(doc_len.sum())
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        live: Optional[np.ndarray] = None,
+        postings_limit: Optional[int] = 4096,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score rows against a keyword query.
+
+        Args:
+            query (str): Query text
+            top_k (int): Number of rows to return
+            live (np.ndarray, optional): Boolean mask over rows; False rows are skipped
+            postings_limit (int, optional): Read at most this many postings per
+                query term and segment, highest impact first. Bounds the cost
+                of common terms at the price of exactness in the tail. None
+                reads all.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (scores, rows), best first. Rows
+                that share no term with the query are never returned.
+        """
+        return self.freeze().search(query, top_k, live, postings_limit)
+
+    def freeze(self) -> _Postings:
+        """Index pending rows and return an immutable snapshot that can be searched concurrently."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            segments = self._segments + [self._build_segment(
+                np.concatenate([batch[0] for batch in pending]),
+                np.concatenate([batch[1] for batch in pending]),
+                np.concatenate([batch[2] for batch in pending]),
+            )]
+            while len(segments) > 1 and 2 * len(segments[-1].rows) >= len(segments[-2].rows):
+                segments[-2:] = [self._merge_segments(segments[-2:])]
+            self._segments = segments
+            self._postings = self._freeze_segments()
+        return self._postings
+
+    def select(self, rows: np.ndarray) -> None:
+        """Keep only the given rows, renumbered 0..len(rows)-1 (see VectorStore.compact)."""
+        self.freeze()
+        new_row = np.full(len(self._doc_len), -1, dtype=np.int64)
+        new_row[rows] = np.arange(len(rows))
+        terms, old_rows, tfs = self._concatenate(self._segments)
+        mapped = new_row[old_rows]
+        kept = mapped >= 0
+
+        doc_len = self._doc_len.view()[rows]
+        self._doc_len = GrowableArray(np.int32, doc_len)
+        self._total_len = int(doc_len.sum())
+        self._segments = []
+        self._pending = [(terms[kept], mapped[kept].astype(np.int32), tfs[kept])]
+        self.freeze()
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Return the index as named arrays for storage.write_columns()."""
+        self.freeze()
+        if len(self._segments) > 1:   # One CSR array set on disk
+            self._segments = [self._merge_segments(self._segments)]
+            self._postings = self._freeze_segments()
+        segment = self._segments[0] if self._segments else self._build_segment(
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        )
+        df = np.zeros(len(self.vocab), dtype=np.int64)
+        df[segment.terms] = np.diff(segment.ptr)
+
+        # Terms as one UTF-8 blob, newline-separated (tokens never contain
+        # whitespace): a fixed-width string array pads every term to the longest
+        vocab = np.frombuffer("\n".join(self.vocab).encode("utf-8"), dtype=np.uint8)
+        return dict(zip(COLUMNS, (
+            vocab,
+            np.concatenate(([0], np.cumsum(df))).astype(np.int64),
+            segment.rows,
+            segment.tfs,
+            self._doc_len.view(),
+        )))
+
+    @classmethod
+    def from_columns(cls, columns: Sequence[np.ndarray]) -> "BM25Index":
+        """Rebuild an index from the arrays returned by to_columns(), in COLUMNS order."""
+        vocab, ptr, rows, tfs, doc_len = columns
+        index = cls()
+        if vocab.dtype.kind == "U":   # Written as a fixed-width string array by older versions
+            terms = vocab.tolist()
+        else:
+            terms = vocab.tobytes().decode("utf-8").split("\n") if len(vocab) else []
+        index.vocab = {term: i for i, term in enumerate(terms)}
+        index._doc_len = GrowableArray(np.int32, doc_len)
+        index._total_len = int(doc_len.sum())
+        terms = np.repeat(np.arange(len(ptr) - 1), np.diff(ptr))
+        index._pending.append((terms, np.asarray(rows, dtype=np.int32), np.asarray(tfs, dtype=np.int32)))
+        index.freeze()
+        return index
+
+    def _freeze_segments(self) -> _Postings:
+        return _Postings(self.vocab, len(self.vocab), tuple(self._segments), self._doc_len.view())
+
+    @staticmethod
+    def _concatenate(segments: Sequence[_Segment]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(terms, rows, tfs) of every posting of the segments."""
+        return (
+            np.concatenate([segment.expanded_terms() for segment in segments]),
+            np.concatenate([segment.rows for segment in segments]),
+            np.concatenate([segment.tfs for segment in segments]),
+        )
+
+    def _merge_segments(self, segments: Sequence[_Segment]) -> _Segment:
+        return self._build_segment(*self._concatenate(segments))
+
+    def _build_segment(self, terms: np.ndarray, rows: np.ndarray, tfs: np.ndarray) -> _Segment:
+        """Sort postings by term, then best impact first, with the current average length."""
+        n_rows = len(self._doc_len)
+        avg_len = self._total_len / n_rows if self._total_len > 0 else 1.0
+        lengths = self._doc_len.view()[rows].astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_len)
+        impacts = (tfs * (self.k1 + 1) / (tfs + norm)).astype(np.float32)
+
+        order = np.lexsort((-impacts, terms))
+        terms = terms[order]
+        unique, starts = np.unique(terms, return_index=True)
+        return _Segment(
+            terms=unique.astype(np.int64),
+            ptr=np.append(starts, len(terms)).astype(np.int64),
+            rows=rows[order].astype(np.int32),
+            tfs=tfs[order].astype(np.int32),
+            impacts=impacts[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __repr__(self):
+        return f"BM25Index(rows={len(self)}, terms={len(self.vocab)}, segments={len(self._segments)})"
@@ -0,0 +1,178 @@
+# ragkitpy/cache.py
+"""
+cache.py — Persistent, content-addressed cache for chunk embeddings.
+
+Entries are keyed by (model name, SHA-256 of the normalized text) and stored
+in a local SQLite file, so re-ingesting a mostly unchanged corpus only sends
+the changed chunks to the model.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# SQLite's default limit on "?" parameters per statement is 999
+_MAX_PARAMS = 900
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing: Unicode NFC, surrounding whitespace stripped."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    """Return the cache key of a text embedded with a given model."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache with hit/miss counters and LRU eviction.
+
+    Args:
+        path (str): SQLite file to use (created if missing). ":memory:" works
+                    for a throwaway cache.
+        max_entries (int, optional): Size cap. When exceeded, the least recently
+                                     used entries are evicted. Default: unbounded
+
+    Example:
+        >>> cache = EmbeddingCache("embeddings.sqlite", max_entries=1_000_000)
+        >>> embedder = HFEmbedder(cache=cache)
+        >>> embedder.embed(chunks)          # misses: encoded and stored
+        >>> embedder.embed(chunks)          # hits: no model call
+        >>> print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0.")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        # Logical clock for LRU ordering; survives restarts via the stored values
+        row = self._conn.execute("SELECT MAX(last_used) FROM embeddings").fetchone()
+        self._clock = row[0] or 0
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for a list of texts.
+
+        Args:
+            model_name (str): Model the embeddings were produced with
+            texts (Sequence[str]): Texts to look up
+
+        Returns:
+            List[Optional[np.ndarray]]: One float32 vector per text, in order,
+                                        or None for a cache miss
+        """
+        keys = [cache_key(model_name, text) for text in texts]
+        found = {}
+        with self._lock:
+            self._clock += 1
+            unique = list(set(keys))
+            for i in range(0, len(unique), _MAX_PARAMS):
+                batch = unique[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    hit_keys = [key for key, _ in rows]
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(hit_keys))})",
+                        [self._clock] + hit_keys,
+                    )
+            self._conn.commit()
+
+        results: List[Optional[np.ndarray]] = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                results.append(np.frombuffer(blob, dtype=np.float32))
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings for a list of texts, evicting old entries if over the cap.
+
+        Args:
+            model_name (str): Model the embeddings were produced with
+            texts (Sequence[str]): Texts that were embedded
+            vectors (np.ndarray): 2D array with one row per text
+        """
+        if len(texts) != len(vectors):
+            raise ValueError(f"Mismatch: {len(texts)} texts but {len(vectors)} vectors.")
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._clock += 1
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [
+                    (cache_key(model_name, text), vector.tobytes(), self._clock)
+                    for text, vector in zip(texts, vectors)
+                ],
+            )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    " SELECT key FROM embeddings ORDER BY last_used"
+                    " LIMIT MAX((SELECT COUNT(*) FROM embeddings) - ?, 0))",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        self._conn.close()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def __repr__(self):
+        return (
+            f"EmbeddingCache(path='{self.path}', entries={len(self)}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
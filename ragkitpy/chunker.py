@@ -3,7 +3,19 @@
 chunker.py — Split large text into overlapping chunks for RAG pipelines.
 """
 
-from typing import List
+import re
+from typing import Any, Iterable, Iterator, List, NamedTuple
+
+# Sentence boundaries: whitespace following ".", "!" or "?"
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+class Chunk(NamedTuple):
+    """A chunk of text plus its character span in the source text."""
+    text: str
+    start: int       # Offset of the first character (inclusive)
+    end: int         # Offset after the last character (exclusive)
+    page: int = -1   # 1-based page the chunk starts on, for paged sources (PDFs)
 
 
 def chunk_text(
@@ -25,26 +37,109 @@ def chunk_text(
     Example:
         >>> chunks = chunk_text("long document text...", chunk_size=200, overlap=20)
     """
+    return [chunk.text for chunk in chunk_text_with_offsets(text, chunk_size, overlap)]
+
+
+def chunk_text_with_offsets(
+    text: str,
+    chunk_size: int = 500,
+    overlap: int = 50
+) -> List[Chunk]:
+    """
+    Same as chunk_text() but keeps each chunk's character span in the source.
+
+    ``text[chunk.start:chunk.end] == chunk.text`` holds for every chunk.
+
+    Returns:
+        List[Chunk]: List of (text, start, end) chunks
+    """
     if not text or not text.strip():
         raise ValueError("Input text is empty or whitespace.")
 
+    _check_chunk_settings(chunk_size, overlap)
+
+    return list(_iter_chunks([text], chunk_size, chunk_size - overlap))
+
+
+def _check_chunk_settings(chunk_size: int, overlap: int) -> None:
     if chunk_size <= 0:
         raise ValueError("chunk_size must be greater than 0.")
 
     if overlap < 0 or overlap >= chunk_size:
         raise ValueError("overlap must be >= 0 and less than chunk_size.")
 
-    chunks = []
-    start = 0
 
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        start += chunk_size - overlap
+def _window_chunk(window: str, start: int) -> Chunk:
+    """Strip a window and return it as a Chunk (empty text if whitespace-only)."""
+    chunk = window.strip()
+    chunk_start = start + len(window) - len(window.lstrip())
+    return Chunk(chunk, chunk_start, chunk_start + len(chunk))
 
-    return chunks
+
+def iter_chunks(
+    blocks: Iterable[str],
+    chunk_size: int = 500,
+    overlap: int = 50
+) -> Iterator[Chunk]:
+    """
+    Streaming version of chunk_text_with_offsets().
+
+    Consumes text in blocks (e.g. from loader.stream_file()) and yields chunks
+    as soon as they are complete, so only about one block plus one chunk of
+    text is held in memory at a time. The output is identical to
+    ``chunk_text_with_offsets("".join(blocks), chunk_size, overlap)``,
+    including overlap, stripping and absolute offsets.
+
+    Args:
+        blocks (Iterable[str]): Consecutive pieces of the document text
+        chunk_size (int): Max characters per chunk (default 500)
+        overlap (int): Overlapping characters between chunks (default 50)
+
+    Yields:
+        Chunk: (text, start, end) chunks
+
+    Raises:
+        ValueError: If the settings are invalid, or (once the stream is
+                    exhausted) if the text was empty or whitespace
+
+    Example:
+        >>> for chunk in iter_chunks(stream_file("big.txt"), chunk_size=500):
+        ...     print(chunk.start, chunk.text[:40])
+    """
+    _check_chunk_settings(chunk_size, overlap)
+    return _iter_chunks(blocks, chunk_size, chunk_size - overlap)
+
+
+def _iter_chunks(blocks: Iterable[str], chunk_size: int, step: int) -> Iterator[Chunk]:
+    buffer = ""
+    buffer_start = 0   # Absolute offset of buffer[0]
+    start = 0          # Absolute offset of the next window
+    emitted = False
+
+    for block in blocks:
+        buffer += block
+        buffer_end = buffer_start + len(buffer)
+        while start + chunk_size <= buffer_end:
+            chunk = _window_chunk(buffer[start - buffer_start:start - buffer_start + chunk_size], start)
+            if chunk.text:
+                emitted = True
+                yield chunk
+            start += step
+        # Everything before the next window start is no longer needed
+        buffer = buffer[start - buffer_start:]
+        buffer_start = start
+
+    # Trailing windows that run past the end of the text
+    buffer_end = buffer_start + len(buffer)
+    while start < buffer_end:
+        chunk = _window_chunk(buffer[start - buffer_start:start - buffer_start + chunk_size], start)
+        if chunk.text:
+            emitted = True
+            yield chunk
+        start += step
+
+    if not emitted:
+        raise ValueError("Input text is empty or whitespace.")
 
 
 def chunk_by_sentences(text: str, sentences_per_chunk: int = 5) -> List[str]:
@@ -58,8 +153,7 @@ def chunk_by_sentences(text: str, sentences_per_chunk: int = 5) -> List[str]:
     Returns:
         List[str]: List of text chunks
     """
-    import re
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    sentences = _SENTENCE_BREAK.split(text.strip())
     chunks = []
 
     for i in range(0, len(sentences), sentences_per_chunk):
@@ -67,4 +161,121 @@ def chunk_by_sentences(text: str, sentences_per_chunk: int = 5) -> List[str]:
         if chunk:
             chunks.append(chunk)
 
-    return chunks
\ No newline at end of file
+    return chunks
+
+
+def chunk_by_tokens(
+    text: str,
+    tokenizer: Any,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+) -> List[Chunk]:
+    """
+    Token-budget chunker — packs whole sentences into chunks of at most
+    ``max_tokens`` tokens, as counted by the embedding model's own tokenizer.
+
+    Unlike chunk_text(), no chunk runs past what the model actually reads, so
+    no text is silently truncated at encode time. The document is tokenized
+    once, in a single call with offset mapping; sentences longer than the
+    budget are split at token boundaries.
+
+    Args:
+        text (str): The full document text
+        tokenizer: A HuggingFace *fast* tokenizer, e.g. ``HFEmbedder.tokenizer``
+        max_tokens (int): Token budget per chunk, e.g. ``HFEmbedder.max_tokens``
+        overlap_tokens (int): Up to this many tokens from the end of a chunk are
+                              repeated at the start of the next, snapped to a
+                              sentence start when one falls in that range (default 0)
+
+    Returns:
+        List[Chunk]: (text, start, end) chunks
+
+    Example:
+        >>> embedder = HFEmbedder()
+        >>> chunks = chunk_by_tokens(text, embedder.tokenizer, embedder.max_tokens, 32)
+    """
+    import numpy as np
+
+    if not text or not text.strip():
+        raise ValueError("Input text is empty or whitespace.")
+
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be greater than 0.")
+
+    if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be >= 0 and less than max_tokens.")
+
+    encoding = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        verbose=False,   # The whole document is longer than the model limit on purpose
+    )
+    offsets = np.asarray(encoding["offset_mapping"], dtype=np.int64).reshape(-1, 2)
+    n_tokens = len(offsets)
+    if n_tokens == 0:
+        raise ValueError("Tokenizer produced no tokens for the input text.")
+
+    # Token index at which each sentence starts (plus the end of the text)
+    sentence_starts = np.array(
+        [0] + [m.end() for m in _SENTENCE_BREAK.finditer(text)], dtype=np.int64
+    )
+    boundaries = np.unique(np.append(
+        np.searchsorted(offsets[:, 0], sentence_starts, side="left"), n_tokens
+    ))
+
+    chunks = []
+    start = 0
+    prev_end = 0   # End of the previous chunk; each chunk must get past it
+    while start < n_tokens:
+        limit = start + max_tokens
+        if limit >= n_tokens:
+            end = n_tokens
+        else:
+            # Last sentence boundary within budget
+            end = int(boundaries[np.searchsorted(boundaries, limit, side="right") - 1])
+            if end <= prev_end:
+                if start < prev_end:
+                    # The carried-over overlap leaves no room for the next sentence
+                    start = prev_end
+                    continue
+                end = limit   # A single sentence longer than the budget: hard split
+
+        chunk = _window_chunk(text[offsets[start, 0]:offsets[end - 1, 1]], int(offsets[start, 0]))
+        if chunk.text:
+            chunks.append(chunk)
+        if end >= n_tokens:
+            break
+
+        next_start = end - overlap_tokens
+        if overlap_tokens:
+            # Prefer repeating whole sentences over cutting one in half
+            i = np.searchsorted(boundaries, next_start, side="left")
+            if boundaries[i] < end:
+                next_start = int(boundaries[i])
+        prev_end = end
+        start = max(next_start, start + 1)
+
+    return chunks
+
+
+class TokenChunker:
+    """
+    Picklable callable wrapping chunk_by_tokens(), for use with IngestionEngine.
+
+    Takes the same block stream as iter_chunks(). The blocks are joined first,
+    since the document is tokenized in one call.
+
+    Args:
+        tokenizer: A HuggingFace fast tokenizer
+        max_tokens (int): Token budget per chunk
+        overlap_tokens (int): Token overlap between chunks (default 0)
+    """
+
+    def __init__(self, tokenizer: Any, max_tokens: int, overlap_tokens: int = 0):
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def __call__(self, blocks: Iterable[str]) -> List[Chunk]:
+        return chunk_by_tokens("".join(blocks), self.tokenizer, self.max_tokens, self.overlap_tokens)
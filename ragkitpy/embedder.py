@@ -1,19 +1,69 @@
 # ragkitpy/embedder.py
 """
-embedder.py — Convert text chunks into vector embeddings using HuggingFace models.
+embedder.py — Convert text chunks into vector embeddings.
+
+Backends:
+    HFEmbedder       SentenceTransformer models on PyTorch (default)
+    ONNXEmbedder     An exported (optionally quantized) model on ONNX Runtime
+    HashingEmbedder  Model-free feature hashing of words, fully vectorized
+
+Anything with the methods of the Embedder protocol can be passed to
+RAGPipeline(embedder=...) instead.
 """
 
-from typing import List
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Protocol, Union
 import numpy as np
 
+from ragkitpy import metrics
+from ragkitpy.cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    """
+    What RAGPipeline, IngestionEngine and AsyncRAGPipeline need from an embedder.
+
+    Optional extras are used when present: ``model_name`` (recorded in saved
+    indexes), ``warmup()``, and ``tokenizer`` / ``max_tokens`` for
+    ``chunking="tokens"``.
+    """
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), embedding_dim) float32 array."""
+        ...
+
+    def embed_single(self, text: str) -> np.ndarray:
+        """Return one (embedding_dim,) vector."""
+        ...
+
+    @property
+    def embedding_dim(self) -> int:
+        ...
+
 
 class HFEmbedder:
     """
     Wrapper around HuggingFace SentenceTransformer models for generating embeddings.
 
+    The model (and torch) is only loaded on first use — the first embed, or
+    any property that needs it. Call warmup() to load it upfront.
+
     Args:
         model_name (str): Any SentenceTransformer model from HuggingFace Hub.
                           Default is 'all-MiniLM-L6-v2' — fast, small, great quality.
+        cache (EmbeddingCache or str, optional): Persistent embedding cache, or a
+                          path to a SQLite file to use as one. Only cache misses
+                          are sent to the model.
+        normalize (bool): L2-normalize embeddings at encode time, so inner
+                          products are cosine similarities. Default: False
+        batch_size (int): Texts per forward pass. Texts are sorted by token
+                          count first, so each batch pads to a similar
+                          length. Default: 32
 
     Example:
         >>> embedder = HFEmbedder()
@@ -21,7 +71,34 @@ class HFEmbedder:
         >>> print(vectors.shape)  # (2, 384)
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache: Optional[Union[EmbeddingCache, str]] = None,
+        normalize: bool = False,
+        batch_size: int = 32,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0.")
+        self.model_name = model_name
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache) if isinstance(cache, str) else cache
+        # Normalized and raw vectors of the same model must not share cache entries
+        self._cache_namespace = f"{model_name}:normalized" if normalize else model_name
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The SentenceTransformer model, loaded on first access."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
         try:
             from sentence_transformers import SentenceTransformer
         except ImportError:
@@ -29,15 +106,29 @@ class HFEmbedder:
                 "sentence-transformers is required. Run: pip install sentence-transformers"
             )
 
-        print(f"🤗 Loading embedding model: {model_name} ...")
-        self.model = SentenceTransformer(model_name)
-        self.model_name = model_name
-        print(f"✅ Model loaded!")
+        logger.info("Loading embedding model: %s", self.model_name)
+        with metrics.span("model_load"):
+            model = SentenceTransformer(self.model_name)
+        return model
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the model has been loaded."""
+        return self._model is not None
+
+    def warmup(self) -> None:
+        """Load the model now and run one encode, so the first real call is fast."""
+        self._encode(["warmup"])
 
     def embed(self, texts: List[str]) -> np.ndarray:
         """
         Convert a list of strings into embedding vectors.
 
+        Texts are stripped of surrounding whitespace, and identical texts
+        (e.g. headers repeated on every page) are encoded once. Every input
+        gets a row, whitespace-only ones included, so row i always belongs
+        to texts[i].
+
         Args:
             texts (List[str]): List of text strings to embed
 
@@ -50,13 +141,75 @@ class HFEmbedder:
         if not texts:
             raise ValueError("Cannot embed an empty list of texts.")
 
-        # Filter out empty strings
-        texts = [t.strip() for t in texts if t.strip()]
+        positions: Dict[str, int] = {}
+        inverse = np.fromiter(
+            (positions.setdefault(t.strip(), len(positions)) for t in texts),
+            dtype=np.int64,
+            count=len(texts),
+        )
+        unique = list(positions)
 
-        if not texts:
-            raise ValueError("All texts were empty after stripping whitespace.")
+        if self.cache is None:
+            vectors = self._encode(unique)
+        else:
+            cached = self.cache.get_many(self._cache_namespace, unique)
+            missing = [i for i, vector in enumerate(cached) if vector is None]
 
-        return self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+            encoded = None
+            if missing:   # Only then is the model needed (and loaded)
+                missing_texts = [unique[i] for i in missing]
+                encoded = self._encode(missing_texts)
+                self.cache.put_many(self._cache_namespace, missing_texts, encoded)
+            dim = encoded.shape[1] if encoded is not None else len(cached[0])
+            vectors = np.empty((len(unique), dim), dtype=np.float32)
+            if encoded is not None:
+                vectors[missing] = encoded
+            for i, vector in enumerate(cached):
+                if vector is not None:
+                    vectors[i] = vector
+        # Without duplicates, unique is texts in order
+        return vectors if len(unique) == len(texts) else vectors[inverse]
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode in batches of texts with similar token counts, so little
+        compute goes to padding, and return the rows in input order.
+        """
+        if len(texts) <= self.batch_size:   # One batch: order doesn't matter
+            return self._encode_batch(texts)
+
+        order = np.argsort(self._token_lengths(texts), kind="stable")
+        result = None
+        for lo in range(0, len(texts), self.batch_size):
+            batch = order[lo:lo + self.batch_size]
+            encoded = self._encode_batch([texts[i] for i in batch])
+            if result is None:
+                result = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            result[batch] = encoded
+        return result
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=self.normalize,
+        )
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """Tokens the model will read of each text (capped at its max_seq_length)."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:   # Not a transformer model: characters are a fair proxy
+            return [len(t) for t in texts]
+        with metrics.span("tokenize", items=len(texts)):
+            ids = tokenizer(
+                texts,
+                add_special_tokens=False,
+                truncation=True,
+                max_length=self.model.max_seq_length,
+            )["input_ids"]
+        return [len(i) for i in ids]
 
     def embed_single(self, text: str) -> np.ndarray:
         """
@@ -74,10 +227,321 @@ class HFEmbedder:
         result = self.embed([text])
         return result[0]
 
+    @property
+    def tokenizer(self):
+        """The model's HuggingFace tokenizer (for token-budget chunking)."""
+        return self.model.tokenizer
+
+    @property
+    def max_tokens(self) -> int:
+        """Tokens the model reads per input: max_seq_length minus special tokens."""
+        special = self.tokenizer.num_special_tokens_to_add(pair=False)
+        return self.model.max_seq_length - special
+
     @property
     def embedding_dim(self) -> int:
         """Return the dimension of embeddings produced by this model."""
         return self.model.get_sentence_embedding_dimension()
 
     def __repr__(self):
-        return f"HFEmbedder(model='{self.model_name}', dim={self.embedding_dim})"
\ No newline at end of file
+        dim = self.embedding_dim if self.is_loaded else "not loaded"
+        return f"HFEmbedder(model='{self.model_name}', dim={dim}, normalize={self.normalize})"
+
+
+class ONNXEmbedder:
+    """
+    Sentence embeddings from an ONNX export of a transformer, run on ONNX Runtime.
+
+    For CPU-bound ingestion: no PyTorch at all, and an int8-quantized export
+    (e.g. ``model_quantized.onnx``) encodes several times faster than the
+    same model in PyTorch. Token embeddings are mean-pooled over the
+    attention mask, as SentenceTransformer models do. The session is created
+    on first use.
+
+    Args:
+        model_dir (str): Local directory holding the .onnx file and the fast
+                         tokenizer's tokenizer.json (as written by
+                         ``optimum-cli export onnx``)
+        file_name (str): Model file inside model_dir. Default: "model.onnx"
+        normalize (bool): L2-normalize embeddings. Default: False
+        max_length (int): Tokens read per input; longer inputs are truncated. Default: 256
+        batch_size (int): Inputs per session run. Default: 32
+        threads (int, optional): Intra-op threads for ONNX Runtime. Default: its own choice
+
+    Example:
+        >>> embedder = ONNXEmbedder("models/all-MiniLM-L6-v2-onnx", file_name="model_quantized.onnx")
+        >>> rag = RAGPipeline(embedder=embedder)
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        file_name: str = "model.onnx",
+        normalize: bool = False,
+        max_length: int = 256,
+        batch_size: int = 32,
+        threads: Optional[int] = None,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0.")
+        model_path = os.path.join(model_dir, file_name)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+        self.model_dir = model_dir
+        self.model_path = model_path
+        self.model_name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}/{file_name}"
+        self.normalize = normalize
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._dim: Optional[int] = None
+        self._load_lock = threading.Lock()
+
+    def _load(self) -> None:
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("onnxruntime is required. Run: pip install onnxruntime")
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            raise ImportError("tokenizers is required. Run: pip install tokenizers")
+
+        options = onnxruntime.SessionOptions()
+        if self.threads is not None:
+            options.intra_op_num_threads = self.threads
+        logger.info("Loading ONNX model: %s", self.model_path)
+        with metrics.span("model_load"):
+            session = onnxruntime.InferenceSession(
+                self.model_path, options, providers=["CPUExecutionProvider"]
+            )
+        tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(self.max_length)
+        tokenizer.enable_padding()
+        self._tokenizer = tokenizer
+        self._inputs = {node.name for node in session.get_inputs()}
+        self._session = session
+
+    @property
+    def session(self):
+        """The ONNX Runtime session, created on first access."""
+        if self._session is None:
+            with self._load_lock:
+                if self._session is None:
+                    self._load()
+        return self._session
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the session has been created."""
+        return self._session is not None
+
+    def warmup(self) -> None:
+        """Create the session now and run one encode, so the first real call is fast."""
+        self.embed(["warmup"])
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Convert a list of strings into embedding vectors.
+
+        Args:
+            texts (List[str]): List of text strings to embed
+
+        Returns:
+            np.ndarray: 2D array of shape (len(texts), embedding_dim)
+
+        Raises:
+            ValueError: If texts list is empty
+        """
+        if not texts:
+            raise ValueError("Cannot embed an empty list of texts.")
+
+        session = self.session
+        # Similar lengths share a batch, so little compute goes to padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = []
+        for lo in range(0, len(texts), self.batch_size):
+            batches.append(self._encode([texts[i] for i in order[lo:lo + self.batch_size]], session))
+        result = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        result[order] = np.concatenate(batches)
+        self._dim = result.shape[1]
+        return result
+
+    def _encode(self, texts: List[str], session) -> np.ndarray:
+        with metrics.span("tokenize", items=len(texts)):
+            encodings = self._tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        with metrics.span("model", items=len(texts)):
+            output = session.run(None, {name: value for name, value in feeds.items() if name in self._inputs})[0]
+
+        if output.ndim == 3:   # Token embeddings: mean-pool over real tokens
+            weights = mask[:, :, None].astype(np.float32)
+            output = (output * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        output = output.astype(np.float32)
+        if self.normalize:
+            output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        return output
+
+    def embed_single(self, text: str) -> np.ndarray:
+        """
+        Embed a single string. Convenience method for query embedding.
+
+        Args:
+            text (str): A single string to embed
+
+        Returns:
+            np.ndarray: 1D embedding vector, shape (embedding_dim,)
+        """
+        if not text or not text.strip():
+            raise ValueError("Input text is empty.")
+        return self.embed([text])[0]
+
+    @property
+    def embedding_dim(self) -> int:
+        """Return the dimension of embeddings produced by this model."""
+        if self._dim is None:
+            self.embed(["dimension probe"])
+        return self._dim
+
+    def __repr__(self):
+        dim = self._dim if self._dim is not None else "not loaded"
+        return f"ONNXEmbedder(model='{self.model_name}', dim={dim}, normalize={self.normalize})"
+
+
+_HASH_TOKEN = re.compile(r"\w{1,32}")   # Longer words are hashed in 32-character pieces
+_HASH_BLOCK = 65536                    # Tokens hashed per vectorized step
+
+
+def _mix64(h: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: spreads hash bits so that bucket and sign are independent."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+class HashingEmbedder:
+    """
+    Model-free embedder: word n-grams hashed into signed buckets (feature hashing).
+
+    Captures lexical overlap rather than meaning, so it suits keyword-style
+    workloads — logs, identifiers, near-duplicate detection — at a tiny
+    fraction of a transformer's cost. Hashing runs in NumPy over whole
+    batches; only tokenization is per text. Output is deterministic across
+    processes and runs.
+
+    Args:
+        dim (int): Number of hash buckets, i.e. the embedding dimension. Default: 1024
+        ngrams (int): Longest word n-gram hashed (1 = single words). Default: 2
+        normalize (bool): L2-normalize the vectors. Default: True
+        seed (int): Selects a different hash function. Default: 0
+
+    Example:
+        >>> embedder = HashingEmbedder(dim=2048)
+        >>> rag = RAGPipeline(embedder=embedder, metric="cosine")
+    """
+
+    def __init__(self, dim: int = 1024, ngrams: int = 2, normalize: bool = True, seed: int = 0):
+        if dim <= 0:
+            raise ValueError("dim must be greater than 0.")
+        if ngrams < 1:
+            raise ValueError("ngrams must be >= 1.")
+        self.dim = dim
+        self.ngrams = ngrams
+        self.normalize = normalize
+        self.seed = seed
+        self.model_name = f"hashing(dim={dim}, ngrams={ngrams}, seed={seed})"
+        # Per-character multipliers of the polynomial string hash
+        self._powers = _mix64(np.arange(1, 33, dtype=np.uint64) + np.uint64(seed) * np.uint64(1 << 32))
+
+    @property
+    def embedding_dim(self) -> int:
+        """Return the dimension of the embeddings (the number of buckets)."""
+        return self.dim
+
+    def warmup(self) -> None:
+        """Nothing to load; present for interface parity with HFEmbedder."""
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Convert a list of strings into embedding vectors.
+
+        Args:
+            texts (List[str]): List of text strings to embed
+
+        Returns:
+            np.ndarray: 2D array of shape (len(texts), dim). Texts with no
+                        word characters get a zero vector.
+
+        Raises:
+            ValueError: If texts list is empty
+        """
+        if not texts:
+            raise ValueError("Cannot embed an empty list of texts.")
+
+        tokens = [_HASH_TOKEN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(texts))
+        words = self._hash_words([token for text_tokens in tokens for token in text_tokens])
+        rows = np.repeat(np.arange(len(texts)), lengths)
+
+        hashes, owners = [words], [rows]
+        for n in range(2, self.ngrams + 1):
+            # The n-gram starting at token i stays inside one text iff its last token does
+            count = len(words) - n + 1
+            if count <= 0:
+                break
+            gram = words[:count]
+            for j in range(1, n):
+                gram = _mix64(gram * np.uint64(0x9E3779B97F4A7C15) + words[j:j + count])
+            inside = rows[:count] == rows[n - 1:]
+            hashes.append(gram[inside])
+            owners.append(rows[:count][inside])
+
+        hashes = np.concatenate(hashes)
+        owners = np.concatenate(owners)
+        buckets = (hashes % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+        vectors = np.bincount(
+            owners * self.dim + buckets, weights=signs, minlength=len(texts) * self.dim
+        ).reshape(len(texts), self.dim).astype(np.float32)
+
+        if self.normalize:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+    def _hash_words(self, words: List[str]) -> np.ndarray:
+        """Hash words (at most 32 characters each) to uint64, in vectorized blocks."""
+        hashes = np.empty(len(words), dtype=np.uint64)
+        for lo in range(0, len(words), _HASH_BLOCK):
+            block = np.array(words[lo:lo + _HASH_BLOCK], dtype=str)
+            width = block.dtype.itemsize // 4
+            # UCS-4 code points, zero-padded to the longest word in the block
+            codes = block.view(np.uint32).reshape(len(block), width).astype(np.uint64)
+            hashes[lo:lo + len(block)] = _mix64(codes @ self._powers[:width])
+        return hashes
+
+    def embed_single(self, text: str) -> np.ndarray:
+        """
+        Embed a single string. Convenience method for query embedding.
+
+        Args:
+            text (str): A single string to embed
+
+        Returns:
+            np.ndarray: 1D embedding vector, shape (dim,)
+        """
+        if not text or not text.strip():
+            raise ValueError("Input text is empty.")
+        return self.embed([text])[0]
+
+    def __repr__(self):
+        return f"HashingEmbedder(dim={self.dim}, ngrams={self.ngrams}, normalize={self.normalize})"
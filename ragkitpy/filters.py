@@ -0,0 +1,351 @@
+# ragkitpy/filters.py
+"""
+filters.py — Per-chunk metadata columns, and filter expressions over them
+evaluated to row masks.
+
+Metadata is stored column by column in NumPy arrays, one value per row of
+the vector store. Strings are dictionary-encoded (int32 codes), so a filter
+on a tenant or document type compares integers, not strings.
+
+Filter expressions are dicts, in the style of MongoDB queries:
+
+    {"tenant": "acme"}                                  equality
+    {"year": {"$gte": 2020, "$lt": 2024}}               range
+    {"type": {"$in": ["pdf", "html"]}}                  set membership
+    {"$or": [{"tenant": "acme"}, {"public": True}]}     boolean logic
+    {"$not": {"type": "draft"}}
+
+Conditions on several fields in one dict must all hold. Operators: $eq,
+$ne, $gt, $gte, $lt, $lte, $in, $nin; combinators: $and, $or, $not. A row
+without a value for a field matches no condition on that field, and a
+field no row has a value for matches nothing.
+"""
+
+import datetime
+import operator
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ragkitpy.storage import GrowableArray, read_columns
+
+Filter = Dict[str, Any]
+
+# Filter fields every store has, derived from its provenance columns
+BUILTIN_FIELDS = ("doc_id", "source", "page")
+
+_COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+_OPERATORS = tuple(_COMPARISONS) + ("$in", "$nin")
+
+_FIELD_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")   # Also used in file names
+
+_DATETIME = np.dtype("datetime64[us]")
+_STRING = np.dtype(np.int32)   # Codes into the column's vocabulary; -1 = missing
+
+# Source array kinds each column kind accepts (no silent float -> int truncation)
+_ACCEPTED_KINDS = {"b": "b", "i": "iu", "f": "iuf"}
+_TYPE_NAMES = {"b": "bool", "i": "integer", "f": "float", "M": "datetime"}
+
+
+class ColumnView(NamedTuple):
+    """Read-only view of one column, as of a snapshot."""
+    values: np.ndarray                # Values, or vocabulary codes for strings
+    present: Optional[np.ndarray]     # Rows that have a value; None for strings (code -1)
+    vocab: Optional[Sequence[Optional[str]]]   # String of each code, for string columns
+    codes: Optional[Dict[str, int]]   # Code of each string, if codes are unique
+
+
+class _Column:
+    """One growable metadata column."""
+
+    def __init__(self, dtype: np.dtype, vocab: Optional[List[str]] = None):
+        self.dtype = dtype
+        self.values = GrowableArray(dtype)
+        if dtype == _STRING:
+            self.present = None
+            self.vocab = list(vocab or [])
+            self.codes = {value: code for code, value in enumerate(self.vocab)}
+        else:
+            self.present = GrowableArray(np.bool_)
+            self.vocab = self.codes = None
+
+    @classmethod
+    def for_value(cls, name: str, sample: Any) -> "_Column":
+        """Create an empty column whose type fits ``sample``."""
+        if isinstance(sample, str):
+            return cls(_STRING)
+        if isinstance(sample, (bool, np.bool_)):
+            return cls(np.dtype(np.bool_))
+        if isinstance(sample, (int, np.integer)):
+            return cls(np.dtype(np.int64))
+        if isinstance(sample, (float, np.floating)):
+            return cls(np.dtype(np.float64))
+        if isinstance(sample, (datetime.date, np.datetime64)):
+            return cls(_DATETIME)
+        raise ValueError(
+            f"Unsupported metadata value for '{name}': {type(sample).__name__}. "
+            "Use str, bool, int, float or a date/datetime."
+        )
+
+    def convert(self, name: str, values: Sequence[Any]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Turn raw values (None = missing) into (values, present) arrays for append()."""
+        if self.dtype == _STRING:
+            codes = np.empty(len(values), dtype=np.int32)
+            for i, value in enumerate(values):
+                if value is None:
+                    codes[i] = -1
+                elif isinstance(value, str):
+                    code = self.codes.get(value)
+                    if code is None:
+                        code = self.codes[value] = len(self.vocab)
+                        self.vocab.append(value)
+                    codes[i] = code
+                else:
+                    raise ValueError(f"Metadata field '{name}' holds strings, got {value!r}.")
+            return codes, None
+
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            present = np.ones(len(values), dtype=np.bool_)
+        else:
+            present = np.array([value is not None for value in values], dtype=np.bool_)
+            if not present.all():
+                fill = np.zeros((), dtype=self.dtype).item()
+                values = [fill if value is None else value for value in values]
+
+        try:
+            raw = np.asarray(values)
+            if self.dtype == _DATETIME:
+                converted = raw.astype(_DATETIME)
+            elif raw.dtype.kind in _ACCEPTED_KINDS[self.dtype.kind]:
+                converted = raw.astype(self.dtype)
+            else:
+                raise TypeError
+            if converted.shape != present.shape:
+                raise TypeError
+        except (TypeError, ValueError):
+            raise ValueError(f"Metadata field '{name}' holds {_TYPE_NAMES[self.dtype.kind]} values.")
+        return converted, present
+
+    def append(self, values: np.ndarray, present: Optional[np.ndarray]) -> None:
+        self.values.extend(values)
+        if self.present is not None:
+            self.present.extend(present)
+
+    def pad(self, n: int) -> None:
+        """Append ``n`` rows without a value."""
+        if self.present is None:
+            self.values.extend(np.full(n, -1, dtype=np.int32))
+        else:
+            self.values.extend(np.zeros(n, dtype=self.dtype))
+            self.present.extend(np.zeros(n, dtype=np.bool_))
+
+    def view(self) -> ColumnView:
+        present = None if self.present is None else self.present.view()
+        return ColumnView(self.values.view(), present, self.vocab, self.codes)
+
+
+class MetadataTable:
+    """
+    Per-row metadata columns, kept row-aligned with a VectorStore.
+
+    Rows added without a column, or with None in it, have no value for it.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, _Column] = {}
+        self.n_rows = 0
+
+    def extend(self, n: int, metadata: Optional[Dict[str, Sequence[Any]]] = None) -> None:
+        """
+        Append ``n`` rows.
+
+        Args:
+            n (int): Number of rows
+            metadata (dict, optional): Column name -> sequence of n values
+
+        Raises:
+            ValueError: If a column has the wrong length, an invalid or
+                reserved name, or values of the wrong type
+        """
+        metadata = metadata or {}
+        converted = {}
+        for name, values in metadata.items():
+            if not isinstance(name, str) or not _FIELD_NAME.fullmatch(name):
+                raise ValueError(f"Invalid metadata field name: {name!r}. Use letters, digits and '_'.")
+            if name in BUILTIN_FIELDS:
+                raise ValueError(f"'{name}' is a built-in filter field and can't be set as metadata.")
+            if len(values) != n:
+                raise ValueError(f"Metadata field '{name}' has {len(values)} values for {n} chunks.")
+            column = self.columns.get(name)
+            if column is None:
+                sample = next((value for value in values if value is not None), None)
+                if sample is None:
+                    continue   # No values yet, so no type either
+                column = _Column.for_value(name, sample)
+                column.pad(self.n_rows)
+            converted[name] = column, column.convert(name, values)
+
+        # Only mutate once every column converted cleanly
+        for name, (column, (values, present)) in converted.items():
+            self.columns.setdefault(name, column).append(values, present)
+        for name, column in self.columns.items():
+            if name not in converted:
+                column.pad(n)
+        self.n_rows += n
+
+    def select(self, positions: np.ndarray) -> "MetadataTable":
+        """New table holding only the given rows, in order (used by compaction)."""
+        table = MetadataTable()
+        for name, column in self.columns.items():
+            selected = _Column(column.dtype, column.vocab)
+            selected.values.extend(column.values.view()[positions])
+            if column.present is not None:
+                selected.present.extend(column.present.view()[positions])
+            table.columns[name] = selected
+        table.n_rows = len(positions)
+        return table
+
+    def freeze(self) -> Dict[str, ColumnView]:
+        """Views of every column for a snapshot; rows appended later stay invisible."""
+        return {name: column.view() for name, column in self.columns.items()}
+
+    def to_columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Arrays to save with storage.write_columns, plus the manifest entry describing them."""
+        arrays, spec = {}, {}
+        for name, column in self.columns.items():
+            arrays[f"meta_{name}"] = column.values.view()
+            if column.present is not None:
+                arrays[f"meta_{name}_present"] = column.present.view()
+            spec[name] = {"dtype": column.dtype.str, "vocab": column.vocab}
+        return arrays, spec
+
+    @classmethod
+    def from_columns(cls, directory: str, spec: Dict[str, Any], n_rows: int) -> "MetadataTable":
+        """Rebuild a table saved with to_columns()."""
+        table = cls()
+        for name, entry in spec.items():
+            column = _Column(np.dtype(entry["dtype"]), entry["vocab"])
+            values, = read_columns(directory, f"meta_{name}")
+            column.values.extend(values)
+            if column.present is not None:
+                present, = read_columns(directory, f"meta_{name}_present")
+                column.present.extend(present)
+            table.columns[name] = column
+        table.n_rows = n_rows
+        return table
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+
+def evaluate(where: Filter, columns: Dict[str, ColumnView], n_rows: int) -> np.ndarray:
+    """
+    Evaluate a filter expression to a boolean mask over rows.
+
+    Args:
+        where (dict): Filter expression (see the module docstring)
+        columns (dict): Field name -> ColumnView
+        n_rows (int): Number of rows
+
+    Returns:
+        np.ndarray: Bool mask, True for rows that match
+
+    Raises:
+        ValueError: If the expression is malformed or compares a field
+            with a value of the wrong type
+    """
+    if not isinstance(where, dict):
+        raise ValueError(f"A filter must be a dict, got {type(where).__name__}.")
+
+    mask = np.ones(n_rows, dtype=np.bool_)
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            if not isinstance(condition, (list, tuple)):
+                raise ValueError(f"{key} takes a list of filters.")
+            parts = [evaluate(part, columns, n_rows) for part in condition]
+            if key == "$and":
+                for part in parts:
+                    mask &= part
+            else:
+                either = np.zeros(n_rows, dtype=np.bool_)
+                for part in parts:
+                    either |= part
+                mask &= either
+        elif key == "$not":
+            mask &= ~evaluate(condition, columns, n_rows)
+        elif key.startswith("$"):
+            raise ValueError(f"Unknown filter operator: '{key}'.")
+        else:
+            column = columns.get(key)
+            if column is None:
+                mask[:] = False   # No row has a value for it
+                continue
+            conditions = condition if isinstance(condition, dict) else {"$eq": condition}
+            for op, operand in conditions.items():
+                mask &= _match(key, column, op, operand)
+    return mask
+
+
+def _match(name: str, column: ColumnView, op: str, operand: Any) -> np.ndarray:
+    """Rows of one column that satisfy one operator."""
+    if op not in _OPERATORS:
+        raise ValueError(f"Unknown filter operator: '{op}'. Supported: {list(_OPERATORS)}")
+    if op in ("$in", "$nin") and (isinstance(operand, (str, bytes)) or not hasattr(operand, "__iter__")):
+        raise ValueError(f"{op} takes a list of values.")
+
+    if column.vocab is not None:
+        hit = _match_strings(name, column, op, operand)
+        return hit & (column.values >= 0)
+
+    values = column.values
+    try:
+        if values.dtype == _DATETIME:
+            operand = np.asarray(list(operand) if op in ("$in", "$nin") else operand).astype(_DATETIME)
+        else:
+            operand = np.asarray(list(operand) if op in ("$in", "$nin") else operand)
+            if operand.dtype.kind not in "biuf":
+                raise TypeError
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Can't compare metadata field '{name}' ({_TYPE_NAMES[values.dtype.kind]}) with {operand!r}."
+        )
+
+    if op == "$in":
+        hit = np.isin(values, operand)
+    elif op == "$nin":
+        hit = ~np.isin(values, operand)
+    else:
+        hit = _COMPARISONS[op](values, operand)
+    return hit if column.present is None else hit & column.present
+
+
+def _match_strings(name: str, column: ColumnView, op: str, operand: Any) -> np.ndarray:
+    wanted = list(operand) if op in ("$in", "$nin") else [operand]
+    if not all(isinstance(value, str) for value in wanted):
+        raise ValueError(f"Metadata field '{name}' holds strings, got {operand!r}.")
+
+    if column.codes is not None and op in ("$eq", "$ne", "$in", "$nin"):
+        # Look the strings up once, then compare integer codes
+        codes = [column.codes[value] for value in wanted if value in column.codes]
+        hit = np.isin(column.values, codes)
+        return ~hit if op in ("$ne", "$nin") else hit
+
+    # Decide per distinct string, then spread over the rows by code
+    if op in ("$in", "$nin"):
+        members = set(wanted)
+        by_code = [value in members for value in column.vocab]
+        if op == "$nin":
+            by_code = [not hit for hit in by_code]
+    else:
+        compare = _COMPARISONS[op]
+        by_code = [value is not None and compare(value, operand) for value in column.vocab]
+    by_code = np.array(by_code + [False], dtype=np.bool_)   # Code -1 -> False
+    return by_code[column.values]
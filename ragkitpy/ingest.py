@@ -0,0 +1,338 @@
+# ragkitpy/ingest.py
+"""
+ingest.py — Staged, overlapped ingestion: load/chunk in worker processes while
+the embedder runs in the main process.
+
+    paths → [process pool: stream_file + chunker] → bounded queue
+          → [main process: embed fixed-size batches] → VectorStore.add
+
+Each document's load and chunk times are reported to ragkitpy.metrics as
+the "load" and "chunk" stages, including when they ran in a worker.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple,
+)
+
+from ragkitpy import metrics
+from ragkitpy.loader import PageOffsets, stream_file
+from ragkitpy.chunker import Chunk, iter_chunks
+
+logger = logging.getLogger(__name__)
+
+
+class IngestStats(NamedTuple):
+    """Summary of one ingestion run."""
+    doc_ids: List[int]
+    documents: int
+    chunks: int
+    seconds: float
+    failed: List[str]   # Paths skipped because they failed to load (see run(skip_failed=True))
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+
+# Turns a stream of text blocks (from loader.stream_file) into chunks
+Chunker = Callable[[Iterable[str]], Iterable[Chunk]]
+
+# Set once per worker process by _init_worker, so the chunker (which may hold
+# a tokenizer) is pickled once per worker instead of once per document
+_worker_chunker: Optional[Chunker] = None
+
+
+def _init_worker(chunker: Chunker) -> None:
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+class _Timed:
+    """Iterator wrapper that adds up the time spent producing items."""
+
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self.seconds = 0.0
+        self.items = 0
+
+    def __iter__(self) -> "_Timed":
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.items += 1
+        return item
+
+
+def _timed_chunks(chunker: Chunker, path: str, pdf_workers: int = 0) -> Tuple[_Timed, _Timed]:
+    """Chunks of a file, plus the timer of its loading (which chunking drives)."""
+    pages = PageOffsets()
+    blocks = _Timed(stream_file(path, pdf_workers=pdf_workers, pages=pages))
+    return blocks, _Timed(_paged(chunker(blocks), pages))
+
+
+def _paged(chunks: Iterable[Chunk], pages: PageOffsets) -> Iterator[Chunk]:
+    """Stamp each chunk with the page it starts on, if the source has pages."""
+    for chunk in chunks:
+        if pages.starts:   # Filled in as far as the chunker has read
+            chunk = Chunk(chunk.text, chunk.start, chunk.end, pages.page_at(chunk.start))
+        yield chunk
+
+
+def _record_document(load_seconds: float, chunk_seconds: float, n_chunks: int) -> None:
+    metrics.record("load", load_seconds, items=1)
+    metrics.record("chunk", chunk_seconds, items=n_chunks)
+
+
+class _DocumentFailed(Exception):
+    """A document's own loading or chunking error, told apart from embedding errors."""
+
+
+def _guarded(chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+    """Yield a document's chunks, raising _DocumentFailed if producing them fails."""
+    try:
+        yield from chunks
+    except Exception as error:
+        raise _DocumentFailed() from error
+
+
+def _reraise(error: Exception) -> Iterator[Chunk]:
+    """Chunks of a document that failed in a worker: raises its error when read."""
+    raise error
+    yield   # Makes this a generator
+
+
+def _load_and_chunk(path: str) -> Tuple[List[Chunk], float, float]:
+    """Worker task: extract a file's text and split it into chunks, timing both."""
+    blocks, chunks = _timed_chunks(_worker_chunker, path)
+    return list(chunks), blocks.seconds, chunks.seconds - blocks.seconds
+
+
+class IngestionEngine:
+    """
+    Ingest many documents into a VectorStore with loading and embedding overlapped.
+
+    Worker processes load and chunk documents ahead of the embedder. At most
+    ``queue_depth`` documents are in flight at once, so peak memory is bounded
+    by the queue depth rather than by the size of the corpus. With
+    ``workers=0`` documents are streamed block by block straight into the
+    embedding batches, so peak memory depends on the batch size, not the
+    file size.
+
+    Args:
+        embedder: Object with an ``embed(List[str]) -> np.ndarray`` method,
+                  e.g. HFEmbedder
+        store (VectorStore): Store that receives the chunks
+        chunk_size (int): Characters per chunk. Default: 500
+        overlap (int): Overlapping characters between chunks. Default: 50
+        workers (int): Loader processes. 0 loads in the calling process. Default: 0
+        batch_size (int): Chunks per embedding call. Default: 256
+        queue_depth (int): Max documents loaded ahead of the embedder. Default: 8
+        chunker (callable, optional): Custom chunker taking an iterable of text
+                  blocks and returning chunks, e.g. chunker.TokenChunker. Must
+                  be picklable when workers > 0. Default: iter_chunks with
+                  chunk_size/overlap
+        publish_interval (float, optional): Seconds between making new chunks
+                  visible to concurrent searches while the run is in
+                  progress (see VectorStore.bulk_write, which stretches it
+                  for large indexes that are copied on publish). None
+                  publishes only at the end. Default: 1.0
+        pdf_workers (int): With ``workers=0``, processes extracting the pages
+                  of each PDF in parallel (see loader.iter_pdf_pages), for
+                  a few large PDFs. Default: 0
+
+    Chunks of PDFs carry the page they start on, which is stored with them
+    (SearchResult.page).
+
+    Example:
+        >>> engine = IngestionEngine(embedder, store, workers=4)
+        >>> stats = engine.run(["a.pdf", "b.pdf", "c.txt"])
+        >>> print(f"{stats.chunks_per_sec:.0f} chunks/s")
+    """
+
+    def __init__(
+        self,
+        embedder,
+        store,
+        chunk_size: int = 500,
+        overlap: int = 50,
+        workers: int = 0,
+        batch_size: int = 256,
+        queue_depth: int = 8,
+        chunker: Optional[Chunker] = None,
+        publish_interval: Optional[float] = 1.0,
+        pdf_workers: int = 0,
+    ):
+        if workers < 0:
+            raise ValueError("workers must be >= 0.")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0.")
+        if queue_depth <= 0:
+            raise ValueError("queue_depth must be greater than 0.")
+
+        self.embedder = embedder
+        self.store = store
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_depth = queue_depth
+        self.chunker = chunker or partial(iter_chunks, chunk_size=chunk_size, overlap=overlap)
+        self.publish_interval = publish_interval
+        self.pdf_workers = pdf_workers
+
+    def run(
+        self,
+        paths: Iterable[str],
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        skip_failed: bool = False,
+    ) -> IngestStats:
+        """
+        Load, chunk, embed and store every document in ``paths``.
+
+        Documents are added in the order given, so doc_ids are deterministic.
+
+        Args:
+            paths (Iterable[str]): Paths to .txt or .pdf files
+            metadata (Sequence[dict], optional): Metadata of each document, in
+                the order of ``paths``. Every chunk of a document gets its
+                fields, for filtered searches (see VectorStore.add).
+            skip_failed (bool): Log documents that fail to load or chunk and
+                carry on without them, instead of raising. Their chunks are
+                removed again and their paths listed in IngestStats.failed.
+                Default: False
+
+        Returns:
+            IngestStats: doc_ids of the documents added plus document/chunk
+                counts and throughput
+
+        Raises:
+            FileNotFoundError: If a file doesn't exist
+            ValueError: If a file type is unsupported or a file has no text
+        """
+        started = time.perf_counter()
+        doc_ids: List[int] = []
+        failed: List[str] = []
+        pending: List[Tuple[Chunk, int, Optional[Dict[str, Any]]]] = []
+        total_chunks = 0
+        doc_metadata = iter(metadata) if metadata is not None else None
+
+        registered: List[int] = []   # Every doc_id added by this run, to undo on failure
+
+        with self.store.bulk_write(publish_every=self.publish_interval):
+            try:
+                for path, chunks in self._load_all(paths):
+                    doc_id = self.store.add_source(path)
+                    registered.append(doc_id)
+                    fields = next(doc_metadata, None) if doc_metadata is not None else None
+                    n_chunks = 0
+                    try:
+                        for chunk in _guarded(chunks) if skip_failed else chunks:
+                            pending.append((chunk, doc_id, fields))
+                            n_chunks += 1
+                            if len(pending) == self.batch_size:
+                                self._embed_and_store(pending)
+                                pending = []
+                    except _DocumentFailed as failure:
+                        error = failure.__cause__
+                        logger.warning("Skipping %s: %s: %s", path, type(error).__name__, error)
+                        pending = [item for item in pending if item[1] != doc_id]
+                        self.store.remove_document(doc_id)   # Drops the chunks already embedded
+                        failed.append(path)
+                        continue
+                    doc_ids.append(doc_id)
+                    total_chunks += n_chunks
+                    logger.info("Loaded %s: %d chunks", path, n_chunks)
+
+                if pending:
+                    self._embed_and_store(pending)
+            except BaseException:
+                # Don't publish documents whose chunks were only partly embedded
+                for doc_id in registered:
+                    if self.store.sources[doc_id] is not None:
+                        self.store.remove_document(doc_id)
+                raise
+
+        stats = IngestStats(doc_ids, len(doc_ids), total_chunks, time.perf_counter() - started, failed)
+        logger.info(
+            "Ingested %d documents (%d chunks) in %.2fs — %.1f docs/s, %.1f chunks/s",
+            stats.documents, stats.chunks, stats.seconds, stats.docs_per_sec, stats.chunks_per_sec,
+        )
+        return stats
+
+    def _load_all(self, paths: Iterable[str]) -> Iterator[Tuple[str, Iterable[Chunk]]]:
+        """Yield (path, chunks) in input order, loading up to queue_depth ahead."""
+        if self.workers == 0:
+            for path in paths:
+                try:
+                    blocks, chunks = _timed_chunks(self.chunker, path, self.pdf_workers)
+                except Exception as error:   # Missing or unsupported file: raised where the chunks are read
+                    yield path, _reraise(error)
+                    continue
+                yield path, chunks
+                # Resumed once the caller has consumed the chunks
+                _record_document(blocks.seconds, chunks.seconds - blocks.seconds, chunks.items)
+            return
+
+        remaining = iter(paths)
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.chunker,)
+        ) as pool:
+            in_flight: Deque = deque(
+                (path, pool.submit(_load_and_chunk, path))
+                for path in islice(remaining, self.queue_depth)
+            )
+            while in_flight:
+                path, future = in_flight.popleft()
+                next_path: Optional[str] = next(remaining, None)
+                if next_path is not None:
+                    in_flight.append((next_path, pool.submit(_load_and_chunk, next_path)))
+                try:
+                    chunks, load_seconds, chunk_seconds = future.result()
+                except Exception as error:   # Raised where the chunks are read, like with workers=0
+                    yield path, _reraise(error)
+                    continue
+                _record_document(load_seconds, chunk_seconds, len(chunks))
+                yield path, chunks
+
+    def _embed_and_store(self, batch: List[Tuple[Chunk, int, Optional[Dict[str, Any]]]]) -> None:
+        texts = [chunk.text for chunk, _, _ in batch]
+        with metrics.span("embed", items=len(texts)):
+            embeddings = self.embedder.embed(texts)
+
+        # Per-document fields -> per-chunk columns (None where a document lacks a field)
+        names = sorted({name for _, _, fields in batch if fields for name in fields})
+        columns = {
+            name: [fields.get(name) if fields else None for _, _, fields in batch]
+            for name in names
+        }
+        self.store.add(
+            embeddings,
+            texts,
+            doc_ids=[doc_id for _, doc_id, _ in batch],
+            offsets=[(chunk.start, chunk.end) for chunk, _, _ in batch],
+            pages=[chunk.page for chunk, _, _ in batch],
+            metadata=columns or None,
+        )
+
+
+def default_workers(n_paths: int) -> int:
+    """Pick a loader process count: none for a single file, else up to one per core."""
+    if n_paths <= 1:
+        return 0
+    return min(n_paths, os.cpu_count() or 1)
@@ -3,7 +3,18 @@
 loader.py — Load text content from TXT and PDF files.
 """
 
+import bisect
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Characters read per block when streaming a text file
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+# Pages extracted per task when a PDF is loaded by several processes
+PDF_PAGES_PER_TASK = 16
 
 
 def load_txt(path: str) -> str:
@@ -12,23 +23,145 @@ def load_txt(path: str) -> str:
         return f.read()
 
 
-def load_pdf(path: str) -> str:
-    """Extract and return text from a .pdf file."""
+def iter_txt(path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+    """Yield a .txt file's content in blocks of up to block_size characters."""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+class PageOffsets:
+    """
+    Where each page starts in a streamed document's text, recorded while the
+    stream is read, to map character offsets (e.g. chunk starts) back to
+    page numbers.
+
+    Example:
+        >>> pages = PageOffsets()
+        >>> chunks = list(iter_chunks(stream_file("report.pdf", pages=pages)))
+        >>> pages.page_at(chunks[-1].start)
+        212
+    """
+
+    def __init__(self):
+        self.starts: List[int] = []    # Offset of each page's first character
+        self.numbers: List[int] = []   # Its 1-based page number (empty pages are skipped)
+
+    def add(self, offset: int, number: int) -> None:
+        self.starts.append(offset)
+        self.numbers.append(number)
+
+    def page_at(self, offset: int) -> int:
+        """1-based page the character at ``offset`` is on (-1 if none was recorded)."""
+        i = bisect.bisect_right(self.starts, offset) - 1
+        return self.numbers[i] if i >= 0 else -1
+
+
+def _pdf_reader(path: str):
     try:
         from pypdf import PdfReader
     except ImportError:
         raise ImportError("pypdf is required for PDF support. Run: pip install pypdf")
-    
-    reader = PdfReader(path)
-    pages = []
-    for page in reader.pages:
-        text = page.extract_text()
+    return PdfReader(path)
+
+
+# Opened once per extraction process by _init_pdf_worker: opening a PDF reads
+# its whole page tree, which would otherwise be repeated for every page range
+_worker_pages = None
+
+
+def _init_pdf_worker(path: str) -> None:
+    global _worker_pages
+    _worker_pages = _pdf_reader(path).pages
+
+
+def _extract_pages(start: int, stop: int) -> List[str]:
+    """Worker task: extract the text of pages start..stop-1."""
+    return [_worker_pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(
+    path: str,
+    workers: int = 0,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) for every page of a .pdf file, in order.
+
+    With ``workers`` > 1, page ranges are extracted by a process pool, each
+    worker opening the file once itself, so a long PDF uses every core
+    instead of one. Pages are still yielded lazily and in order, with at most two
+    ranges per worker extracted ahead of the consumer.
+
+    Args:
+        path (str): Path to the file
+        workers (int): Extraction processes; 0 or 1 extracts in the calling
+            process. Default: 0
+        pages_per_task (int): Pages per worker task. Default: 16
+
+    Returns:
+        Iterator[Tuple[int, str]]: 1-based page number and its text ("" for
+            pages without text)
+
+    Example:
+        >>> for number, text in iter_pdf_pages("manual.pdf", workers=8):
+        ...     print(number, len(text))
+    """
+    reader = _pdf_reader(path)
+    n_pages = len(reader.pages)
+    if workers <= 1 or n_pages <= pages_per_task:
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, page.extract_text() or ""
+        return
+    del reader   # Workers open their own
+
+    ranges = iter(range(0, n_pages, pages_per_task))
+    number = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(path,)) as pool:
+        in_flight: Deque = deque(
+            pool.submit(_extract_pages, lo, min(lo + pages_per_task, n_pages))
+            for lo in islice(ranges, 2 * workers)
+        )
+        while in_flight:
+            texts = in_flight.popleft().result()
+            lo = next(ranges, None)
+            if lo is not None:
+                in_flight.append(pool.submit(_extract_pages, lo, min(lo + pages_per_task, n_pages)))
+            for text in texts:
+                number += 1
+                yield number, text
+
+
+def load_pdf(path: str, workers: int = 0) -> str:
+    """Extract and return text from a .pdf file (workers: see iter_pdf_pages)."""
+    return "\n".join(text for _, text in iter_pdf_pages(path, workers) if text)
+
+
+def iter_pdf(path: str, workers: int = 0, pages: Optional[PageOffsets] = None) -> Iterator[str]:
+    """
+    Yield a .pdf file's text page by page (same text as load_pdf, joined).
+
+    Args:
+        path (str): Path to the file
+        workers (int): Extraction processes (see iter_pdf_pages). Default: 0
+        pages (PageOffsets, optional): Receives the offset of each page as it is yielded
+    """
+    offset = 0
+    for number, text in iter_pdf_pages(path, workers):
         if text:
-            pages.append(text)
-    return "\n".join(pages)
+            if offset:
+                yield "\n"
+                offset += 1
+            if pages is not None:
+                pages.add(offset, number)
+            yield text
+            offset += len(text)
 
 
-def load_file(path: str) -> str:
+def load_file(path: str, pdf_workers: int = 0) -> str:
     """
     Auto-detect file type and load content.
     
@@ -36,6 +169,8 @@ def load_file(path: str) -> str:
     
     Args:
         path (str): Path to the file
+        pdf_workers (int): Processes extracting PDF pages in parallel
+            (see iter_pdf_pages). Default: 0
         
     Returns:
         str: Extracted text content
@@ -44,19 +179,59 @@ def load_file(path: str) -> str:
         FileNotFoundError: If file doesn't exist
         ValueError: If file type is not supported
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"File not found: {path}")
-    
-    ext = os.path.splitext(path)[-1].lower()
-    
     loaders = {
         ".txt": load_txt,
-        ".pdf": load_pdf,
+        ".pdf": lambda p: load_pdf(p, pdf_workers),
     }
-    
+    return _pick_loader(path, loaders)(path)
+
+
+def stream_file(
+    path: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    pdf_workers: int = 0,
+    pages: Optional[PageOffsets] = None,
+) -> Iterator[str]:
+    """
+    Streaming version of load_file(): yields the text in blocks instead of one string.
+
+    Text files are read ``block_size`` characters at a time and PDFs one page
+    at a time, so the whole document never has to sit in memory. Joining the
+    blocks gives exactly what load_file() returns. Feed the result to
+    chunker.iter_chunks().
+
+    Args:
+        path (str): Path to the file
+        block_size (int): Characters per block for text files (default 1M)
+        pdf_workers (int): Processes extracting PDF pages in parallel
+            (see iter_pdf_pages). Default: 0
+        pages (PageOffsets, optional): Receives where each PDF page starts
+            in the text; left empty for text files
+
+    Returns:
+        Iterator[str]: Consecutive blocks of the document text
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file type is not supported
+    """
+    streamers = {
+        ".txt": lambda p: iter_txt(p, block_size),
+        ".pdf": lambda p: iter_pdf(p, pdf_workers, pages),
+    }
+    return _pick_loader(path, streamers)(path)
+
+
+def _pick_loader(path: str, loaders: Dict[str, Callable]) -> Callable:
+    """Validate the path and return the loader registered for its extension."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    ext = os.path.splitext(path)[-1].lower()
+
     if ext not in loaders:
         raise ValueError(
             f"Unsupported file type: '{ext}'. Supported types: {list(loaders.keys())}"
         )
-    
-    return loaders[ext](path)
\ No newline at end of file
+
+    return loaders[ext]
\ No newline at end of file
@@ -0,0 +1,303 @@
+# ragkitpy/metrics.py
+"""
+metrics.py — Per-stage timings, counters and latency histograms.
+
+Every stage of the pipeline runs inside a span that measures its wall time
+and item count and reports it to the registered observers:
+
+    load        Extract one document's text (items: 1 document)
+    chunk       Split it into chunks (items: chunks)
+    model_load  Load an embedding model
+    tokenize    Tokenize texts (ONNXEmbedder) or count their tokens (HFEmbedder)
+    model       Run the model on tokenized texts (ONNXEmbedder)
+    embed       One embedder.embed() call (items: texts)
+    index_add   VectorStore.add() (items: vectors)
+    search      One FAISS search, including rescoring (items: queries)
+    lexical     One BM25 search (items: 1 query)
+    rerank      MMR re-ranking of a candidate pool (items: candidates)
+    query       A pipeline query end to end (items: questions)
+
+The default observer, ``registry``, keeps calls, items, total seconds and
+a latency histogram per stage. Add your own observer to forward events to
+Prometheus, StatsD or a tracer. Progress messages go to the "ragkitpy"
+logger, which is silent unless the application configures logging.
+"""
+
+import bisect
+import cProfile
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Protocol, Tuple
+
+logger = logging.getLogger("ragkitpy")
+logger.addHandler(logging.NullHandler())
+
+
+class StageEvent(NamedTuple):
+    """One timed run of a pipeline stage."""
+    stage: str
+    seconds: float      # Wall time spent in the stage
+    items: int          # Documents, chunks, vectors or queries processed
+    started: float      # Start time as a Unix timestamp, for tracing
+
+
+class Observer(Protocol):
+    """Anything with an on_stage(event) method can observe the pipeline."""
+
+    def on_stage(self, event: StageEvent) -> None:
+        ...
+
+
+# Histogram bucket upper bounds: 1 µs to 100 s, 20 buckets per decade (~12% apart)
+_BOUNDS = [10 ** (e / 20) for e in range(-120, 41)]
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced latency histogram. Percentiles are bucket upper bounds,
+    so they overestimate by at most ~12%, and memory stays constant however
+    many latencies are recorded.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)   # Last bucket: above 100 s
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Latency in seconds below which ``q`` percent of recorded latencies fall."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(_BOUNDS[bucket], self.max) if bucket < len(_BOUNDS) else self.max
+        return self.max
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Non-empty (upper bound in seconds, count) pairs, e.g. for exporting."""
+        bounds = _BOUNDS + [float("inf")]
+        return [(bounds[i], n) for i, n in enumerate(self.counts) if n]
+
+
+class StageStats(NamedTuple):
+    """Aggregated metrics of one stage. Latencies are in seconds."""
+    calls: int
+    items: int
+    seconds: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+
+class MetricsRegistry:
+    """
+    Observer that aggregates stage events in memory. Thread-safe.
+
+    Example:
+        >>> from ragkitpy import metrics
+        >>> rag.query("What is this document about?")
+        >>> metrics.registry.stage("search").p95
+        >>> metrics.registry.snapshot()   # JSON-serializable
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._items: Dict[str, int] = {}
+
+    def on_stage(self, event: StageEvent) -> None:
+        with self._lock:
+            histogram = self._histograms.get(event.stage)
+            if histogram is None:
+                histogram = self._histograms[event.stage] = LatencyHistogram()
+                self._items[event.stage] = 0
+            histogram.record(event.seconds)
+            self._items[event.stage] += event.items
+
+    def stage(self, name: str) -> StageStats:
+        """Metrics of one stage (all zero if it hasn't run)."""
+        with self._lock:
+            histogram = self._histograms.get(name) or LatencyHistogram()
+            return StageStats(
+                histogram.count,
+                self._items.get(name, 0),
+                histogram.total,
+                histogram.percentile(50),
+                histogram.percentile(95),
+                histogram.percentile(99),
+                histogram.max,
+            )
+
+    def histogram(self, name: str) -> Optional[LatencyHistogram]:
+        """The live latency histogram of a stage, or None if it hasn't run."""
+        return self._histograms.get(name)
+
+    @property
+    def stages(self) -> List[str]:
+        with self._lock:
+            return sorted(self._histograms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Every stage's metrics as plain dicts, latencies in milliseconds."""
+        result = {}
+        for name in self.stages:
+            stats = self.stage(name)
+            result[name] = {
+                "calls": stats.calls,
+                "items": stats.items,
+                "seconds": stats.seconds,
+                "items_per_sec": stats.items_per_sec,
+                "p50_ms": stats.p50 * 1000,
+                "p95_ms": stats.p95 * 1000,
+                "p99_ms": stats.p99 * 1000,
+                "max_ms": stats.max * 1000,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._items.clear()
+
+
+registry = MetricsRegistry()
+
+# Replaced as a whole when observers change, so record() reads it without a lock
+_observers: Tuple[Observer, ...] = (registry,)
+_observers_lock = threading.Lock()
+
+
+def add_observer(observer: Observer) -> None:
+    """
+    Send every stage event to ``observer.on_stage(event)`` as well.
+
+    Observers are called synchronously on the thread that ran the stage, so
+    they should be fast. Exceptions they raise are logged and swallowed.
+
+    Example:
+        >>> class Printer:
+        ...     def on_stage(self, event):
+        ...         print(f"{event.stage}: {event.items} in {event.seconds * 1000:.1f} ms")
+        >>> metrics.add_observer(Printer())
+    """
+    global _observers
+    with _observers_lock:
+        _observers = _observers + (observer,)
+
+
+def remove_observer(observer: Observer) -> None:
+    """Stop sending stage events to ``observer`` (no-op if it isn't registered)."""
+    global _observers
+    with _observers_lock:
+        _observers = tuple(o for o in _observers if o is not observer)
+
+
+def record(stage: str, seconds: float, items: int = 0, started: Optional[float] = None) -> None:
+    """Report a stage that was timed elsewhere, e.g. in a worker process."""
+    event = StageEvent(stage, seconds, items, time.time() - seconds if started is None else started)
+    for observer in _observers:
+        try:
+            observer.on_stage(event)
+        except Exception:
+            logger.exception("Metrics observer %r failed", observer)
+
+
+# (profiler, stages or None for all, owning thread) while profile() is active
+_profiling: Optional[Tuple[cProfile.Profile, Optional[frozenset], int]] = None
+
+
+class _ProfilerState(threading.local):
+    active = False   # Nested spans leave the enclosing span's profiler running
+
+
+_profiler_running = _ProfilerState()
+
+
+class span:
+    """
+    Time a block of code as one run of ``stage``.
+
+    Set ``items`` on the span when the count is only known inside the block.
+    Inside profile(), matching spans also run under cProfile.
+
+    Example:
+        >>> with metrics.span("embed", items=len(texts)):
+        ...     vectors = model.encode(texts)
+        >>> with metrics.span("chunk") as s:
+        ...     chunks = chunk_text(text)
+        ...     s.items = len(chunks)
+    """
+
+    __slots__ = ("stage", "items", "_started", "_start", "_profiler")
+
+    def __init__(self, stage: str, items: int = 0):
+        self.stage = stage
+        self.items = items
+        self._profiler: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> "span":
+        profiling = _profiling
+        if (
+            profiling is not None
+            and (profiling[1] is None or self.stage in profiling[1])
+            and profiling[2] == threading.get_ident()
+            and not _profiler_running.active
+        ):
+            self._profiler = profiling[0]
+            _profiler_running.active = True
+            self._profiler.enable()
+        self._started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profiler_running.active = False
+            self._profiler = None
+        record(self.stage, seconds, self.items, self._started)
+
+
+@contextmanager
+def profile(*stages: str) -> Iterator[cProfile.Profile]:
+    """
+    Run cProfile inside the spans of ``stages`` (all stages if none given)
+    while the block runs, to see which functions a slow stage spends its
+    time in. Only spans on the calling thread are profiled.
+
+    Yields:
+        cProfile.Profile: Collects the samples; read it with pstats
+
+    Example:
+        >>> import pstats
+        >>> with metrics.profile("embed", "search") as profiler:
+        ...     rag.query_batch(questions)
+        >>> pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+    """
+    global _profiling
+    if _profiling is not None:
+        raise RuntimeError("profile() is already active.")
+    profiler = cProfile.Profile()
+    _profiling = (profiler, frozenset(stages) or None, threading.get_ident())
+    try:
+        yield profiler
+    finally:
+        _profiling = None
@@ -3,11 +3,31 @@
 pipeline.py — End-to-end RAG pipeline. Glues loader, chunker, embedder, and vectorstore.
 """
 
-from typing import List, Optional, Tuple
-from ragkitpy.loader import load_file
-from ragkitpy.chunker import chunk_text
-from ragkitpy.embedder import HFEmbedder
-from ragkitpy.vectorstore import VectorStore
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from ragkitpy import metrics
+from ragkitpy.chunker import TokenChunker
+from ragkitpy.embedder import Embedder, HFEmbedder
+from ragkitpy.filters import Filter
+from ragkitpy.ingest import IngestStats, IngestionEngine, default_workers
+from ragkitpy.vectorstore import SearchResult, VectorStore
+from ragkitpy.storage import read_manifest
+from ragkitpy.sync import (
+    DEFAULT_PATTERNS, SYNC_FILE, FileState, SyncStats, plan_sync, read_sync_manifest, write_sync_manifest,
+)
+
+logger = logging.getLogger(__name__)
+
+# "dense": embedding search. "lexical": BM25 keyword search.
+# "hybrid": both, fused with reciprocal-rank fusion.
+QUERY_MODES = ("dense", "lexical", "hybrid")
+
+# A HuggingFace Hub model id: "name" or "owner/name"
+_HF_MODEL_ID = re.compile(r"[\w.-]+(?:/[\w.-]+)?")
 
 
 class RAGPipeline:
@@ -22,6 +42,29 @@ class RAGPipeline:
                           Default: 'all-MiniLM-L6-v2' (fast + good quality)
         chunk_size (int): Characters per chunk. Default: 500
         overlap (int): Overlapping characters between chunks. Default: 50
+        chunking (str): "chars" (default) or "tokens". With "tokens", whole
+                          sentences are packed up to chunk_size tokens of the
+                          model's own tokenizer (capped at what the model reads),
+                          and overlap is counted in tokens too.
+        cache_path (str, optional): SQLite file for a persistent embedding cache,
+                          so unchanged chunks aren't re-embedded on re-ingestion
+        index_type (str): Vector index — "flat" (exact, default), "fp16",
+                          "sq8", "pq", "ivf_flat", "ivf_pq" or "hnsw". See VectorStore.
+        rescore (int): With a quantized index, re-rank top_k × rescore
+                          candidates exactly against full-precision vectors
+                          (memory-mapped once saved). Default: 0 (off)
+        embedder (Embedder, optional): Use this embedder instead of building
+                          an HFEmbedder, e.g. ONNXEmbedder or HashingEmbedder
+                          (see embedder.py). model_name and cache_path are
+                          then ignored.
+        metric (str): "l2" (distance, default), "ip" or "cosine". With
+                          "cosine", embeddings are normalized at encode time and
+                          scores are similarities in [-1, 1] that can be
+                          thresholded with min_score.
+
+    Constructing a pipeline is cheap: the embedding model is loaded on the
+    first embed, and a reopened index on the first query. Servers can call
+    warmup() to pay both costs at startup instead.
 
     Example:
         >>> from ragkitpy import RAGPipeline
@@ -37,88 +80,578 @@ class RAGPipeline:
         model_name: str = "all-MiniLM-L6-v2",
         chunk_size: int = 500,
         overlap: int = 50,
+        chunking: str = "chars",
+        cache_path: Optional[str] = None,
+        index_type: str = "flat",
+        metric: str = "l2",
+        rescore: int = 0,
+        embedder: Optional[Embedder] = None,
     ):
+        if chunking not in ("chars", "tokens"):
+            raise ValueError(f"Unknown chunking: '{chunking}'. Use 'chars' or 'tokens'.")
+
         self.chunk_size = chunk_size
         self.overlap = overlap
-        self.embedder = HFEmbedder(model_name)
-        self.store: Optional[VectorStore] = None
-        self._document_loaded = False
+        self.chunking = chunking
+        self.index_type = index_type
+        self.metric = metric
+        self.rescore = rescore
+        if embedder is None:
+            embedder = HFEmbedder(model_name, cache=cache_path, normalize=metric == "cosine")
+        self.embedder = embedder
+        self._store: Optional[VectorStore] = None
+        self._store_directory: Optional[str] = None   # Set by open(), loaded on first use
+        self._store_lock = threading.Lock()
+        self._expected_dim: Optional[int] = None      # Checked once the model is loaded
         self._source_path: Optional[str] = None
+        self._synced: Optional[Dict[str, FileState]] = None   # See sync_directory()
+        self._sync_file: Optional[str] = None                 # Set by open(), read on first use
+        self.last_ingest: Optional[IngestStats] = None
+
+    @property
+    def store(self) -> Optional[VectorStore]:
+        """The vector store, or None before any document is loaded."""
+        if self._store is None and self._store_directory is not None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = VectorStore.load(self._store_directory)
+                    self._store_directory = None
+        return self._store
+
+    @store.setter
+    def store(self, store: Optional[VectorStore]) -> None:
+        self._store = store
+        self._store_directory = None
 
-    def load_document(self, path: str) -> None:
+    def warmup(self) -> None:
         """
-        Load a document, chunk it, embed it, and store in vector index.
+        Load the embedding model and the index now rather than on first use.
+
+        Raises:
+            ValueError: If a reopened index doesn't match the model's embedding dimension
+        """
+        warmup = getattr(self.embedder, "warmup", None)
+        if warmup is not None:
+            warmup()
+        self._check_model()
+        if self.is_ready:
+            self.store.search_batch(self.embedder.embed(["warmup"]), top_k=1)
+
+    def _check_model(self) -> None:
+        """Check a reopened index against the model's embedding dimension (once)."""
+        if self._expected_dim is None:
+            return
+        dim = self.embedder.embedding_dim
+        if dim != self._expected_dim:
+            raise ValueError(
+                f"Embedding dimension mismatch: model produces {dim}, "
+                f"index expects {self._expected_dim}."
+            )
+        self._expected_dim = None
+
+    def load_document(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Load a document, chunk it, embed it, and add it to the vector index.
+
+        Documents accumulate: loading a second file keeps the first one searchable.
 
         Args:
             path (str): Path to a .txt or .pdf file
+            metadata (dict, optional): Fields to filter queries on, e.g.
+                {"tenant": "acme", "year": 2024}; every chunk gets them
 
         Raises:
             FileNotFoundError: If file doesn't exist
             ValueError: If file type is unsupported
         """
-        print(f"\n📄 Loading document: {path}")
+        self.load_documents([path], metadata=None if metadata is None else [metadata])
+        logger.info("RAG pipeline ready: %s", path)
 
-        # Step 1: Load raw text
-        text = load_file(path)
-        print(f"✅ Extracted {len(text)} characters")
+    def add_document(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Add one document to the shared index.
+
+        Args:
+            path (str): Path to a .txt or .pdf file
+            metadata (dict, optional): Fields to filter queries on (see load_document)
 
-        # Step 2: Chunk
-        chunks = chunk_text(text, self.chunk_size, self.overlap)
-        print(f"✅ Split into {len(chunks)} chunks")
+        Returns:
+            int: The document's doc_id
+        """
+        return self.load_documents([path], metadata=None if metadata is None else [metadata])[0]
+
+    def load_documents(
+        self,
+        paths: List[str],
+        batch_size: int = 256,
+        workers: Optional[int] = None,
+        queue_depth: int = 8,
+        metadata: Optional[List[Optional[Dict[str, Any]]]] = None,
+        skip_failed: bool = False,
+    ) -> List[int]:
+        """
+        Load several documents into the shared index.
 
-        # Step 3: Embed
-        print(f"⚙️  Embedding chunks...")
-        embeddings = self.embedder.embed(chunks)
+        Files are loaded and chunked in worker processes while the embedder
+        runs, and chunks from consecutive documents are embedded together in
+        batches of ``batch_size``. Queries from other threads keep working
+        meanwhile and see new chunks as they are published (about once a second).
 
-        # Step 4: Store
-        self.store = VectorStore(dim=embeddings.shape[1])
-        self.store.add(embeddings, chunks)
+        Args:
+            paths (List[str]): Paths to .txt or .pdf files
+            batch_size (int): Number of chunks per embedding call (default: 256)
+            workers (int, optional): Loader processes. Default: one per core
+                                     (none when loading a single file, whose
+                                     PDF pages are then extracted in parallel)
+            queue_depth (int): Max documents loaded ahead of the embedder (default: 8)
+            metadata (List[dict], optional): Fields of each document, in the
+                order of ``paths``, to filter queries on with ``where``
+            skip_failed (bool): Log and skip files that fail to load instead
+                of raising; they are listed in ``last_ingest.failed``.
+                Default: False
 
-        self._document_loaded = True
-        self._source_path = path
-        print(f"\n🚀 RAG pipeline ready! You can now call .query()")
+        Returns:
+            List[int]: doc_id of each document, in the same order as ``paths``
+                (without the skipped ones)
 
-    def query(self, question: str, top_k: int = 3) -> List[str]:
+        Raises:
+            FileNotFoundError: If a file doesn't exist
+            ValueError: If a file type is unsupported or a file has no text
+        """
+        paths = list(paths)
+        if metadata is not None and len(metadata) != len(paths):
+            raise ValueError(f"Got metadata for {len(metadata)} documents but {len(paths)} paths.")
+        self._check_model()
+        if self.store is None:
+            self.store = VectorStore(
+                dim=self.embedder.embedding_dim,
+                index_type=self.index_type,
+                metric=self.metric,
+                rescore=self.rescore,
+            )
+
+        if workers is None:
+            workers = default_workers(len(paths))
+        engine = IngestionEngine(
+            self.embedder,
+            self.store,
+            chunk_size=self.chunk_size,
+            overlap=self.overlap,
+            workers=workers,
+            batch_size=batch_size,
+            queue_depth=queue_depth,
+            chunker=self._token_chunker() if self.chunking == "tokens" else None,
+            # Documents loaded one at a time: spread each PDF's pages over the cores instead
+            pdf_workers=0 if workers else (os.cpu_count() or 1),
+        )
+        self.last_ingest = engine.run(paths, metadata=metadata, skip_failed=skip_failed)
+
+        if paths:
+            self._source_path = paths[-1]
+        return self.last_ingest.doc_ids
+
+    def remove_document(self, document: Union[int, str]) -> int:
+        """
+        Remove a document's chunks from the index, without re-embedding anything.
+
+        Args:
+            document (int or str): The doc_id, or the path it was loaded from
+
+        Returns:
+            int: Number of chunks removed
+
+        Raises:
+            RuntimeError: If no document has been loaded yet
+            ValueError: If the document isn't in the index
+        """
+        self._check_ready()
+        doc_ids = self._resolve_doc_ids(document)
+        if not doc_ids:
+            raise ValueError(f"Document not in index: {document}")
+        if self._synced is not None or self._sync_file is not None:
+            self._synced_files().pop(self.store.sources[doc_ids[0]], None)   # Re-added by the next sync
+        return sum(self.store.remove_document(doc_id) for doc_id in doc_ids)
+
+    def replace_document(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Re-ingest a file that changed on disk, replacing its old chunks.
+
+        The new version is added before the old one is removed, so the
+        document never disappears from query results in between.
+
+        Args:
+            path (str): Path the document was originally loaded from
+            metadata (dict, optional): Fields of the new version (see load_document)
+
+        Returns:
+            int: The new doc_id
+        """
+        old_doc_ids = self._resolve_doc_ids(path) if self.store is not None else []
+        doc_id = self.add_document(path, metadata)
+        for old in old_doc_ids:
+            self.store.remove_document(old)
+        return doc_id
+
+    def sync_directory(
+        self,
+        root: str,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+    ) -> SyncStats:
+        """
+        Bring the index up to date with a directory tree.
+
+        New files are loaded, files whose contents changed are re-ingested
+        (the new version is added before the old one is removed) and deleted
+        files are dropped. Files are compared with a manifest of their size,
+        mtime and SHA-256, saved with the index by save(): a run where
+        nothing changed costs one parallel stat() of the tree, and only
+        files whose size or mtime moved are read and hashed. A file that
+        fails to load is logged and left out of the manifest (keeping its
+        previous version, if any), so the next sync retries it.
+
+        Args:
+            root (str): Directory to sync, walked recursively
+            patterns (Sequence[str]): Glob patterns on file names. Default: *.txt, *.pdf
+            workers (int, optional): Loader processes for the changed files
+                                     (see load_documents)
+            batch_size (int): Number of chunks per embedding call (default: 256)
+
+        Returns:
+            SyncStats: Numbers of added, changed, removed and unchanged files,
+                plus the files that failed to load
+
+        Raises:
+            NotADirectoryError: If root isn't a directory
+
+        Example:
+            >>> rag = RAGPipeline.open("my_index/")
+            >>> stats = rag.sync_directory("docs/")
+            >>> rag.save("my_index/")
+        """
+        started = time.perf_counter()
+        synced = self._synced_files()
+        plan = plan_sync(root, synced, patterns)
+
+        # Also matches documents added by load_documents() under relative paths
+        loaded = self._doc_ids_by_path() if self.store is not None else {}
+        to_load = plan.added + plan.changed
+        failed: List[str] = []
+        if to_load:
+            self.load_documents(to_load, batch_size=batch_size, workers=workers, skip_failed=True)
+            failed = self.last_ingest.failed
+            # Replace the old versions, and added files ingested by an interrupted sync
+            for path in set(to_load).difference(failed):
+                for doc_id in loaded.get(path, ()):
+                    self.store.remove_document(doc_id)
+        for path in plan.removed:
+            for doc_id in loaded.get(path, ()):
+                self.store.remove_document(doc_id)
+            del synced[path]
+        synced.update((path, state) for path, state in plan.states.items() if path not in failed)
+
+        stats = SyncStats(
+            len(set(plan.added).difference(failed)), len(set(plan.changed).difference(failed)),
+            len(plan.removed), plan.unchanged, time.perf_counter() - started, failed,
+        )
+        logger.info(
+            "Synced %s: %d added, %d changed, %d removed, %d unchanged, %d failed in %.2fs",
+            root, stats.added, stats.changed, stats.removed, stats.unchanged, len(stats.failed),
+            stats.seconds,
+        )
+        return stats
+
+    def _synced_files(self) -> Dict[str, FileState]:
+        """The sync manifest, read from a reopened index on first use."""
+        if self._synced is None:
+            self._synced = read_sync_manifest(self._sync_file) if self._sync_file else {}
+            self._sync_file = None
+        return self._synced
+
+    def _resolve_doc_ids(self, document: Union[int, str]) -> List[int]:
+        if isinstance(document, int):
+            if 0 <= document < len(self.store.sources) and self.store.sources[document] is not None:
+                return [document]
+            return []
+        return self._doc_ids_by_path().get(os.path.abspath(document), [])
+
+    def _doc_ids_by_path(self) -> Dict[str, List[int]]:
+        """doc_ids of the documents still indexed, by absolute source path."""
+        by_path: Dict[str, List[int]] = {}
+        for doc_id, source in enumerate(self.store.sources):
+            if source is not None:   # Relative paths resolve against the current directory
+                by_path.setdefault(os.path.abspath(source), []).append(doc_id)
+        return by_path
+
+    @property
+    def model_name(self) -> str:
+        """Name of the embedding model, as recorded in saved indexes."""
+        return getattr(self.embedder, "model_name", type(self.embedder).__name__)
+
+    def _token_chunker(self) -> TokenChunker:
+        if not hasattr(self.embedder, "tokenizer") or not hasattr(self.embedder, "max_tokens"):
+            raise ValueError(
+                f"chunking='tokens' needs an embedder with a tokenizer; {self.model_name} has none."
+            )
+        return TokenChunker(
+            self.embedder.tokenizer,
+            max_tokens=min(self.chunk_size, self.embedder.max_tokens),
+            overlap_tokens=self.overlap,
+        )
+
+    def query(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        mode: str = "dense",
+        where: Optional[Filter] = None,
+        diversity: Optional[float] = None,
+    ) -> List[str]:
         """
         Retrieve the most relevant chunks for a given question.
 
         Args:
             question (str): Your natural language question
             top_k (int): Number of relevant chunks to return (default: 3)
+            min_score (float, optional): Only return chunks with at least this
+                similarity. Needs metric="cosine" or "ip" and mode="dense".
+            mode (str): "dense" (embeddings, default), "lexical" (BM25 keywords)
+                or "hybrid" (both, fused with reciprocal-rank fusion). Hybrid
+                helps with exact identifiers like error codes and SKUs.
+            where (dict, optional): Only consider chunks whose metadata
+                matches, e.g. {"tenant": "acme", "year": {"$gte": 2023}}.
+                The filter is applied inside the search, so top_k results
+                come from the matching chunks. See filters.py.
+            diversity (float, optional): Re-rank a larger candidate pool with
+                maximal marginal relevance, from 0 (relevance only) to 1
+                (diversity only), and drop chunks overlapping an already
+                returned one. Only with mode="dense" and without min_score.
 
         Returns:
             List[str]: Top-k most relevant text chunks from the document
 
         Raises:
             RuntimeError: If no document has been loaded yet
-            ValueError: If question is empty
+            ValueError: If question is empty or mode is unknown
+        """
+        return [result.chunk for result in self._retrieve(question, top_k, min_score, mode, where, diversity)]
+
+    def query_with_scores(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        mode: str = "dense",
+        where: Optional[Filter] = None,
+        diversity: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Same as query() but returns chunks with their similarity scores.
+
+        Returns:
+            List[Tuple[str, float]]: List of (chunk, score) pairs. With the
+                                     default "l2" metric the score is a distance
+                                     (lower = more similar); with "cosine" or
+                                     "ip" it is a similarity (higher = more similar).
+                                     Lexical and hybrid scores are BM25 and RRF
+                                     scores (higher = more relevant).
+        """
+        return [
+            (result.chunk, result.score)
+            for result in self._retrieve(question, top_k, min_score, mode, where, diversity)
+        ]
+
+    def query_batch(
+        self,
+        questions: List[str],
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[List[str]]:
+        """
+        Answer many questions with one batched encode and one FAISS search.
+
+        Much faster than calling query() in a loop for evaluation jobs.
+
+        Args:
+            questions (List[str]): Natural language questions
+            top_k (int): Number of relevant chunks per question (default: 3)
+            min_score (float, optional): Similarity cut-off ("cosine"/"ip" only)
+            where (dict, optional): Metadata filter for every question (see query())
+
+        Returns:
+            List[List[str]]: Top-k chunks for each question, in input order
+
+        Raises:
+            RuntimeError: If no document has been loaded yet
+            ValueError: If the list or any question is empty
         """
         self._check_ready()
 
-        if not question or not question.strip():
+        if not questions:
+            raise ValueError("Questions list cannot be empty.")
+        if any(not q or not q.strip() for q in questions):
             raise ValueError("Question cannot be empty.")
 
-        query_vector = self.embedder.embed_single(question)
-        return self.store.search(query_vector, top_k=top_k)
+        self._check_model()
+        with metrics.span("query", items=len(questions)):
+            with metrics.span("embed", items=len(questions)):
+                query_vectors = self.embedder.embed(questions)
+            return [
+                [chunk for chunk, _ in hits]
+                for hits in self.store.search_batch(
+                    query_vectors, top_k=top_k, min_score=min_score, where=where
+                )
+            ]
 
-    def query_with_scores(self, question: str, top_k: int = 3) -> List[Tuple[str, float]]:
+    def query_with_provenance(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        mode: str = "dense",
+        where: Optional[Filter] = None,
+        diversity: Optional[float] = None,
+    ) -> List[SearchResult]:
         """
-        Same as query() but returns chunks with their similarity scores.
+        Same as query_with_scores() but each result also says where it came from.
 
         Returns:
-            List[Tuple[str, float]]: List of (chunk, distance) pairs.
-                                     Lower distance = more similar.
+            List[SearchResult]: (chunk, score, doc_id, source, start, end) tuples,
+                                where start/end is the chunk's character span
+                                in the source document.
         """
+        return self._retrieve(question, top_k, min_score, mode, where, diversity)
+
+    def _retrieve(
+        self,
+        question: str,
+        top_k: int,
+        min_score: Optional[float],
+        mode: str,
+        where: Optional[Filter] = None,
+        diversity: Optional[float] = None,
+    ) -> List[SearchResult]:
         self._check_ready()
 
         if not question or not question.strip():
             raise ValueError("Question cannot be empty.")
+        if mode not in QUERY_MODES:
+            raise ValueError(f"Unknown mode: '{mode}'. Supported modes: {list(QUERY_MODES)}")
+        if min_score is not None and mode != "dense":
+            raise ValueError("min_score only applies to mode='dense'.")
+        if diversity is not None and (mode != "dense" or min_score is not None):
+            raise ValueError("diversity only applies to mode='dense' without min_score.")
+
+        if mode != "lexical":
+            self._check_model()
+        with metrics.span("query", items=1):
+            if mode == "lexical":
+                return self.store.search_lexical(question, top_k=top_k, where=where)
+            with metrics.span("embed", items=1):
+                query_vector = self.embedder.embed_single(question)
+            if mode == "hybrid":
+                return self.store.search_hybrid(query_vector, question, top_k=top_k, where=where)
+            if diversity is not None:
+                return self.store.search_diverse(query_vector, top_k=top_k, diversity=diversity, where=where)
+            return self.store.search_with_provenance(
+                query_vector, top_k=top_k, min_score=min_score, where=where
+            )
+
+    def save(self, directory: str) -> None:
+        """
+        Save the loaded index to a directory so it can be reopened with open().
 
-        query_vector = self.embedder.embed_single(question)
-        return self.store.search_with_scores(query_vector, top_k=top_k)
+        Args:
+            directory (str): Target directory (created if missing)
+
+        An index kept in sync with a directory is saved even once every file
+        has been removed, so that its sync manifest stays current.
+
+        Raises:
+            RuntimeError: If no document has been loaded yet
+        """
+        synced = self._synced is not None or self._sync_file is not None
+        if not (synced and self.store is not None):
+            self._check_ready()
+        self.store.save(directory, metadata={
+            "model_name": self.model_name,
+            "chunk_size": self.chunk_size,
+            "overlap": self.overlap,
+            "chunking": self.chunking,
+        })
+        if synced:
+            write_sync_manifest(os.path.join(directory, SYNC_FILE), self._synced_files())
+
+    @classmethod
+    def open(
+        cls,
+        directory: str,
+        model_name: Optional[str] = None,
+        embedder: Optional[Embedder] = None,
+    ) -> "RAGPipeline":
+        """
+        Reopen a pipeline saved with save() without re-embedding anything.
+
+        Args:
+            directory (str): Directory written by save()
+            model_name (str, optional): Expected embedding model. Defaults to the
+                                        model recorded in the manifest.
+            embedder (Embedder, optional): The embedder the index was built
+                                        with, if it wasn't an HFEmbedder
+
+        The embedding model and the index itself are loaded on first use
+        (or by warmup()), so opening is fast.
+
+        Returns:
+            RAGPipeline: A ready-to-query pipeline
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest
+            ValueError: If the model doesn't match the manifest, or no
+                        embedder is given for an index that wasn't built
+                        with an HFEmbedder. A mismatched embedding
+                        dimension is reported when the model loads.
+
+        Example:
+            >>> rag = RAGPipeline.open("my_index/")
+            >>> rag.query("What is this document about?")
+        """
+        manifest = read_manifest(directory)
+
+        if embedder is not None:
+            model_name = getattr(embedder, "model_name", type(embedder).__name__)
+        if model_name is not None and model_name != manifest["model_name"]:
+            raise ValueError(
+                f"Index was built with model '{manifest['model_name']}', not '{model_name}'."
+            )
+        built_with = manifest["model_name"]
+        if embedder is None and not (_HF_MODEL_ID.fullmatch(built_with) or os.path.isdir(built_with)):
+            raise ValueError(
+                f"Index was built with '{built_with}', which isn't a HuggingFace model: "
+                f"pass the matching embedder, e.g. RAGPipeline.open(directory, embedder=...)."
+            )
+
+        rag = cls(
+            model_name=manifest["model_name"],
+            chunk_size=manifest["chunk_size"],
+            overlap=manifest["overlap"],
+            chunking=manifest.get("chunking", "chars"),   # Not recorded by early saves
+            index_type=manifest["index"]["type"],
+            metric=manifest["metric"],
+            rescore=manifest["index"].get("rescore", 0),
+            embedder=embedder,
+        )
+        rag._expected_dim = manifest["dim"]
+        rag._store_directory = directory
+        rag._sync_file = os.path.join(directory, SYNC_FILE)
+        rag._source_path = manifest["sources"][-1] if manifest["sources"] else None
+        return rag
 
     def _check_ready(self) -> None:
-        if not self._document_loaded or self.store is None:
+        if not self.is_ready:
             raise RuntimeError(
                 "No document loaded. Call load_document('path/to/file') first."
             )
@@ -126,13 +659,19 @@ class RAGPipeline:
     @property
     def is_ready(self) -> bool:
         """Returns True if a document has been loaded and pipeline is ready."""
-        return self._document_loaded
+        store = self.store
+        return store is not None and store.total_chunks > 0
 
     @property
     def source(self) -> Optional[str]:
-        """Returns path of the loaded document."""
+        """Returns path of the most recently loaded document."""
         return self._source_path
 
+    @property
+    def sources(self) -> List[Optional[str]]:
+        """Returns paths of all loaded documents, indexed by doc_id (None if removed)."""
+        return list(self.store.sources) if self.store is not None else []
+
     def __repr__(self):
-        status = f"source='{self._source_path}'" if self._document_loaded else "no document loaded"
-        return f"RAGPipeline(model='{self.embedder.model_name}', {status})"
\ No newline at end of file
+        status = f"documents={len(self.sources)}" if self.is_ready else "no document loaded"
+        return f"RAGPipeline(model='{self.model_name}', {status})"
\ No newline at end of file
@@ -0,0 +1,148 @@
+# ragkitpy/retriever.py
+"""
+retriever.py — Ranking utilities that combine or re-order search results.
+"""
+
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[np.ndarray],
+    k: int = 60,
+    top_k: int = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse several rankings of the same ids with reciprocal-rank fusion (RRF).
+
+    Each id scores ``sum(1 / (k + rank))`` over the rankings it appears in
+    (rank starting at 1). RRF only uses positions, so rankings whose scores
+    live on different scales — BM25 and cosine, say — fuse without tuning.
+
+    Args:
+        rankings (Sequence[np.ndarray]): 1D arrays of ids, best first. Negative
+            ids (FAISS's "no result") are ignored.
+        k (int): Damping constant; larger values flatten the rank weights. Default: 60
+        top_k (int): Number of fused ids to return. Default: 10
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (fused scores, ids), best first
+
+    Example:
+        >>> scores, ids = reciprocal_rank_fusion([dense_rows, bm25_rows], top_k=5)
+    """
+    ids, weights = [], []
+    for ranking in rankings:
+        ranking = np.asarray(ranking, dtype=np.int64)
+        ranks = np.flatnonzero(ranking >= 0)
+        ids.append(ranking[ranks])
+        weights.append(1.0 / (k + 1 + ranks))
+
+    if not ids:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    unique, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+    scores = np.bincount(inverse, weights=np.concatenate(weights))
+    order = np.lexsort((unique, -scores))[:top_k]   # Ties broken by id
+    return scores[order], unique[order]
+
+
+def maximal_marginal_relevance(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    top_k: int,
+    diversity: float = 0.5,
+    exclude: Optional[Callable[[int], np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Pick a relevant but non-redundant subset of candidates with maximal
+    marginal relevance (MMR).
+
+    Each step picks the candidate maximizing
+    ``(1 - diversity) * sim(query, c) - diversity * max sim(c, picked)``,
+    with cosine similarities. Only the similarity rows of picked candidates
+    are ever needed, so each of the top_k steps is one matrix-vector product
+    and a few vector operations over the pool: a pool of a few hundred
+    takes a fraction of a millisecond.
+
+    Args:
+        query (np.ndarray): 1D query vector
+        candidates (np.ndarray): 2D array, one candidate vector per row
+        top_k (int): Number of candidates to pick
+        diversity (float): 0 ranks by relevance alone; 1 only avoids
+            redundancy. Default: 0.5
+        exclude (callable, optional): Called with each picked position;
+            returns a bool mask of candidates to drop from the pool along
+            with it, e.g. chunk_neighbours(). May leave fewer than top_k picks.
+
+    Returns:
+        np.ndarray: Positions of the picked candidates, in pick order
+
+    Example:
+        >>> picked = maximal_marginal_relevance(query, vectors, top_k=5, diversity=0.3)
+    """
+    if not 0.0 <= diversity <= 1.0:
+        raise ValueError("diversity must be between 0 and 1.")
+    candidates = np.asarray(candidates, dtype=np.float32)
+    n = len(candidates)
+    top_k = min(top_k, n)
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    unit = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query, dtype=np.float32).ravel()
+    relevance = unit @ (query / max(float(np.linalg.norm(query)), 1e-12))
+
+    gain = (1.0 - diversity) * relevance
+    redundancy = np.full(n, -np.inf, dtype=np.float32)   # Max similarity to any pick
+    available = np.ones(n, dtype=np.bool_)
+    picked = []
+    for _ in range(top_k):
+        score = gain - diversity * redundancy if picked else gain.copy()
+        score[~available] = -np.inf
+        best = int(np.argmax(score))
+        if not available[best]:
+            break   # Pool exhausted by exclusions
+        picked.append(best)
+        available[best] = False
+        if exclude is not None:
+            available &= ~exclude(best)
+        np.maximum(redundancy, unit @ unit[best], out=redundancy)
+    return np.asarray(picked, dtype=np.int64)
+
+
+def chunk_neighbours(
+    doc_ids: np.ndarray,
+    spans: np.ndarray,
+    max_gap: int = 0,
+) -> Callable[[int], np.ndarray]:
+    """
+    Build an ``exclude`` function for maximal_marginal_relevance() that
+    collapses neighbouring chunks: picking a chunk drops the chunks of the
+    same document whose character spans overlap it or are at most
+    ``max_gap`` characters away — as consecutive chunks from
+    chunk_text(overlap > 0) always are.
+
+    Args:
+        doc_ids (np.ndarray): doc_id of each candidate (-1 = unknown, never a neighbour)
+        spans (np.ndarray): (n, 2) array of (start, end) character spans
+        max_gap (int): Largest gap between spans that still counts. Default: 0
+
+    Returns:
+        callable: position -> bool mask of that candidate's neighbours
+    """
+    doc_ids = np.asarray(doc_ids)
+    spans = np.asarray(spans).reshape(-1, 2)
+    starts, ends = spans[:, 0], spans[:, 1]
+
+    def neighbours(i: int) -> np.ndarray:
+        if doc_ids[i] < 0:
+            return np.zeros(len(doc_ids), dtype=np.bool_)
+        return (
+            (doc_ids == doc_ids[i])
+            & (starts <= ends[i] + max_gap)
+            & (starts[i] <= ends + max_gap)
+        )
+
+    return neighbours
@@ -0,0 +1,315 @@
+# ragkitpy/serving.py
+"""
+serving.py — asyncio front end that micro-batches concurrent queries.
+
+Each awaiting caller only enqueues its question. A scheduler task gathers
+whatever has queued up (up to max_batch_size, waiting at most max_wait_ms
+for stragglers) and answers the whole batch with one encode and one FAISS
+search in a worker thread, so the event loop never blocks on the model or
+on loading a reopened index.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ragkitpy import metrics
+from ragkitpy.filters import Filter
+from ragkitpy.pipeline import QUERY_MODES
+
+
+_MIN_SCORE_ERROR = "min_score needs mode='dense' and a similarity metric ('ip' or 'cosine')."
+
+
+class ServingStats(NamedTuple):
+    """Counters describing how queries were batched."""
+    queries: int            # Queries answered
+    batches: int            # Batches run
+    max_batch_size: int     # Largest batch run so far
+    queue_depth: int        # Queries waiting right now
+    max_queue_depth: int    # Most queries ever waiting at once
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.queries / self.batches if self.batches else 0.0
+
+
+class _Request(NamedTuple):
+    question: str
+    top_k: int
+    min_score: Optional[float]
+    mode: str
+    where: Optional[Filter]
+    future: asyncio.Future
+
+
+def _filter_key(where: Any) -> Hashable:
+    """
+    Hashable form of a filter for grouping queries. Values keep their type,
+    so a date and its ISO string, or True and 1, are different filters.
+
+    Raises:
+        TypeError: If the filter holds an unhashable value
+    """
+    if isinstance(where, dict):
+        return dict, frozenset((key, _filter_key(value)) for key, value in where.items())
+    if isinstance(where, (list, tuple)):
+        return type(where), tuple(_filter_key(value) for value in where)
+    return type(where), where
+
+
+class AsyncRAGPipeline:
+    """
+    Serve a loaded RAGPipeline from asyncio code with dynamic micro-batching.
+
+    Under concurrent load, queries that arrive together share one batched
+    encode and one multi-row search, which raises throughput and keeps tail
+    latency flat. A lone query waits at most ``max_wait_ms`` extra.
+
+    Args:
+        pipeline (RAGPipeline): Pipeline with documents already loaded
+        max_batch_size (int): Most queries answered per batch. Default: 64
+        max_wait_ms (float): How long the first query of a batch waits for
+                             others to join. Default: 2.0
+
+    Example:
+        >>> rag = RAGPipeline()
+        >>> rag.load_documents(paths)
+        >>> async with AsyncRAGPipeline(rag) as server:
+        ...     await server.warmup()
+        ...     chunks = await server.query("What is RAG?")
+        ...     print(server.stats)
+    """
+
+    def __init__(self, pipeline, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be greater than 0.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0.")
+
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[_Request] = []
+        self._has_work: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._scheduler: Optional[asyncio.Task] = None
+        # One thread: batches run one at a time, and the next batch fills meanwhile
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ragkitpy-serving")
+        self._queries = 0
+        self._batches = 0
+        self._max_batch = 0
+        self._max_depth = 0
+
+    async def query(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        mode: str = "dense",
+        where: Optional[Filter] = None,
+    ) -> List[str]:
+        """
+        Retrieve the most relevant chunks for a question (see RAGPipeline.query).
+
+        Returns:
+            List[str]: Top-k most relevant text chunks
+        """
+        return [
+            chunk for chunk, _ in await self.query_with_scores(question, top_k, min_score, mode, where)
+        ]
+
+    async def query_with_scores(
+        self,
+        question: str,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        mode: str = "dense",
+        where: Optional[Filter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Same as query() but returns (chunk, score) pairs (see RAGPipeline.query_with_scores).
+
+        Raises:
+            RuntimeError: If the pipeline has no documents loaded or was closed
+            ValueError: If the question is empty or the arguments are invalid
+        """
+        # Checks that need the index (which a reopened pipeline loads lazily)
+        # run in the worker thread, so they never block the event loop
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty.")
+        if mode not in QUERY_MODES:
+            raise ValueError(f"Unknown mode: '{mode}'. Supported modes: {list(QUERY_MODES)}")
+        if min_score is not None and mode != "dense":
+            raise ValueError(_MIN_SCORE_ERROR)
+        if self._executor is None:
+            raise RuntimeError("AsyncRAGPipeline is closed.")
+
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_Request(question, top_k, min_score, mode, where, future))
+        self._max_depth = max(self._max_depth, len(self._pending))
+        self._has_work.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def warmup(self) -> None:
+        """Load the model and index in the worker thread (see RAGPipeline.warmup)."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.pipeline.warmup)
+
+    @property
+    def stats(self) -> ServingStats:
+        """Batching counters: queries, batches, batch sizes and queue depth."""
+        return ServingStats(
+            self._queries, self._batches, self._max_batch, len(self._pending), self._max_depth
+        )
+
+    async def close(self) -> None:
+        """Stop the scheduler, failing queries still waiting, and release the worker thread."""
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            try:
+                await self._scheduler
+            except asyncio.CancelledError:
+                pass
+            self._scheduler = None
+        for request in self._pending:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("AsyncRAGPipeline is closed."))
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "AsyncRAGPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _start(self) -> None:
+        """Start the scheduler task on the running loop, on first use."""
+        if self._scheduler is None:
+            self._has_work = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            self._scheduler = asyncio.get_running_loop().create_task(self._schedule())
+
+    async def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_work.wait()
+            if len(self._pending) < self.max_batch_size and self.max_wait > 0:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            if not self._pending:
+                self._has_work.clear()
+            batch = [request for request in batch if not request.future.cancelled()]
+            if not batch:
+                continue
+
+            try:
+                results = await loop.run_in_executor(self._executor, self._run_batch, batch)
+            except Exception as error:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(error)
+                continue
+
+            for request, result in zip(batch, results):
+                if request.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
+            self._queries += len(batch)
+            self._batches += 1
+            self._max_batch = max(self._max_batch, len(batch))
+
+    def _run_batch(self, batch: List[_Request]) -> List[Any]:
+        """
+        Worker thread: one encode and one search for the whole batch (one per
+        distinct filter). Each result is a hit list, or the ValueError that
+        the query's filter raised.
+        """
+        with metrics.span("query", items=len(batch)):
+            return self._answer(batch)
+
+    def _answer(self, batch: List[_Request]) -> List[Any]:
+        if not self.pipeline.is_ready:   # Loads a reopened index on first use
+            raise RuntimeError("No document loaded. Call load_document('path/to/file') first.")
+        self.pipeline._check_model()
+        store = self.pipeline.store
+        results: List[Any] = [None] * len(batch)
+        if not store.higher_is_better:
+            for i, request in enumerate(batch):
+                if request.min_score is not None:
+                    results[i] = ValueError(_MIN_SCORE_ERROR)
+
+        encoded = [
+            i for i, request in enumerate(batch) if request.mode != "lexical" and results[i] is None
+        ]
+        vectors = None
+        if encoded:
+            with metrics.span("embed", items=len(encoded)):
+                vectors = self.pipeline.embedder.embed([batch[i].question for i in encoded])
+        vector_of = dict(zip(encoded, range(len(encoded))))
+
+        # Dense queries share one search per distinct filter
+        groups: Dict[Hashable, List[int]] = {}
+        for i in encoded:
+            if batch[i].mode == "dense":
+                try:
+                    key = _filter_key(batch[i].where)
+                    hash(key)
+                except TypeError:   # Can't tell whether it equals another filter: search alone
+                    key = ("unbatched", i)
+                groups.setdefault(key, []).append(i)
+        for dense in groups.values():
+            top_k = max(batch[i].top_k for i in dense)
+            try:
+                hits = store.search_batch(
+                    vectors[[vector_of[i] for i in dense]], top_k=top_k, where=batch[dense[0]].where
+                )
+            except ValueError as error:   # An invalid filter fails only the queries that sent it
+                for i in dense:
+                    results[i] = error
+                continue
+            for i, pairs in zip(dense, hits):
+                request = batch[i]
+                pairs = pairs[:request.top_k]
+                if request.min_score is not None:
+                    pairs = [(chunk, score) for chunk, score in pairs if score >= request.min_score]
+                results[i] = pairs
+
+        for i, request in enumerate(batch):
+            try:
+                if request.mode == "lexical":
+                    found = store.search_lexical(request.question, top_k=request.top_k, where=request.where)
+                elif request.mode == "hybrid":
+                    found = store.search_hybrid(
+                        np.asarray(vectors[vector_of[i]]), request.question,
+                        top_k=request.top_k, where=request.where,
+                    )
+                else:
+                    continue
+            except ValueError as error:
+                results[i] = error
+                continue
+            results[i] = [(result.chunk, result.score) for result in found]
+        return results
+
+    def __repr__(self):
+        return (
+            f"AsyncRAGPipeline(max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:g}, queue_depth={len(self._pending)})"
+        )
@@ -0,0 +1,369 @@
+# ragkitpy/sharded.py
+"""
+sharded.py — Vector store partitioned across shards and searched in parallel.
+
+Vectors are dealt round-robin to N ordinary VectorStores. Saved to disk,
+each shard gets its own sub-directory; ShardedVectorStore.load(..., workers=W)
+then serves the shards from W worker processes that memory-map their FAISS
+indexes and chunk texts, so the corpus doesn't have to fit in one process
+and the page cache is shared. A query is sent to every worker at once and
+the per-shard top-k lists are merged into the global top-k.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ragkitpy import metrics, storage
+from ragkitpy.filters import Filter
+from ragkitpy.vectorstore import VectorStore
+
+logger = logging.getLogger(__name__)
+
+SHARD_DIR = "shard_{:03d}"
+
+Hits = List[Tuple[str, float]]
+
+
+def _merge_top_k(per_shard: Sequence[Hits], top_k: int, higher_is_better: bool) -> Hits:
+    """Merge per-shard result lists (each already sorted best-first) into the global top-k."""
+    merged = heapq.merge(*per_shard, key=lambda hit: hit[1], reverse=higher_is_better)
+    return list(islice(merged, top_k))
+
+
+def _search_shards(
+    shards: Sequence[VectorStore],
+    queries: np.ndarray,
+    top_k: int,
+    min_score: Optional[float],
+    where: Optional[Filter],
+    higher_is_better: bool,
+) -> List[Hits]:
+    """Search every non-empty shard and merge, one hit list per query."""
+    per_shard = [
+        shard.search_batch(queries, top_k, min_score, where) for shard in shards if shard.total_chunks
+    ]
+    return [
+        _merge_top_k([hits[q] for hits in per_shard], top_k, higher_is_better)
+        for q in range(len(queries))
+    ]
+
+
+def _serve_shards(directories: List[str], omp_threads: int, higher_is_better: bool, conn) -> None:
+    """Worker process: load a few shards, then answer search requests until told to stop."""
+    import faiss
+    faiss.omp_set_num_threads(omp_threads)
+    try:
+        shards = [VectorStore.load(directory, mmap=True) for directory in directories]
+    except Exception as error:
+        conn.send(("error", error))
+        return
+    conn.send(("ready", sum(shard.total_chunks for shard in shards)))
+
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        queries, top_k, min_score, where = request
+        try:
+            conn.send(("ok", _search_shards(shards, queries, top_k, min_score, where, higher_is_better)))
+        except Exception as error:
+            conn.send(("error", error))
+
+
+class ShardedVectorStore:
+    """
+    Vector store split into shards, with the add/search interface of VectorStore.
+
+    Built in-process: add() deals vectors round-robin to the shards, and
+    searches run over each shard in turn. Save it and reopen it with
+    ``load(directory, workers=W)`` to serve the shards from W worker
+    processes that search in parallel.
+
+    Args:
+        dim (int): Dimension of the embedding vectors
+        n_shards (int): Number of shards. Default: 4
+        metric (str): "l2", "ip" or "cosine" (see VectorStore). Default: "l2"
+        **options: Passed to every shard's VectorStore, e.g. index_type="hnsw"
+
+    Example:
+        >>> store = ShardedVectorStore(dim=384, n_shards=64, index_type="hnsw")
+        >>> store.add(embeddings, chunks)
+        >>> store.save("sharded_index/")
+
+        >>> # Worker processes use "spawn": call this under if __name__ == "__main__"
+        >>> with ShardedVectorStore.load("sharded_index/", workers=64) as served:
+        ...     results = served.search(query_embedding, top_k=5)
+    """
+
+    def __init__(self, dim: int, n_shards: int = 4, metric: str = "l2", **options: Any):
+        if n_shards <= 0:
+            raise ValueError("n_shards must be greater than 0.")
+
+        self.dim = dim
+        self.n_shards = n_shards
+        self.metric = metric
+        self.options = options
+        self.shards: Optional[List[VectorStore]] = [
+            VectorStore(dim, metric=metric, **options) for _ in range(n_shards)
+        ]
+        self.sources: List[Optional[str]] = []
+        self._next_row = 0
+        # Worker processes, when served from disk: (process, connection) pairs
+        self._workers: List[Tuple[Any, Any]] = []
+        self._served_chunks = 0
+        self._fan_out_lock = threading.Lock()
+
+    @property
+    def higher_is_better(self) -> bool:
+        """True if scores are similarities ("ip", "cosine"), False for L2 distances."""
+        return self.metric != "l2"
+
+    def add_source(self, source: str) -> int:
+        """Register a source document on every shard and return its doc_id."""
+        self._check_writable()
+        self.sources.append(source)
+        for shard in self.shards:
+            shard.add_source(source)
+        return len(self.sources) - 1
+
+    def add(
+        self,
+        embeddings: np.ndarray,
+        chunks: List[str],
+        doc_ids: Optional[Sequence[int]] = None,
+        offsets: Optional[Sequence[Tuple[int, int]]] = None,
+        metadata: Optional[Dict[str, Sequence[Any]]] = None,
+        pages: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        Add embeddings and their chunks, dealing them round-robin across shards.
+
+        Args:
+            embeddings (np.ndarray): 2D array of shape (n, dim)
+            chunks (List[str]): Original text chunks matching each embedding
+            doc_ids (Sequence[int], optional): doc_id (from add_source()) of each chunk
+            offsets (Sequence[Tuple[int, int]], optional): (start, end) character
+                span of each chunk in its source text
+            metadata (dict, optional): Field name -> one value per chunk
+                (see VectorStore.add)
+            pages (Sequence[int], optional): Page each chunk starts on (-1 = none)
+        """
+        self._check_writable()
+        if len(embeddings) != len(chunks):
+            raise ValueError(
+                f"Mismatch: {len(embeddings)} embeddings but {len(chunks)} chunks."
+            )
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        targets = (self._next_row + np.arange(len(chunks))) % self.n_shards
+        for s, shard in enumerate(self.shards):
+            rows = np.flatnonzero(targets == s)
+            if not len(rows):
+                continue
+            shard.add(
+                embeddings[rows],
+                [chunks[i] for i in rows.tolist()],
+                doc_ids=None if doc_ids is None else np.asarray(doc_ids)[rows],
+                offsets=None if offsets is None else np.asarray(offsets)[rows],
+                pages=None if pages is None else np.asarray(pages)[rows],
+                metadata=None if metadata is None else {
+                    name: [values[i] for i in rows.tolist()] for name, values in metadata.items()
+                },
+            )
+        self._next_row += len(chunks)
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[str]:
+        """Find the top-k chunks across all shards (see VectorStore.search)."""
+        return [
+            chunk for chunk, _ in self.search_with_scores(query_embedding, top_k, min_score, where)
+        ]
+
+    def search_with_scores(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> Hits:
+        """Same as search() but also returns scores (see VectorStore.search_with_scores)."""
+        query_embedding = np.array(query_embedding, dtype=np.float32)
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1)
+        return self.search_batch(query_embedding[:1], top_k, min_score, where)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[Hits]:
+        """
+        Search many queries at once: each shard runs one multi-row search.
+
+        ``where`` filters on chunk metadata, as in VectorStore.search().
+
+        Returns:
+            List[List[Tuple[str, float]]]: Global top-k (chunk, score) pairs per query
+        """
+        if self.shards is not None and self.total_chunks == 0:
+            raise RuntimeError("Vector store is empty. Call add() first.")
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of shape (n, {self.dim}), got {queries.shape}.")
+
+        if not self._workers:
+            if self.shards is None:
+                raise RuntimeError("Store is closed.")
+            return _search_shards(self.shards, queries, top_k, min_score, where, self.higher_is_better)
+
+        # One request per worker, all in flight at once; each returns its own merged top-k.
+        # Spans inside the workers stay in their processes, so time the fan-out here.
+        with metrics.span("search", items=len(queries)), self._fan_out_lock:
+            for _, conn in self._workers:
+                conn.send((queries, top_k, min_score, where))
+            replies = self._receive_all()
+        for status, payload in replies:
+            if status == "error":
+                raise payload
+        return [
+            _merge_top_k([hits[q] for _, hits in replies], top_k, self.higher_is_better)
+            for q in range(len(queries))
+        ]
+
+    def save(self, directory: str) -> None:
+        """
+        Save every shard to its own sub-directory, plus a top-level manifest.
+
+        Args:
+            directory (str): Target directory (created if missing)
+        """
+        self._check_writable()
+        os.makedirs(directory, exist_ok=True)
+        for s, shard in enumerate(self.shards):
+            shard.save(os.path.join(directory, SHARD_DIR.format(s)))
+        storage.write_manifest(directory, {
+            "dim": self.dim,
+            "metric": self.metric,
+            "total_chunks": self.total_chunks,
+            "sources": self.sources,
+            "sharded": {"n_shards": self.n_shards, "next_row": self._next_row, "options": self.options},
+        })
+
+    @classmethod
+    def load(cls, directory: str, workers: int = 0) -> "ShardedVectorStore":
+        """
+        Open a store written with save().
+
+        Args:
+            directory (str): Directory written by save()
+            workers (int): Worker processes to serve the shards from (at most
+                one per shard). 0 loads every shard into this process, which
+                keeps the store writable. Default: 0
+
+        Returns:
+            ShardedVectorStore: The restored store. With workers, it is
+                read-only; call close() (or use it as a context manager) to
+                stop the workers.
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest
+            ValueError: If the directory holds an unsharded index
+        """
+        manifest = storage.read_manifest(directory)
+        if "sharded" not in manifest:
+            raise ValueError(f"Not a sharded index: {directory}. Use VectorStore.load().")
+        info = manifest["sharded"]
+        store = cls(manifest["dim"], info["n_shards"], manifest["metric"], **info["options"])
+        store.sources = list(manifest["sources"])
+        store._next_row = info["next_row"]
+
+        shard_dirs = [os.path.join(directory, SHARD_DIR.format(s)) for s in range(store.n_shards)]
+        if workers <= 0:
+            store.shards = [VectorStore.load(shard_dir) for shard_dir in shard_dirs]
+        else:
+            store.shards = None
+            store._start_workers(shard_dirs, min(workers, store.n_shards))
+        return store
+
+    def _start_workers(self, shard_dirs: List[str], workers: int) -> None:
+        # "spawn" avoids forking a process whose FAISS/OpenMP threads are running
+        context = multiprocessing.get_context("spawn")
+        omp_threads = max(1, (os.cpu_count() or 1) // workers)
+        for w in range(workers):
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_serve_shards,
+                args=(shard_dirs[w::workers], omp_threads, self.higher_is_better, child_conn),
+                daemon=True,
+            )
+            process.start()
+            self._workers.append((process, conn))
+
+        try:
+            replies = self._receive_all()
+        except RuntimeError:
+            self.close()
+            raise
+        for status, payload in replies:
+            if status == "error":
+                self.close()
+                raise payload
+        self._served_chunks = sum(payload for _, payload in replies)
+        logger.info("Serving %d shards from %d worker processes", self.n_shards, workers)
+
+    def _receive_all(self) -> List[Tuple[str, Any]]:
+        """Collect one reply from every worker."""
+        try:
+            return [conn.recv() for _, conn in self._workers]
+        except EOFError:
+            raise RuntimeError("A shard worker process exited unexpectedly.")
+
+    def _check_writable(self) -> None:
+        if self.shards is None:
+            raise RuntimeError("Store is served by worker processes and is read-only.")
+
+    def close(self) -> None:
+        """Stop the worker processes, if any."""
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self._workers:
+            process.join(timeout=5)
+            conn.close()
+        self._workers = []
+
+    def __enter__(self) -> "ShardedVectorStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def total_chunks(self) -> int:
+        """Return total number of chunks across all shards."""
+        if self.shards is None:
+            return self._served_chunks
+        return sum(shard.total_chunks for shard in self.shards)
+
+    def __repr__(self):
+        mode = f"workers={len(self._workers)}" if self._workers else "in-process"
+        return (
+            f"ShardedVectorStore(dim={self.dim}, shards={self.n_shards}, "
+            f"metric='{self.metric}', chunks={self.total_chunks}, {mode})"
+        )
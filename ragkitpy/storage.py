@@ -0,0 +1,374 @@
+# ragkitpy/storage.py
+"""
+storage.py — On-disk formats used to persist a vector store between runs.
+
+An index directory contains:
+    manifest.json       Model name, embedding dim, chunking settings, sources
+    index.faiss         The serialized FAISS index
+    chunks.bin          Source text of the chunks, UTF-8 encoded; text shared
+                        by overlapping chunks of a document is stored once
+    chunk_offsets.npy   int64 (start, end) byte range of each chunk in chunks.bin
+    vectors.npy         Full-precision float32 vectors, kept for exact
+                        rescoring when the index is quantized (optional)
+    <column>.npy        One file per per-chunk column: doc_ids, spans, pages,
+                        chunk_ids, deleted (see VectorStore.save), and
+                        the bm25_* arrays of the keyword index
+    sync.json           Size, mtime and hash of every file indexed by
+                        RAGPipeline.sync_directory() (optional, see sync.py)
+
+chunks.bin is memory-mapped on load, so opening a large index only costs a
+few page faults — text is decoded lazily, and only for returned chunks.
+vectors.npy is memory-mapped too: rescoring only reads the candidate rows.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FORMAT_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "chunk_offsets.npy"
+VECTORS_FILE = "vectors.npy"
+
+
+def write_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+    """Write manifest.json into an index directory."""
+    manifest = dict(manifest, format_version=FORMAT_VERSION)
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """
+    Read manifest.json from an index directory.
+
+    Raises:
+        FileNotFoundError: If the directory has no manifest
+        ValueError: If the manifest was written by an unknown format version
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No index manifest found in: {directory}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    version = manifest.get("format_version")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported index format version: {version} (expected {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def write_columns(directory: str, **columns: np.ndarray) -> None:
+    """Write per-chunk NumPy columns, one <name>.npy file each."""
+    for name, values in columns.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+
+
+def read_columns(directory: str, *names: str) -> List[np.ndarray]:
+    """Read columns written by write_columns(), in the order given."""
+    return [np.load(os.path.join(directory, f"{name}.npy")) for name in names]
+
+
+class GrowableArray:
+    """Append-only NumPy array with amortized O(1) appends."""
+
+    def __init__(self, dtype, initial: Optional[np.ndarray] = None):
+        data = np.asarray(initial if initial is not None else [], dtype=dtype)
+        self._data = data.copy()
+        self._size = len(data)
+
+    def extend(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data), 16), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def view(self) -> np.ndarray:
+        """Return the filled part of the buffer (a view, not a copy)."""
+        return self._data[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def _pack_ranges(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group byte ranges into disjoint runs, so each run is copied once.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (run_starts, run_ends,
+            ranges), where ranges holds each input range's (start, end) once
+            the runs are laid end to end from offset 0
+    """
+    order = np.argsort(starts, kind="stable")
+    sorted_starts, sorted_ends = starts[order], ends[order]
+    new_run = np.ones(len(order), dtype=np.bool_)
+    new_run[1:] = sorted_starts[1:] > np.maximum.accumulate(sorted_ends)[:-1]
+    heads = np.flatnonzero(new_run)
+    run_starts = sorted_starts[heads]
+    run_ends = np.maximum.reduceat(sorted_ends, heads) if len(heads) else run_starts
+    run_bases = np.concatenate(([0], np.cumsum(run_ends - run_starts)[:-1])).astype(np.int64)
+    run_of = np.cumsum(new_run) - 1
+
+    ranges = np.empty((len(order), 2), dtype=np.int64)
+    ranges[order, 0] = run_bases[run_of] + sorted_starts - run_starts[run_of]
+    ranges[order, 1] = ranges[order, 0] + sorted_ends - sorted_starts
+    return run_starts, run_ends, ranges
+
+
+class ChunkArena:
+    """
+    Chunk texts kept as (start, end) byte ranges into one UTF-8 text buffer.
+
+    Consecutive chunks of a document overlap; when a new chunk starts with
+    the end of the previous one, only its new text is appended and both
+    ranges point into the same bytes. There is no string object per chunk —
+    take() decodes just the rows a search returns.
+
+    Supports ``len()``, indexing and iteration like a ``List[str]``. An arena
+    opened from disk memory-maps chunks.bin; text added afterwards lives in
+    an in-memory tail until the store is saved again.
+
+    Example:
+        >>> arena = ChunkArena()
+        >>> arena.extend(["abcdef", "defghi"], doc_ids=[0, 0], spans=[(0, 6), (3, 9)])
+        >>> arena.nbytes
+        9
+        >>> arena.take(np.array([1]))
+        ['defghi']
+    """
+
+    def __init__(self):
+        self._mapped: Union[np.memmap, bytes] = b""
+        self._n_mapped = 0                  # Bytes in _mapped; tail offsets start here
+        self._tail = bytearray()
+        self._starts = GrowableArray(np.int64)
+        self._ends = GrowableArray(np.int64)
+        # Document and end offset (in characters) of the last chunk appended
+        self._last: Tuple[int, int] = (-1, -1)
+
+    @classmethod
+    def open(cls, directory: str) -> "ChunkArena":
+        """Memory-map the chunk texts saved in an index directory."""
+        arena = cls()
+        ranges = np.load(os.path.join(directory, OFFSETS_FILE)).reshape(-1, 2)
+        arena._starts = GrowableArray(np.int64, ranges[:, 0])
+        arena._ends = GrowableArray(np.int64, ranges[:, 1])
+        path = os.path.join(directory, CHUNKS_FILE)
+        arena._n_mapped = os.path.getsize(path)
+        # np.memmap refuses zero-length files
+        if arena._n_mapped > 0:
+            arena._mapped = np.memmap(path, dtype=np.uint8, mode="r")
+        return arena
+
+    def extend(
+        self,
+        chunks: Sequence[str],
+        doc_ids: Optional[Sequence[int]] = None,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+    ) -> None:
+        """
+        Append chunks, sharing text with the previous chunk where they overlap.
+
+        Args:
+            chunks (Sequence[str]): Chunk texts
+            doc_ids (Sequence[int], optional): Document of each chunk (-1 = unknown)
+            spans (Sequence[Tuple[int, int]], optional): (start, end) character
+                span of each chunk in its document. Without doc_ids and spans
+                every chunk is stored in full.
+        """
+        n = len(chunks)
+        doc_ids = [-1] * n if doc_ids is None else np.asarray(doc_ids).tolist()
+        spans = [(-1, -1)] * n if spans is None else np.asarray(spans).reshape(-1, 2).tolist()
+        starts = np.empty(n, dtype=np.int64)
+        ends = np.empty(n, dtype=np.int64)
+
+        tail = self._tail
+        last_doc, last_end = self._last
+        for i, (chunk, doc_id, (start, end)) in enumerate(zip(chunks, doc_ids, spans)):
+            data = chunk.encode("utf-8")
+            shared = 0
+            if doc_id >= 0 and doc_id == last_doc and 0 <= start <= last_end <= end:
+                prefix = chunk[:last_end - start].encode("utf-8")
+                # Only share text that really matches what was stored last
+                if tail.endswith(prefix):
+                    shared = len(prefix)
+            starts[i] = self._n_mapped + len(tail) - shared
+            tail += data[shared:]
+            ends[i] = starts[i] + len(data)
+            last_doc, last_end = (doc_id, end) if doc_id >= 0 and start >= 0 else (-1, -1)
+
+        self._last = (last_doc, last_end)
+        self._starts.extend(starts)
+        self._ends.extend(ends)
+
+    def take(self, ids: np.ndarray) -> List[str]:
+        """Decode the chunks at the given positions."""
+        ids = np.asarray(ids, dtype=np.int64)
+        starts = self._starts.view()[ids].tolist()
+        ends = self._ends.view()[ids].tolist()
+        return [self._bytes(start, end).decode("utf-8") for start, end in zip(starts, ends)]
+
+    def select(self, positions: np.ndarray) -> "ChunkArena":
+        """
+        Return an arena holding only the given positions. Their in-memory
+        text is copied into a new tail, so the text of dropped chunks is
+        freed; memory-mapped text is shared and shrinks on the next save().
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self._starts.view()[positions]
+        ends = self._ends.view()[positions]
+
+        in_tail = np.flatnonzero(ends > self._n_mapped)
+        run_starts, run_ends, tail_ranges = _pack_ranges(starts[in_tail], ends[in_tail])
+        tail = bytearray()
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            tail += self._bytes(start, end)
+        starts[in_tail] = self._n_mapped + tail_ranges[:, 0]
+        ends[in_tail] = self._n_mapped + tail_ranges[:, 1]
+
+        selected = ChunkArena()
+        selected._mapped = self._mapped
+        selected._n_mapped = self._n_mapped
+        selected._tail = tail
+        selected._starts = GrowableArray(np.int64, starts)
+        selected._ends = GrowableArray(np.int64, ends)
+        return selected
+
+    def save(self, directory: str) -> None:
+        """Write chunks.bin and chunk_offsets.npy, keeping only referenced bytes."""
+        run_starts, run_ends, ranges = _pack_ranges(self._starts.view(), self._ends.view())
+
+        # Write to temporary files first: the text being saved may itself be
+        # memory-mapped from this directory.
+        chunks_path = os.path.join(directory, CHUNKS_FILE)
+        offsets_path = os.path.join(directory, OFFSETS_FILE)
+        with open(chunks_path + ".tmp", "wb") as f:
+            for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+                f.write(self._bytes(start, end))
+        with open(offsets_path + ".tmp", "wb") as f:
+            np.save(f, ranges)
+
+        os.replace(chunks_path + ".tmp", chunks_path)
+        os.replace(offsets_path + ".tmp", offsets_path)
+
+    def _bytes(self, start: int, end: int) -> bytes:
+        """Return bytes [start, end), which may straddle the mapped part and the tail."""
+        base = self._n_mapped
+        if start >= base:
+            return bytes(self._tail[start - base:end - base])
+        if end <= base:
+            return bytes(self._mapped[start:end])
+        return bytes(self._mapped[start:base]) + bytes(self._tail[:end - base])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of text held, mapped and in memory (overlaps counted once)."""
+        return self._n_mapped + len(self._tail)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, idx: int) -> str:
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("chunk index out of range")
+        return self.take(np.array([idx]))[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for lo in range(0, len(self), 1024):
+            yield from self.take(np.arange(lo, min(lo + 1024, len(self))))
+
+    def __repr__(self):
+        return f"ChunkArena(chunks={len(self)}, text_bytes={self.nbytes}, mapped_bytes={self._n_mapped})"
+
+
+class VectorRows:
+    """
+    Full-precision float32 vectors, one per store row, read a few rows at a time.
+
+    Opened from disk, the rows are memory-mapped from vectors.npy, so they
+    cost page cache rather than resident memory; rows added afterwards live
+    in an in-memory tail until the store is saved again.
+
+    Args:
+        dim (int): Vector dimension
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._mapped: np.ndarray = np.zeros((0, dim), dtype=np.float32)
+        self._mapped_rows = np.zeros(0, dtype=np.int64)   # Row i -> row of _mapped
+        self._tail = GrowableArray(np.float32)             # Flattened rows
+
+    @classmethod
+    def open(cls, directory: str, dim: int) -> "VectorRows":
+        """Memory-map the vectors saved in an index directory."""
+        rows = cls(dim)
+        path = os.path.join(directory, VECTORS_FILE)
+        rows._mapped = np.load(path, mmap_mode="r")
+        if len(rows._mapped) == 0:   # Nothing to map; keep a plain empty array
+            rows._mapped = np.zeros((0, dim), dtype=np.float32)
+        rows._mapped_rows = np.arange(len(rows._mapped), dtype=np.int64)
+        return rows
+
+    def extend(self, vectors: np.ndarray) -> None:
+        """Append rows (kept in memory)."""
+        self._tail.extend(np.asarray(vectors, dtype=np.float32).ravel())
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """Return the vectors at the given rows as an (n, dim) array."""
+        rows = np.asarray(rows, dtype=np.int64)
+        n_mapped = len(self._mapped_rows)
+        out = np.empty((len(rows), self.dim), dtype=np.float32)
+        mapped = rows < n_mapped
+        out[mapped] = self._mapped[self._mapped_rows[rows[mapped]]]
+        out[~mapped] = self._tail.view().reshape(-1, self.dim)[rows[~mapped] - n_mapped]
+        return out
+
+    def select(self, positions: np.ndarray) -> "VectorRows":
+        """Return the rows at the given (sorted) positions; mapped rows are not copied."""
+        positions = np.asarray(positions, dtype=np.int64)
+        n_mapped = len(self._mapped_rows)
+        tail = self._tail.view().reshape(-1, self.dim)
+        selected = VectorRows(self.dim)
+        selected._mapped = self._mapped
+        selected._mapped_rows = self._mapped_rows[positions[positions < n_mapped]]
+        selected._tail = GrowableArray(np.float32, tail[positions[positions >= n_mapped] - n_mapped].ravel())
+        return selected
+
+    def save(self, directory: str, block: int = 65536) -> None:
+        """Write vectors.npy, streaming in blocks so the rows never all sit in memory."""
+        path = os.path.join(directory, VECTORS_FILE)
+        n = len(self)
+        if n == 0:
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.zeros((0, self.dim), dtype=np.float32))
+        else:
+            # Temporary file first: the rows being saved may be mapped from this directory
+            out = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=np.float32, shape=(n, self.dim))
+            for lo in range(0, n, block):
+                out[lo:lo + block] = self.take(np.arange(lo, min(lo + block, n)))
+            out.flush()
+            del out
+        os.replace(path + ".tmp", path)
+
+    def __len__(self) -> int:
+        return len(self._mapped_rows) + len(self._tail) // self.dim
+
+    def __repr__(self):
+        return f"VectorRows(dim={self.dim}, rows={len(self)}, mapped={len(self._mapped_rows)})"
@@ -1,11 +1,103 @@
 # ragkitpy/vectorstore.py
 """
 vectorstore.py — In-memory FAISS vector store for storing and searching embeddings.
+
+Concurrency: searches read an immutable _Snapshot of the store, taken with a
+single attribute read and no lock. Writes (add, remove_document, compact)
+are serialized by a lock and published atomically as the next snapshot.
+Appends go to buffers with spare capacity that snapshots share, since a
+snapshot only reads its first n_rows rows; only writes that rewrite
+existing rows (compaction, training, HNSW, IVF and PQ inserts) work on a
+copy. Searches running on several threads therefore never see an index and
+chunk list that disagree, and since FAISS releases the GIL while searching,
+they scale across cores.
 """
 
-from typing import List, Tuple
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 import numpy as np
 
+from ragkitpy import filters, metrics, storage
+from ragkitpy.bm25 import COLUMNS as BM25_COLUMNS, BM25Index
+from ragkitpy.filters import ColumnView, Filter, MetadataTable
+from ragkitpy.retriever import chunk_neighbours, maximal_marginal_relevance, reciprocal_rank_fusion
+from ragkitpy.storage import ChunkArena, GrowableArray, VectorRows
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResult(NamedTuple):
+    """A retrieved chunk together with its score and provenance."""
+    chunk: str
+    score: float
+    doc_id: int             # -1 if the chunk was added without provenance
+    source: Optional[str]   # Path of the source document, if known
+    start: int              # Character span of the chunk in the source text
+    end: int
+    chunk_id: int = -1      # Stable id of the chunk, unchanged by compact()
+    page: int = -1          # 1-based page the chunk starts on, for paged sources (PDFs)
+
+
+class _Snapshot(NamedTuple):
+    """Immutable state that searches read. Replaced as a whole by publish()."""
+    index: Any                          # Only appended to once published; rows >= n_rows are skipped
+    trained: bool
+    chunks: ChunkArena                  # Only rows < n_rows are read
+    n_rows: int
+    n_live: int
+    doc_ids: np.ndarray
+    spans: np.ndarray                   # (n_rows, 2)
+    chunk_ids: np.ndarray
+    pages: np.ndarray                   # Page of each chunk (-1 = none)
+    live: Optional[np.ndarray]          # Bool mask of rows not removed; None if nothing is
+    live_bitmap: Optional[np.ndarray]   # Same, packed for FAISS's IDSelectorBitmap
+    sources: List[Optional[str]]        # Only appended to once published
+    lexical: Any                        # Frozen BM25 postings
+    vectors: Optional[VectorRows]       # Full-precision rows for rescoring, if kept
+    metadata: Dict[str, ColumnView]     # Per-chunk metadata columns, for filters
+
+
+INDEX_TYPES = ("flat", "fp16", "sq8", "pq", "ivf_flat", "ivf_pq", "hnsw")
+
+# "l2": Euclidean distance, lower = more similar.
+# "ip": inner product, higher = more similar.
+# "cosine": inner product on L2-normalized vectors, a similarity in [-1, 1].
+METRICS = ("l2", "ip", "cosine")
+
+_IVF_TYPES = ("ivf_flat", "ivf_pq")
+
+# Index types that need a training pass before vectors can be added
+_TRAINED_TYPES = _IVF_TYPES + ("sq8", "pq")
+
+# Index types whose stored codes only approximate the vectors
+_LOSSY_TYPES = ("fp16", "sq8", "pq", "ivf_pq")
+
+
+# A filter matching at most this many rows is answered by exact search over
+# just those rows; larger matches are filtered inside the FAISS search. HNSW
+# and IVF get a higher bound: filtering during a graph walk or a few IVF
+# lists finds few matching rows, so recall drops for selective filters.
+_EXACT_FILTER_ROWS = 1024
+_EXACT_FILTER_ROWS_ANN = 16384
+
+_ANN_TYPES = _IVF_TYPES + ("hnsw",)
+
+# Inside bulk_write(), publishes that force the next write to copy the FAISS
+# index are spaced out so that copying takes at most this share of the time
+_MAX_COPY_SHARE = 0.1
+
+
+def _default_pq_m(dim: int) -> int:
+    """Pick a number of PQ sub-quantizers that divides dim (about 8 dims each)."""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
 
 class VectorStore:
     """
@@ -13,14 +105,75 @@ class VectorStore:
 
     Args:
         dim (int): Dimension of the embedding vectors
+        index_type (str): "flat" (exact, default), "fp16", "sq8", "pq",
+                          "ivf_flat", "ivf_pq" or "hnsw". "fp16" and "sq8" scan
+                          scalar-quantized codes (2 and 1 bytes per dimension),
+                          "pq" product-quantized codes (pq_m bytes per vector).
+                          Trained types ("sq8", "pq", IVF) search exhaustively
+                          until enough vectors have arrived (min_train_size).
+        nlist (int): Number of IVF clusters. Default: 256
+        pq_m (int, optional): PQ sub-quantizers for "pq" and "ivf_pq" (must
+                              divide dim). Default: about one per 8 dimensions
+        hnsw_m (int): Neighbours per HNSW node. Default: 32
+        nprobe (int): IVF clusters visited per query — higher is slower but
+                      more accurate. Default: 8
+        ef_search (int): HNSW search breadth — higher is slower but more
+                         accurate. Default: 64
+        metric (str): "l2" (distance, default), "ip" (inner product) or
+                      "cosine" (vectors are normalized on add and search).
+                      With "ip"/"cosine", scores are similarities — higher is
+                      better — and searches accept a min_score cut-off.
+        compact_threshold (float): Removed chunks are tombstoned and skipped by
+                      searches; once this fraction of rows is tombstoned the
+                      index is compacted automatically. Default: 0.3
+        rescore (int): Two-stage search for quantized indexes: fetch
+                      top_k × rescore candidates from the index, then re-rank
+                      them exactly against full-precision copies of the
+                      vectors. The copies live in memory until save(), and are
+                      memory-mapped from disk after load(). 0 (default) keeps
+                      no copies.
+
+    Searches are thread-safe and lock-free, and may run while another thread
+    writes: they see the store as of the last publish. Each write publishes
+    on its own; wrap many writes in bulk_write() to publish them together.
+
+    Chunks can carry metadata columns (tenant, date, document type...) that
+    searches filter on with ``where`` (see filters.py). The filter is turned
+    into a row mask before the search: a selective one is answered by exact
+    search over just the matching rows, a broad one by a FAISS scan that
+    skips the other rows via an ID selector. Either way, top_k results come
+    from the matching rows, with no over-fetching.
+
+    Chunk texts are not kept as one string each: they are byte ranges into
+    their documents' text (see storage.ChunkArena), so chunk overlaps are
+    stored once and strings are only built for the results returned.
 
     Example:
         >>> store = VectorStore(dim=384)
         >>> store.add(embeddings, chunks)
         >>> results = store.search(query_embedding, top_k=3)
+        >>> hybrid = store.search_hybrid(query_embedding, "ERR-404 on login", top_k=3)
+
+        >>> store.add(embeddings, chunks, metadata={"tenant": ["acme"] * len(chunks)})
+        >>> store.search(query_embedding, where={"tenant": "acme"})
+
+        >>> ann = VectorStore(dim=384, index_type="hnsw", ef_search=128)
+        >>> small = VectorStore(dim=384, index_type="sq8", rescore=4)
     """
 
-    def __init__(self, dim: int):
+    def __init__(
+        self,
+        dim: int,
+        index_type: str = "flat",
+        nlist: int = 256,
+        pq_m: Optional[int] = None,
+        hnsw_m: int = 32,
+        nprobe: int = 8,
+        ef_search: int = 64,
+        metric: str = "l2",
+        compact_threshold: float = 0.3,
+        rescore: int = 0,
+    ):
         try:
             import faiss
         except ImportError:
@@ -28,87 +181,1077 @@ class VectorStore:
                 "faiss-cpu is required. Run: pip install faiss-cpu"
             )
 
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index_type: '{index_type}'. Supported types: {list(INDEX_TYPES)}"
+            )
+
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: '{metric}'. Supported metrics: {list(METRICS)}")
+
+        if rescore < 0:
+            raise ValueError("rescore must be >= 0.")
+
         import faiss
         self.dim = dim
-        self.index = faiss.IndexFlatL2(dim)   # L2 distance (Euclidean)
-        self.chunks: List[str] = []            # Stores original text chunks
+        self.metric = metric
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m or _default_pq_m(dim)
+        self.hnsw_m = hnsw_m
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.compact_threshold = compact_threshold
+        self.rescore = rescore
+        if index_type in ("pq", "ivf_pq") and dim % self.pq_m != 0:
+            raise ValueError(f"pq_m ({self.pq_m}) must divide dim ({dim}).")
+
         self._faiss = faiss
+        # IVF indexes start as an exact flat index and are swapped in once trained
+        self._trained = index_type not in _TRAINED_TYPES
+        self.index = self._new_index() if self._trained else faiss.IndexFlat(dim, self._faiss_metric)
+        self.chunks = ChunkArena()             # Chunk texts as byte ranges into shared text
+        self.sources: List[Optional[str]] = []  # Source of each document by doc_id (None = removed)
+        self._doc_ids = GrowableArray(np.int64)
+        self._spans = GrowableArray(np.int64)  # Flattened (start, end) pairs
+        self._chunk_ids = GrowableArray(np.int64)
+        self._pages = GrowableArray(np.int32)
+        self._deleted = GrowableArray(np.bool_)  # Tombstones, one per row
+        self._n_deleted = 0
+        self._next_chunk_id = 0
+        self.lexical = BM25Index()   # Keyword index over the same rows
+        self.metadata = MetadataTable()   # Metadata columns over the same rows
+        self._vectors = VectorRows(dim) if rescore else None
+
+        self._index_mapped = False   # Memory-mapped by load(mmap=True): read-only
+        self._write_lock = threading.RLock()
+        self._bulk_depth = 0
+        self._publish_every: Optional[float] = None
+        self._published_at = 0.0
+        self._copy_seconds = 0.0   # Time the last copy of the index took
+        self._reserved: Tuple[Any, int] = (None, 0)   # (index, rows its code buffer holds)
+        self.publish()
+
+    def _new_index(self):
+        """Build an empty index of the configured type and metric."""
+        factory = {
+            "flat": "Flat",
+            "fp16": "SQfp16",
+            "sq8": "SQ8",
+            "pq": f"PQ{self.pq_m}x8",
+            "ivf_flat": f"IVF{self.nlist},Flat",
+            "ivf_pq": f"IVF{self.nlist},PQ{self.pq_m}x8",
+            "hnsw": f"HNSW{self.hnsw_m}",
+        }[self.index_type]
+        return self._faiss.index_factory(self.dim, factory, self._faiss_metric)
+
+    @property
+    def _faiss_metric(self) -> int:
+        if self.metric == "l2":
+            return self._faiss.METRIC_L2
+        return self._faiss.METRIC_INNER_PRODUCT
+
+    @property
+    def higher_is_better(self) -> bool:
+        """True if scores are similarities ("ip", "cosine"), False for L2 distances."""
+        return self.metric != "l2"
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Return a float32, C-contiguous copy, L2-normalized for the cosine metric."""
+        vectors = np.array(vectors, dtype=np.float32, order="C")
+        if self.metric == "cosine":
+            self._faiss.normalize_L2(vectors)
+        return vectors
+
+    @property
+    def min_train_size(self) -> int:
+        """Number of vectors needed before an IVF index is trained (0 if none needed)."""
+        if self.index_type not in _TRAINED_TYPES:
+            return 0
+        if self.index_type == "sq8":
+            return 1000   # Only per-dimension value ranges are learned
+        size = 39 * self.nlist if self.index_type in _IVF_TYPES else 0
+        if self.index_type in ("pq", "ivf_pq"):
+            size = max(size, 39 * 256)   # Each 8-bit PQ codebook has 256 centroids
+        return size
+
+    @property
+    def is_trained(self) -> bool:
+        """True once the configured index type is in use (not the flat fallback)."""
+        return self._trained
+
+    def _maybe_train(self) -> None:
+        """Train the configured IVF index on everything stored so far, then swap it in."""
+        if self._trained or self.index.ntotal < self.min_train_size:
+            return
 
-    def add(self, embeddings: np.ndarray, chunks: List[str]) -> None:
+        logger.info("Training %s index on %d vectors", self.index_type, self.index.ntotal)
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        index = self._new_index()
+        index.train(vectors)
+        if self.index_type in _IVF_TYPES:
+            index.make_direct_map()   # Allows reconstruct() of stored vectors
+        index.add(vectors)
+        self.index = index
+        self._trained = True
+
+    def add_source(self, source: str) -> int:
+        """
+        Register a source document and return its doc_id.
+
+        Args:
+            source (str): Path (or any identifier) of the document
+
+        Returns:
+            int: The new document's id, to pass to add(doc_ids=...)
+        """
+        with self._write_lock:
+            self.sources.append(source)
+            return len(self.sources) - 1
+
+    def add(
+        self,
+        embeddings: np.ndarray,
+        chunks: List[str],
+        doc_ids: Optional[Sequence[int]] = None,
+        offsets: Optional[Sequence[Tuple[int, int]]] = None,
+        metadata: Optional[Dict[str, Sequence[Any]]] = None,
+        pages: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
         """
         Add embeddings and their corresponding text chunks to the store.
 
         Args:
             embeddings (np.ndarray): 2D array of shape (n, dim)
             chunks (List[str]): Original text chunks matching each embedding
+            doc_ids (Sequence[int], optional): doc_id (from add_source()) of each chunk
+            offsets (Sequence[Tuple[int, int]], optional): (start, end) character
+                span of each chunk in its source text
+            metadata (dict, optional): Field name -> one value per chunk
+                (str, bool, int, float or date/datetime; None = no value),
+                for filtering searches with ``where``
+            pages (Sequence[int], optional): 1-based page each chunk starts
+                on, for paged sources (-1 = none)
+
+        Returns:
+            np.ndarray: The stable chunk ids assigned to the new chunks
+
+        Raises:
+            ValueError: If the lengths don't match, a doc_id is unknown or
+                a metadata field has values of the wrong type
         """
         if len(embeddings) != len(chunks):
             raise ValueError(
                 f"Mismatch: {len(embeddings)} embeddings but {len(chunks)} chunks."
             )
 
+        n = len(chunks)
+        doc_ids = np.full(n, -1, dtype=np.int64) if doc_ids is None else np.asarray(doc_ids, dtype=np.int64)
+        spans = np.full((n, 2), -1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        pages = np.full(n, -1, dtype=np.int32) if pages is None else np.asarray(pages, dtype=np.int32)
+        if len(doc_ids) != n or spans.shape != (n, 2) or len(pages) != n:
+            raise ValueError("doc_ids, offsets and pages must have one entry per chunk.")
+
         # FAISS requires float32
-        embeddings = np.array(embeddings, dtype=np.float32)
-        self.index.add(embeddings)
-        self.chunks.extend(chunks)
-        print(f"✅ Added {len(chunks)} chunks to vector store. Total: {len(self.chunks)}")
+        embeddings = self._prepare(embeddings)
+        with metrics.span("index_add", items=n), self._write_lock:
+            if n and (doc_ids.max() >= len(self.sources) or doc_ids.min() < -1):
+                raise ValueError("Unknown doc_id. Register documents with add_source() first.")
+            self.metadata.extend(n, metadata)   # First, as it validates the values
+
+            self._writable_index(n).add(embeddings)
+            self._maybe_train()
+            self.chunks.extend(chunks, doc_ids, spans)
+            self.lexical.add(chunks)
+            if self._vectors is not None:
+                self._vectors.extend(embeddings)
+            self._doc_ids.extend(doc_ids)
+            self._spans.extend(spans.ravel())
+            chunk_ids = np.arange(self._next_chunk_id, self._next_chunk_id + n, dtype=np.int64)
+            self._chunk_ids.extend(chunk_ids)
+            self._pages.extend(pages)
+            self._deleted.extend(np.zeros(n, dtype=np.bool_))
+            self._next_chunk_id += n
+            total = len(self._doc_ids) - self._n_deleted
+            self._written()
+        logger.debug("Added %d chunks to vector store. Total: %d", n, total)
+        return chunk_ids
 
-    def search(self, query_embedding: np.ndarray, top_k: int = 3) -> List[str]:
+    def remove_document(self, doc_id: int) -> int:
+        """
+        Remove every chunk of a document.
+
+        Chunks are tombstoned: searches skip them from the next publish, and
+        their space is reclaimed by compact() — automatically once the
+        tombstone ratio passes ``compact_threshold``.
+
+        Args:
+            doc_id (int): Document id returned by add_source()
+
+        Returns:
+            int: Number of chunks removed
+
+        Raises:
+            ValueError: If the doc_id is unknown
+        """
+        with self._write_lock:
+            if doc_id < 0 or doc_id >= len(self.sources):
+                raise ValueError(f"Unknown doc_id: {doc_id}")
+
+            rows = np.flatnonzero((self._doc_ids.view() == doc_id) & ~self._deleted.view())
+            self._deleted.view()[rows] = True   # Snapshots hold their own copy
+            self._n_deleted += len(rows)
+            if self.sources is self._snapshot.sources:
+                self.sources = list(self.sources)
+            self.sources[doc_id] = None   # Keeps doc_ids of other documents stable
+
+            if self.tombstone_ratio > self.compact_threshold:
+                self.compact()
+            self._written()
+        return len(rows)
+
+    def compact(self) -> int:
+        """
+        Physically drop tombstoned chunks and rebuild the index without them.
+
+        Chunk ids and doc_ids are unchanged; only the internal row positions move.
+
+        Returns:
+            int: Number of rows reclaimed
+        """
+        with self._write_lock:
+            if self._n_deleted == 0:
+                return 0
+
+            keep = np.flatnonzero(~self._deleted.view())
+            logger.info("Compacting vector store: dropping %d removed chunks", self._n_deleted)
+            if self._index_mapped:
+                self._writable_index()   # A clone of a mapped index can't be reset
+
+            index = self._faiss.clone_index(self.index)
+            index.reset()   # Keeps IVF training
+            if self._vectors is not None:
+                self._vectors = self._vectors.select(keep)
+            if len(keep):
+                # Re-encode from the exact vectors when kept, not from decoded codes
+                vectors = self._vectors.take(np.arange(len(keep))) if self._vectors is not None \
+                    else self._reconstruct(self.index, keep)
+                index.add(vectors)
+            self.index = index
+
+            self.chunks = self.chunks.select(keep)
+            self.lexical.select(keep)
+            self.metadata = self.metadata.select(keep)
+            self._doc_ids = GrowableArray(np.int64, self._doc_ids.view()[keep])
+            self._spans = GrowableArray(np.int64, self._spans.view().reshape(-1, 2)[keep].ravel())
+            self._chunk_ids = GrowableArray(np.int64, self._chunk_ids.view()[keep])
+            self._pages = GrowableArray(np.int32, self._pages.view()[keep])
+            self._deleted = GrowableArray(np.bool_, np.zeros(len(keep), dtype=np.bool_))
+
+            reclaimed, self._n_deleted = self._n_deleted, 0
+            self._written()
+        return reclaimed
+
+    def publish(self) -> None:
+        """
+        Make every write so far visible to searches, in one atomic step.
+
+        Called automatically after each write, or when bulk_write() exits.
+        """
+        with self._write_lock:
+            live = live_bitmap = None
+            if self._n_deleted:
+                live = ~self._deleted.view()
+                live_bitmap = np.packbits(live, bitorder="little")
+            n_rows = len(self._doc_ids)
+            self._snapshot = _Snapshot(
+                index=self.index,
+                trained=self._trained,
+                chunks=self.chunks,
+                n_rows=n_rows,
+                n_live=n_rows - self._n_deleted,
+                doc_ids=self._doc_ids.view(),
+                spans=self._spans.view().reshape(-1, 2),
+                chunk_ids=self._chunk_ids.view(),
+                pages=self._pages.view(),
+                live=live,
+                live_bitmap=live_bitmap,
+                sources=self.sources,
+                lexical=self.lexical.freeze(),
+                vectors=self._vectors,
+                metadata=self.metadata.freeze(),
+            )
+            self._published_at = time.monotonic()
+
+    @contextmanager
+    def bulk_write(self, publish_every: Optional[float] = None) -> Iterator["VectorStore"]:
+        """
+        Group writes so that searches see them together, when the block exits.
+
+        For HNSW, PQ and trained IVF indexes, the first write after a publish
+        copies the FAISS index (searches may still be reading the old one),
+        so batching writes avoids one copy per add(). Other writers wait
+        until the block exits.
+
+        Args:
+            publish_every (float, optional): Also publish at most this often, in
+                seconds, so a long ingestion becomes searchable as it goes.
+                The interval is stretched as the index grows if each publish
+                costs a copy, keeping copies under 10% of the time.
+                Default: only when the block exits
+
+        Example:
+            >>> with store.bulk_write(publish_every=5.0):
+            ...     for embeddings, chunks in batches:
+            ...         store.add(embeddings, chunks)
+        """
+        with self._write_lock:
+            if self._bulk_depth == 0:
+                self._publish_every = publish_every
+            self._bulk_depth += 1
+            try:
+                yield self
+            finally:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0:
+                    self._publish_every = None
+                    self.publish()
+
+    def _written(self) -> None:
+        """Publish after a write, unless inside bulk_write() and not yet due."""
+        if self._bulk_depth == 0 or (
+            self._publish_every is not None
+            and time.monotonic() - self._published_at
+            >= max(self._publish_every, self._copy_seconds / _MAX_COPY_SHARE)
+        ):
+            self.publish()
+
+    def _writable_index(self, rows: int = 0):
+        """
+        Return the draft index, ready for ``rows`` more vectors.
+
+        Flat and scalar-quantized indexes (flat, fp16, sq8) only ever append
+        codes, so while their reserved capacity lasts the published index
+        itself is the draft: snapshots skip rows past their n_rows, and the
+        buffer they read is never reallocated. Other index types are copied
+        if the published snapshot shares them: HNSW and IVF inserts rewrite
+        existing data, and FAISS can't skip rows of a PQ index.
+        """
+        index = self.index
+        if self._index_mapped:
+            # clone_index() would share the mapped buffer; a serialized copy owns its memory
+            index = self._faiss.deserialize_index(self._faiss.serialize_index(index))
+            self._index_mapped = False
+        elif index is self._snapshot.index:
+            if index.ntotal + rows <= self._reserved_rows(index):
+                self._copy_seconds = 0.0
+                return index
+            start = time.monotonic()
+            index = self._faiss.clone_index(index)
+            self._copy_seconds = time.monotonic() - start
+
+        if rows and isinstance(index, (self._faiss.IndexFlat, self._faiss.IndexScalarQuantizer)):
+            needed = index.ntotal + rows
+            if needed > self._reserved_rows(index):
+                # Growing the vector past its capacity, then shrinking it back,
+                # leaves the capacity in place: appends until then don't move it
+                size = index.codes.size()
+                index.codes.resize(2 * needed * index.code_size)
+                index.codes.resize(size)
+                self._reserved = (index, 2 * needed)
+        self.index = index
+        return index
+
+    def _reserved_rows(self, index) -> int:
+        """Rows the code buffer of ``index`` holds without reallocating (0 if unknown)."""
+        reserved, rows = self._reserved
+        return rows if reserved is index else 0
+
+    @staticmethod
+    def _reconstruct(index, rows: np.ndarray) -> np.ndarray:
+        """Return the stored vectors at the given rows (decoded, for lossy indexes)."""
+        return index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    @property
+    def tombstone_ratio(self) -> float:
+        """Fraction of index rows that are removed but not yet compacted."""
+        rows = len(self._deleted)
+        return self._n_deleted / rows if rows else 0.0
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[str]:
         """
         Find the most semantically similar chunks to a query embedding.
 
         Args:
             query_embedding (np.ndarray): 1D or 2D query vector
             top_k (int): Number of top results to return
+            min_score (float, optional): Drop results scoring below this
+                similarity. Only for the "ip" and "cosine" metrics.
+            where (dict, optional): Only search chunks whose metadata matches
+                this filter, e.g. {"tenant": "acme", "year": {"$gte": 2023}}.
+                "doc_id", "source" and "page" can be filtered on too. See filters.py.
 
         Returns:
             List[str]: Top-k most relevant text chunks
         """
-        if len(self.chunks) == 0:
-            raise RuntimeError("Vector store is empty. Call add() first.")
+        return [
+            chunk for chunk, _ in self.search_with_scores(query_embedding, top_k, min_score, where)
+        ]
+
+    def search_with_scores(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Same as search() but also returns scores.
 
+        Returns:
+            List[Tuple[str, float]]: List of (chunk, score) pairs. The score is
+                an L2 distance (lower = more similar) or, for the "ip" and
+                "cosine" metrics, a similarity (higher = more similar).
+        """
         # Ensure correct shape (1, dim)
         query_embedding = np.array(query_embedding, dtype=np.float32)
         if query_embedding.ndim == 1:
             query_embedding = query_embedding.reshape(1, -1)
 
-        top_k = min(top_k, len(self.chunks))  # Can't return more than we have
-        distances, indices = self.index.search(query_embedding, top_k)
+        return self.search_batch(query_embedding[:1], top_k, min_score, where)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Search many queries at once with a single multi-row FAISS search.
 
-        results = []
-        for idx, dist in zip(indices[0], distances[0]):
-            if idx < len(self.chunks):
-                results.append(self.chunks[idx])
+        Args:
+            query_embeddings (np.ndarray): 2D array of shape (n_queries, dim)
+            top_k (int): Number of top results per query
+            min_score (float, optional): Similarity cut-off ("ip"/"cosine" only)
+            where (dict, optional): Metadata filter applied to every query
 
-        return results
+        Returns:
+            List[List[Tuple[str, float]]]: (chunk, score) pairs for each query
 
-    def search_with_scores(self, query_embedding: np.ndarray, top_k: int = 3) -> List[Tuple[str, float]]:
+        Example:
+            >>> results = store.search_batch(embedder.embed(questions), top_k=5)
         """
-        Same as search() but also returns similarity scores.
+        snap = self._snapshot
+        distances, indices = self._search(snap, query_embeddings, top_k, min_score, where)
 
-        Returns:
-            List[Tuple[str, float]]: List of (chunk, distance) pairs
+        # Gather every hit of every query in one vectorized pass, then split per query
+        found = indices >= 0
+        chunks = self._take_chunks(snap, indices[found])
+        scores = distances[found].tolist()
+        bounds = np.concatenate(([0], np.cumsum(found.sum(axis=1)))).tolist()
+        return [
+            list(zip(chunks[lo:hi], scores[lo:hi]))
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def search_with_provenance(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+    ) -> List[SearchResult]:
         """
-        if len(self.chunks) == 0:
-            raise RuntimeError("Vector store is empty. Call add() first.")
+        Same as search_with_scores() but each result also carries its provenance.
 
+        Returns:
+            List[SearchResult]: (chunk, score, doc_id, source, start, end) tuples
+        """
         query_embedding = np.array(query_embedding, dtype=np.float32)
         if query_embedding.ndim == 1:
             query_embedding = query_embedding.reshape(1, -1)
 
-        top_k = min(top_k, len(self.chunks))
-        distances, indices = self.index.search(query_embedding, top_k)
+        snap = self._snapshot
+        distances, indices = self._search(snap, query_embedding[:1], top_k, min_score, where)
+        found = indices[0] >= 0
+        return self._results(snap, distances[0][found], indices[0][found])
+
+    def search_lexical(
+        self,
+        query: str,
+        top_k: int = 3,
+        where: Optional[Filter] = None,
+    ) -> List[SearchResult]:
+        """
+        Keyword (BM25) search over the stored chunk texts.
+
+        Good at exact identifiers such as error codes, SKUs and function
+        names, which embeddings tend to blur.
+
+        Args:
+            query (str): Query text
+            top_k (int): Number of results to return
+            where (dict, optional): Metadata filter (see search())
+
+        Returns:
+            List[SearchResult]: Matches with BM25 scores (higher = better).
+                                Chunks sharing no term with the query are
+                                not returned, so there may be fewer than top_k.
+        """
+        snap = self._snapshot
+        if snap.n_live == 0:
+            raise RuntimeError("Vector store is empty. Call add() first.")
+        scores, rows = self._search_lexical(snap, query, top_k, where)
+        return self._results(snap, scores, rows)
+
+    def search_hybrid(
+        self,
+        query_embedding: np.ndarray,
+        query: str,
+        top_k: int = 3,
+        candidates: Optional[int] = None,
+        rrf_k: int = 60,
+        where: Optional[Filter] = None,
+    ) -> List[SearchResult]:
+        """
+        Fuse dense (FAISS) and keyword (BM25) rankings with reciprocal-rank fusion.
+
+        Args:
+            query_embedding (np.ndarray): 1D query vector
+            query (str): The query text, for the keyword side
+            top_k (int): Number of results to return
+            candidates (int, optional): Results taken from each side before
+                fusing. Default: max(4 × top_k, 20)
+            rrf_k (int): RRF damping constant. Default: 60
+            where (dict, optional): Metadata filter applied to both sides
+
+        Returns:
+            List[SearchResult]: Fused results; the score is the RRF score
+                                (higher = better)
+        """
+        query_embedding = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
+        candidates = candidates or max(4 * top_k, 20)
+
+        snap = self._snapshot
+        allowed = None if where is None else self._filter_mask(snap, where)
+        _, dense_rows = self._search(snap, query_embedding, candidates, allowed=allowed)
+        _, lexical_rows = self._search_lexical(snap, query, candidates, allowed=allowed)
+        scores, rows = reciprocal_rank_fusion([dense_rows[0], lexical_rows], k=rrf_k, top_k=top_k)
+        return self._results(snap, scores, rows)
+
+    def search_diverse(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        diversity: float = 0.5,
+        candidates: Optional[int] = None,
+        collapse_adjacent: bool = True,
+        where: Optional[Filter] = None,
+    ) -> List[SearchResult]:
+        """
+        Search, then re-rank a larger candidate pool with maximal marginal
+        relevance so near-duplicate chunks don't crowd out the rest.
+
+        The pool's vectors are taken from the stored rescore vectors or
+        reconstructed from the index (approximate for quantized types), and
+        MMR compares them by cosine similarity whatever the metric.
 
+        Args:
+            query_embedding (np.ndarray): 1D query vector
+            top_k (int): Number of results to return
+            diversity (float): 0 = plain relevance order, 1 = maximal
+                diversity. Default: 0.5
+            candidates (int, optional): Pool size fetched from the index.
+                Default: max(10 × top_k, 100)
+            collapse_adjacent (bool): Never return two overlapping or
+                touching chunks of the same document. Default: True
+            where (dict, optional): Metadata filter (see search())
+
+        Returns:
+            List[SearchResult]: Results in MMR pick order; scores are the
+                                index's scores for the query
+
+        Example:
+            >>> results = store.search_diverse(embedder.embed([question])[0], top_k=5, diversity=0.3)
+        """
+        query_embedding = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
+        candidates = max(candidates or max(10 * top_k, 100), top_k)
+
+        snap = self._snapshot
+        distances, indices = self._search(snap, query_embedding, candidates, where=where)
+        found = indices[0] >= 0
+        rows, scores = indices[0][found], distances[0][found]
+        with metrics.span("rerank", items=len(rows)):
+            if snap.vectors is not None:
+                vectors = snap.vectors.take(rows)
+            else:
+                vectors = self._reconstruct(snap.index, rows)
+            exclude = chunk_neighbours(snap.doc_ids[rows], snap.spans[rows]) if collapse_adjacent else None
+            picked = maximal_marginal_relevance(query_embedding[0], vectors, top_k, diversity, exclude)
+        return self._results(snap, scores[picked], rows[picked])
+
+    def _results(self, snap: _Snapshot, scores: np.ndarray, ids: np.ndarray) -> List[SearchResult]:
+        """Build SearchResults for the given rows (all must be valid, i.e. >= 0)."""
+        doc_ids = snap.doc_ids[ids].tolist()
+        spans = snap.spans[ids].tolist()
+        chunk_ids = snap.chunk_ids[ids].tolist()
+        pages = snap.pages[ids].tolist()
         return [
-            (self.chunks[idx], float(dist))
-            for idx, dist in zip(indices[0], distances[0])
-            if idx < len(self.chunks)
+            SearchResult(
+                chunk,
+                score,
+                doc_id,
+                snap.sources[doc_id] if doc_id >= 0 else None,
+                start,
+                end,
+                chunk_id,
+                page,
+            )
+            for chunk, score, doc_id, (start, end), chunk_id, page
+            in zip(self._take_chunks(snap, ids), np.asarray(scores).tolist(), doc_ids, spans, chunk_ids, pages)
         ]
 
+    def _filter_mask(self, snap: _Snapshot, where: Filter) -> np.ndarray:
+        """Rows of the snapshot that match ``where`` and haven't been removed."""
+        columns = dict(snap.metadata)
+        columns["doc_id"] = ColumnView(snap.doc_ids, None, None, None)
+        columns["source"] = ColumnView(snap.doc_ids, None, snap.sources, None)
+        columns["page"] = ColumnView(snap.pages, snap.pages >= 0, None, None)
+        mask = filters.evaluate(where, columns, snap.n_rows)
+        if snap.live is not None:
+            mask &= snap.live
+        return mask
+
+    def _search_lexical(
+        self,
+        snap: _Snapshot,
+        query: str,
+        top_k: int,
+        where: Optional[Filter] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 search over live rows, or only the rows a filter allows."""
+        if where is not None:
+            allowed = self._filter_mask(snap, where)
+        with metrics.span("lexical", items=1):
+            if allowed is None:
+                return snap.lexical.search(query, top_k, live=snap.live)
+            # Truncated postings could hold none of the allowed rows, so read them all
+            return snap.lexical.search(query, top_k, live=allowed, postings_limit=None)
+
+    def _search(
+        self,
+        snap: _Snapshot,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        min_score: Optional[float] = None,
+        where: Optional[Filter] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a FAISS search; returns (scores, row indices), -1 marking empty or
+        cut-off slots. ``where`` (or its precomputed mask ``allowed``)
+        restricts the search to matching rows.
+        """
+        if snap.n_live == 0:
+            raise RuntimeError("Vector store is empty. Call add() first.")
+        if min_score is not None and not self.higher_is_better:
+            raise ValueError("min_score needs a similarity metric ('ip' or 'cosine').")
+
+        query_embeddings = np.asarray(query_embeddings)
+        if query_embeddings.ndim != 2 or query_embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected queries of shape (n, {self.dim}), got {query_embeddings.shape}."
+            )
+
+        if where is not None:
+            allowed = self._filter_mask(snap, where)
+        n_allowed = snap.n_live if allowed is None else int(np.count_nonzero(allowed))
+        top_k = min(top_k, n_allowed)  # Can't return more than we have
+        queries = self._prepare(query_embeddings)
+        if top_k == 0:   # Nothing matches the filter
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+
+        ann = snap.trained and self.index_type in _ANN_TYPES
+        if allowed is not None and n_allowed <= (_EXACT_FILTER_ROWS_ANN if ann else _EXACT_FILTER_ROWS):
+            with metrics.span("search", items=len(queries)):
+                scores, indices = self._search_rows(snap, queries, np.flatnonzero(allowed), top_k)
+        else:
+            rescore = self.rescore if snap.vectors is not None else 0
+            fetch = min(top_k * rescore, n_allowed) if rescore else top_k
+
+            # Tombstoned and filtered-out rows are skipped inside FAISS via a bitmap
+            bitmap = snap.live_bitmap if allowed is None else np.packbits(allowed, bitorder="little")
+            with metrics.span("search", items=len(queries)):
+                scores, indices = self._index_search(snap, queries, fetch, bitmap)
+                if rescore:
+                    scores, indices = self._rescore(snap, queries, indices, top_k)
+
+        if min_score is not None:
+            # Results are sorted best-first, so everything after the first miss is cut too
+            indices[scores < min_score] = -1
+        return scores, indices
+
+    def _search_rows(
+        self,
+        snap: _Snapshot,
+        queries: np.ndarray,
+        rows: np.ndarray,
+        top_k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact search over a few rows, with full-precision vectors when kept."""
+        if snap.vectors is not None:
+            vectors = snap.vectors.take(rows)
+        else:
+            vectors = self._reconstruct(snap.index, rows)
+        exact = self._faiss.IndexFlat(self.dim, self._faiss_metric)
+        exact.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        scores, positions = exact.search(queries, top_k)
+        return scores, np.where(positions >= 0, rows[positions], -1)
+
+    def _rescore(
+        self,
+        snap: _Snapshot,
+        queries: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-rank candidate rows by exact scores against the full-precision vectors."""
+        found = indices >= 0
+        vectors = snap.vectors.take(np.where(found, indices, 0).ravel())
+        vectors = vectors.reshape(indices.shape + (self.dim,))
+        if self.metric == "l2":
+            scores = ((vectors - queries[:, None, :]) ** 2).sum(axis=2)   # Squared, as FAISS reports
+            scores[~found] = np.inf
+            order = np.argsort(scores, axis=1, kind="stable")[:, :top_k]
+        else:
+            scores = np.einsum("qkd,qd->qk", vectors, queries)
+            scores[~found] = -np.inf
+            order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        return (
+            np.take_along_axis(scores, order, axis=1).astype(np.float32),
+            np.take_along_axis(indices, order, axis=1),
+        )
+
+    def _index_search(
+        self,
+        snap: _Snapshot,
+        queries: np.ndarray,
+        k: int,
+        bitmap: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the snapshot's FAISS index, skipping rows appended after it
+        was published (see _writable_index) as well as rows off the bitmap.
+        """
+        bounded = bitmap is None and snap.index.ntotal > snap.n_rows
+        scores, indices = snap.index.search(queries, k, params=self._search_params(snap, bitmap, bounded))
+        if bitmap is None and not bounded and (indices >= snap.n_rows).any():
+            # Rows were appended while the search ran: repeat it without them
+            scores, indices = snap.index.search(queries, k, params=self._search_params(snap, None, True))
+        return scores, indices
+
+    def _search_params(self, snap: _Snapshot, bitmap: Optional[np.ndarray] = None, bounded: bool = False):
+        """
+        Build per-call FAISS search parameters: nprobe / ef_search, plus an
+        optional row filter given as a little-endian bitmap (bit set = keep),
+        or if ``bounded`` one that skips rows past the snapshot's n_rows.
+        """
+        faiss = self._faiss
+        kwargs = {}
+        if bitmap is not None:
+            # Sized in bytes: rows appended since the snapshot fall outside it
+            kwargs["sel"] = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        elif bounded:
+            kwargs["sel"] = faiss.IDSelectorRange(0, snap.n_rows)
+
+        if snap.trained and self.index_type in _IVF_TYPES:
+            params = faiss.SearchParametersIVF(nprobe=self.nprobe, **kwargs)
+        elif snap.trained and self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(efSearch=self.ef_search, **kwargs)
+        elif kwargs:
+            params = faiss.SearchParameters(**kwargs)
+        else:
+            return None
+        # FAISS only keeps raw pointers: hold on to the selector and its bitmap
+        params._keepalive = (kwargs.get("sel"), bitmap)
+        return params
+
+    def evaluate_recall(
+        self,
+        queries: np.ndarray,
+        top_k: int = 10,
+        vectors: Optional[np.ndarray] = None,
+    ) -> float:
+        """
+        Measure recall@k of the active index against exact (flat) search.
+
+        Use it to pick nprobe / ef_search from data: raise the knob until
+        recall is good enough, then check latency.
+
+        Args:
+            queries (np.ndarray): 2D array of sample query embeddings
+            top_k (int): k for recall@k (default: 10)
+            vectors (np.ndarray, optional): The stored vectors, one per index row
+                (insertion order, since the last compact()). Only needed for
+                quantized index types without rescore, whose stored codes
+                are lossy.
+
+        Returns:
+            float: Average fraction of the exact top-k that the index also returned
+
+        Example:
+            >>> for nprobe in (1, 4, 16, 64):
+            ...     store.nprobe = nprobe
+            ...     print(nprobe, store.evaluate_recall(sample_queries))
+        """
+        snap = self._snapshot
+        live = np.arange(snap.n_rows) if snap.live is None else np.flatnonzero(snap.live)
+        if vectors is None:
+            if snap.vectors is not None:
+                vectors = snap.vectors.take(live)
+            elif self.index_type in _LOSSY_TYPES and snap.trained:
+                raise ValueError(f"{self.index_type} stores lossy codes; pass the original vectors.")
+            else:
+                vectors = self._reconstruct(snap.index, live)
+        else:
+            if len(vectors) != snap.n_rows:
+                raise ValueError(
+                    f"Expected {snap.n_rows} vectors, got {len(vectors)}."
+                )
+            vectors = np.asarray(vectors)[live]
+
+        exact = self._faiss.IndexFlat(self.dim, self._faiss_metric)
+        exact.add(self._prepare(vectors))
+        top_k = min(top_k, len(live))
+        _, truth = exact.search(self._prepare(queries), top_k)
+        truth = np.where(truth >= 0, live[truth], -1)   # Back to index row numbers
+        _, found = self._search(snap, queries, top_k)
+
+        hits = sum(
+            len(np.intersect1d(t[t >= 0], f[f >= 0]))
+            for t, f in zip(truth, found)
+        )
+        return hits / (len(queries) * top_k)
+
+    def bytes_per_vector(self) -> float:
+        """
+        Serialized size of the FAISS index divided by its vector count.
+
+        Counts codes plus index overhead (HNSW links, IVF lists); the
+        full-precision copies kept for rescoring are not included.
+        """
+        index = self._snapshot.index
+        n_rows = index.ntotal   # Counts rows appended since the snapshot, like the serialization
+        return len(self._faiss.serialize_index(index)) / max(n_rows, 1)
+
+    @staticmethod
+    def _take_chunks(snap: _Snapshot, ids: np.ndarray) -> List[str]:
+        """Decode the chunk texts for an array of row ids (only results are ever decoded)."""
+        return snap.chunks.take(ids)
+
+    def save(self, directory: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persist the index, chunk texts and a manifest to a directory.
+
+        Args:
+            directory (str): Target directory (created if missing)
+            metadata (dict, optional): Extra fields to record in the manifest,
+                                       e.g. the embedding model name
+
+        Example:
+            >>> store.save("my_index/")
+            >>> store = VectorStore.load("my_index/")
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock:
+            self.publish()
+            self._save(directory, metadata)
+
+    def _save(self, directory: str, metadata: Optional[Dict[str, Any]]) -> None:
+        index_path = os.path.join(directory, storage.INDEX_FILE)
+        self._faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        self.chunks.save(directory)
+        metadata_columns, metadata_spec = self.metadata.to_columns()
+        storage.write_columns(
+            directory,
+            doc_ids=self._doc_ids.view(),
+            spans=self._spans.view().reshape(-1, 2),
+            chunk_ids=self._chunk_ids.view(),
+            pages=self._pages.view(),
+            deleted=self._deleted.view(),
+            **self.lexical.to_columns(),
+            **metadata_columns,
+        )
+        if self._vectors is not None:
+            self._vectors.save(directory)
+
+        manifest = dict(metadata or {})
+        manifest.update(
+            dim=self.dim,
+            metric=self.metric,
+            total_chunks=self.total_chunks,
+            next_chunk_id=self._next_chunk_id,
+            sources=self.sources,
+            chunk_metadata=metadata_spec,
+            index={
+                "type": self.index_type,
+                "trained": self._trained,
+                "nlist": self.nlist,
+                "pq_m": self.pq_m,
+                "hnsw_m": self.hnsw_m,
+                "nprobe": self.nprobe,
+                "ef_search": self.ef_search,
+                "compact_threshold": self.compact_threshold,
+                "rescore": self.rescore,
+            },
+        )
+        storage.write_manifest(directory, manifest)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = False) -> "VectorStore":
+        """
+        Open a store previously written with save().
+
+        The FAISS index is read into memory; chunk texts (and full-precision
+        vectors kept for rescoring) are memory-mapped and only read when a
+        search needs them.
+
+        Args:
+            directory (str): Directory written by save()
+            mmap (bool): Memory-map the FAISS index too, so processes opening the
+                same index share one copy in the page cache. The first write
+                then reads it into memory. Needs FAISS >= 1.8 (otherwise the
+                index is read normally). Default: False
+
+        Returns:
+            VectorStore: The restored store
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest
+            ValueError: If the saved files are inconsistent with the manifest
+        """
+        manifest = storage.read_manifest(directory)
+        options = dict(manifest["index"])
+        trained = options.pop("trained")
+        store = cls(
+            dim=manifest["dim"],
+            metric=manifest["metric"],
+            index_type=options.pop("type"),
+            **options,
+        )
+        index_path = os.path.join(directory, storage.INDEX_FILE)
+        mmap_flag = getattr(store._faiss, "IO_FLAG_MMAP_IFC", None)
+        if mmap and mmap_flag is not None:
+            store.index = store._faiss.read_index(index_path, mmap_flag | store._faiss.IO_FLAG_READ_ONLY)
+            store._index_mapped = True
+        else:
+            store.index = store._faiss.read_index(index_path)
+        store._trained = trained
+        store.chunks = ChunkArena.open(directory)
+        store.sources = list(manifest["sources"])
+        doc_ids, spans, chunk_ids, deleted = storage.read_columns(
+            directory, "doc_ids", "spans", "chunk_ids", "deleted"
+        )
+        store._doc_ids = GrowableArray(np.int64, doc_ids)
+        store._spans = GrowableArray(np.int64, spans.ravel())
+        store._chunk_ids = GrowableArray(np.int64, chunk_ids)
+        store._deleted = GrowableArray(np.bool_, deleted)
+        if os.path.exists(os.path.join(directory, "pages.npy")):
+            store._pages = GrowableArray(np.int32, *storage.read_columns(directory, "pages"))
+        else:   # Saved before pages were recorded
+            store._pages = GrowableArray(np.int32, np.full(len(doc_ids), -1, dtype=np.int32))
+        store._n_deleted = int(deleted.sum())
+        store._next_chunk_id = manifest["next_chunk_id"]
+        store.lexical = BM25Index.from_columns(storage.read_columns(directory, *BM25_COLUMNS))
+        store.metadata = MetadataTable.from_columns(
+            directory, manifest.get("chunk_metadata", {}), len(store._doc_ids)
+        )
+        if store.rescore:
+            store._vectors = VectorRows.open(directory, store.dim)
+        store.publish()
+
+        if store.index.d != store.dim:
+            raise ValueError(
+                f"Index dimension {store.index.d} does not match manifest dimension {store.dim}."
+            )
+        if not store.index.ntotal == len(store.chunks) == len(store._doc_ids):
+            raise ValueError(
+                f"Index holds {store.index.ntotal} vectors but {len(store.chunks)} chunks were saved."
+            )
+        if store._vectors is not None and len(store._vectors) != store.index.ntotal:
+            raise ValueError(
+                f"Index holds {store.index.ntotal} vectors but {len(store._vectors)} rescoring vectors were saved."
+            )
+        return store
+
     @property
     def total_chunks(self) -> int:
-        """Return total number of chunks stored."""
-        return len(self.chunks)
+        """Return number of chunks visible to searches (not counting removed ones)."""
+        return self._snapshot.n_live
+
+    @property
+    def total_documents(self) -> int:
+        """Return number of source documents that haven't been removed."""
+        return sum(source is not None for source in self.sources)
 
     def __repr__(self):
-        return f"VectorStore(dim={self.dim}, chunks={self.total_chunks})"
\ No newline at end of file
+        return (
+            f"VectorStore(dim={self.dim}, index='{self.index_type}', "
+            f"metric='{self.metric}', chunks={self.total_chunks})"
+        )
+
+
+def quantization_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int = 10,
+    index_types: Sequence[str] = ("flat", "fp16", "sq8", "pq"),
+    rescore: int = 4,
+    metric: str = "l2",
+) -> List[Dict[str, Any]]:
+    """
+    Compare index types on your own vectors: memory per vector and recall@k
+    against exact flat search, with and without exact rescoring.
+
+    Args:
+        vectors (np.ndarray): Sample of the corpus embeddings, shape (n, dim).
+            Trained types need at least min_train_size of them.
+        queries (np.ndarray): Sample query embeddings, shape (n_queries, dim)
+        top_k (int): k for recall@k. Default: 10
+        index_types (Sequence[str]): Index types to try
+        rescore (int): Candidate multiplier for the rescored recall. Default: 4
+        metric (str): Metric to build every store with. Default: "l2"
+
+    Returns:
+        List[Dict[str, Any]]: One row per index type with keys index_type,
+            trained, bytes_per_vector, recall and recall_rescored
+
+    Example:
+        >>> for row in quantization_report(embeddings[:50_000], query_embeddings):
+        ...     print(row)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    report = []
+    for index_type in index_types:
+        store = VectorStore(vectors.shape[1], index_type=index_type, metric=metric, rescore=rescore)
+        store.add(vectors, [""] * len(vectors))
+        store.rescore = 0
+        recall = store.evaluate_recall(queries, top_k)
+        store.rescore = rescore
+        report.append({
+            "index_type": index_type,
+            "trained": store.is_trained,
+            "bytes_per_vector": store.bytes_per_vector(),
+            "recall": recall,
+            "recall_rescored": store.evaluate_recall(queries, top_k),
+        })
+    return report
@@ -0,0 +1,24 @@
+# tests/test_benchmarks.py
+import json
+import os
+import subprocess
+import sys
+
+RUN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "run.py")
+
+
+def test_benchmark_suite_emits_json(tmp_path):
+    output = tmp_path / "results.json"
+    subprocess.run(
+        [sys.executable, RUN, "--scale", "smoke", "--dim", "32", "--output", str(output)],
+        check=True, capture_output=True, timeout=300,
+    )
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert set(results) == {"chunker", "ingest", "query", "indexes"}
+    assert results["chunker"]["chunk_text_mb_per_sec"] > 0
+    assert results["ingest"]["chunks"] > 0
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(results["query"]["batched"])
+    assert results["indexes"]["by_index_type"]["flat"]["recall_at_10"] == 1.0
+    assert 0 < results["indexes"]["by_index_type"]["hnsw"]["recall_at_10"] <= 1.0
+    assert results["indexes"]["by_index_type"]["flat"]["disk_mb_per_million_vectors"] > 0
@@ -0,0 +1,98 @@
+# tests/test_bm25.py
+import numpy as np
+from ragkitpy.bm25 import BM25Index, tokenize
+
+
+DOCS = [
+    "Login fails with ERR-404 when the session expires.",
+    "The cache is warmed on startup.",
+    "Call os.path.join to build the path; the path must exist.",
+]
+
+
+def test_tokenize_keeps_compound_identifiers():
+    assert tokenize("See ERR-404 in os.path.join!") == [
+        "see", "err-404", "err", "404", "in", "os.path.join", "os", "path", "join",
+    ]
+
+
+def test_exact_identifier_ranks_first():
+    index = BM25Index()
+    index.add(DOCS)
+    scores, rows = index.search("ERR-404", top_k=3)
+    assert rows.tolist() == [0]
+    assert scores[0] > 0
+
+
+def test_unknown_terms_return_nothing():
+    index = BM25Index()
+    index.add(DOCS)
+    scores, rows = index.search("kubernetes", top_k=3)
+    assert len(scores) == len(rows) == 0
+
+
+def test_rows_added_in_batches_match_single_add():
+    whole, batched = BM25Index(), BM25Index()
+    whole.add(DOCS)
+    batched.add(DOCS[:1])
+    batched.search("path", top_k=1)      # Forces a merge between the batches
+    batched.add(DOCS[1:])
+    a, b = whole.search("the path", top_k=3), batched.search("the path", top_k=3)
+    np.testing.assert_allclose(a[0], b[0])
+    assert a[1].tolist() == b[1].tolist()
+
+
+def test_live_mask_and_select():
+    index = BM25Index()
+    index.add(DOCS)
+    live = np.array([True, True, False])
+    assert index.search("path", top_k=3, live=live)[1].tolist() == []
+
+    index.select(np.array([2]))
+    assert len(index) == 1
+    assert index.search("path", top_k=3)[1].tolist() == [0]
+
+
+def test_postings_limit_reads_best_impacts_first():
+    index = BM25Index()
+    index.add(["path"] * 5 + ["path path path"])
+    _, rows = index.search("path", top_k=1, postings_limit=1)
+    assert rows.tolist() == [5]
+
+
+def test_columns_round_trip():
+    index = BM25Index()
+    index.add(DOCS)
+    restored = BM25Index.from_columns(list(index.to_columns().values()))
+    np.testing.assert_allclose(restored.search("cache path", 3)[0], index.search("cache path", 3)[0])
+
+
+def test_long_tokens_are_only_indexed_by_parts():
+    blob = "x" * 5000
+    assert tokenize(f"see https://example.com/{blob}") == ["see", "https", "example", "com"]
+    assert tokenize("a" * 64) == ["a" * 64]
+
+
+def test_saved_vocab_is_compact_and_round_trips_old_format():
+    index = BM25Index()
+    index.add([f"word{i}" for i in range(1000)] + ["päth " + "y" * 60])
+    columns = index.to_columns()
+    assert columns["bm25_vocab"].nbytes < 10_000
+    restored = BM25Index.from_columns(list(columns.values()))
+    assert restored.vocab == index.vocab
+    columns["bm25_vocab"] = np.array(list(index.vocab), dtype=str)   # Older layout
+    assert BM25Index.from_columns(list(columns.values())).search("päth", 1)[1].tolist() == [1000]
+
+
+def test_single_adds_stay_in_few_segments():
+    docs = [f"ticket T-{i} about {'disk' if i % 7 else 'network'} errors" for i in range(500)]
+    whole, single = BM25Index(), BM25Index()
+    whole.add(docs)
+    for doc in docs:
+        single.add([doc])
+        single.freeze()
+    assert len(single._segments) <= 2 * np.log2(len(docs))
+    assert single.search("T-123", top_k=1)[1].tolist() == [123]
+    assert sorted(single.search("network", top_k=100)[1]) == sorted(whole.search("network", top_k=100)[1])
+    single.to_columns()                  # Saving merges everything into one segment
+    np.testing.assert_allclose(single.search("network disk")[0], whole.search("network disk")[0], rtol=1e-6)
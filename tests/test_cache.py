@@ -0,0 +1,47 @@
+# tests/test_cache.py
+import pytest
+import numpy as np
+from ragkitpy.cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "cache.sqlite"))
+
+
+def test_get_many_returns_none_for_misses(cache):
+    assert cache.get_many("model", ["a", "b"]) == [None, None]
+    assert cache.misses == 2 and cache.hits == 0
+
+
+def test_roundtrip_keeps_order(cache):
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+    cache.put_many("model", ["a", "b", "c"], vectors)
+    found = cache.get_many("model", ["c", "missing", "a"])
+    assert np.array_equal(found[0], vectors[2])
+    assert found[1] is None
+    assert np.array_equal(found[2], vectors[0])
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_keys_are_per_model_and_normalized(cache):
+    cache.put_many("model-a", ["hello"], np.ones((1, 2), dtype=np.float32))
+    assert cache.get_many("model-b", ["hello"]) == [None]
+    assert cache.get_many("model-a", ["  hello \n"])[0] is not None
+
+
+def test_lru_eviction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put_many("model", ["a"], np.zeros((1, 2), dtype=np.float32))
+    cache.put_many("model", ["b"], np.zeros((1, 2), dtype=np.float32))
+    cache.get_many("model", ["a"])                 # "a" is now more recent than "b"
+    cache.put_many("model", ["c"], np.zeros((1, 2), dtype=np.float32))
+    assert len(cache) == 2
+    hits = cache.get_many("model", ["a", "b", "c"])
+    assert [h is not None for h in hits] == [True, False, True]
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    EmbeddingCache(path).put_many("model", ["a"], np.ones((1, 2), dtype=np.float32))
+    assert EmbeddingCache(path).get_many("model", ["a"])[0] is not None
@@ -0,0 +1,97 @@
+# tests/test_chunker.py
+import re
+import pytest
+from ragkitpy.chunker import chunk_by_tokens, chunk_text, chunk_text_with_offsets, iter_chunks
+from ragkitpy.loader import load_file, stream_file
+
+
+SAMPLE = "  RAG combines retrieval with generation.  " * 20
+
+
+def test_chunk_text_basic():
+    chunks = chunk_text(SAMPLE, chunk_size=100, overlap=10)
+    assert len(chunks) > 1
+    assert all(len(c) <= 100 for c in chunks)
+
+
+def test_chunk_text_empty_raises():
+    with pytest.raises(ValueError):
+        chunk_text("   ")
+
+
+def test_chunk_text_bad_overlap_raises():
+    with pytest.raises(ValueError):
+        chunk_text(SAMPLE, chunk_size=50, overlap=50)
+
+
+def test_offsets_point_into_source():
+    chunks = chunk_text_with_offsets(SAMPLE, chunk_size=100, overlap=10)
+    assert [c.text for c in chunks] == chunk_text(SAMPLE, chunk_size=100, overlap=10)
+    for chunk in chunks:
+        assert SAMPLE[chunk.start:chunk.end] == chunk.text
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1000])
+def test_iter_chunks_matches_chunk_text(block_size):
+    text = "  Retrieval  augmented\n\ngeneration.   " * 30 + "tail"
+    blocks = [text[i:i + block_size] for i in range(0, len(text), block_size)]
+    assert list(iter_chunks(blocks, chunk_size=50, overlap=12)) == \
+        chunk_text_with_offsets(text, chunk_size=50, overlap=12)
+
+
+def test_iter_chunks_whitespace_raises():
+    with pytest.raises(ValueError):
+        list(iter_chunks(["   ", "\n\n"], chunk_size=10, overlap=2))
+
+
+def test_iter_chunks_streams_file(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("Streaming chunkers keep memory flat. " * 100, encoding="utf-8")
+    streamed = list(iter_chunks(stream_file(str(path), block_size=100), chunk_size=120, overlap=20))
+    assert streamed == chunk_text_with_offsets(load_file(str(path)), chunk_size=120, overlap=20)
+
+
+class WordTokenizer:
+    """Minimal stand-in for a HF fast tokenizer: one token per word."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True, verbose=True):
+        self.calls += 1
+        return {"offset_mapping": [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]}
+
+
+TOKEN_TEXT = "One two three. Four five six seven. Eight nine. Ten eleven twelve thirteen fourteen."
+
+
+def test_chunk_by_tokens_respects_budget_and_sentences():
+    tokenizer = WordTokenizer()
+    chunks = chunk_by_tokens(TOKEN_TEXT, tokenizer, max_tokens=6)
+    assert tokenizer.calls == 1
+    assert [c.text for c in chunks] == [
+        "One two three.",
+        "Four five six seven. Eight nine.",
+        "Ten eleven twelve thirteen fourteen.",
+    ]
+    for chunk in chunks:
+        assert TOKEN_TEXT[chunk.start:chunk.end] == chunk.text
+
+
+def test_chunk_by_tokens_splits_long_sentences():
+    chunks = chunk_by_tokens("a b c d e f g h i j.", WordTokenizer(), max_tokens=4)
+    assert [c.text for c in chunks] == ["a b c d", "e f g h", "i j."]
+
+
+def test_chunk_by_tokens_overlap_prefers_sentence_starts():
+    chunks = chunk_by_tokens(TOKEN_TEXT, WordTokenizer(), max_tokens=7, overlap_tokens=2)
+    assert [c.text for c in chunks] == [
+        "One two three. Four five six seven.",
+        "six seven. Eight nine.",                              # Token-level overlap
+        "Eight nine. Ten eleven twelve thirteen fourteen.",    # Whole-sentence overlap
+    ]
+
+
+def test_chunk_by_tokens_bad_overlap_raises():
+    with pytest.raises(ValueError):
+        chunk_by_tokens(TOKEN_TEXT, WordTokenizer(), max_tokens=4, overlap_tokens=4)
@@ -34,4 +34,70 @@ def test_embed_empty_list_raises(embedder):
 
 
 def test_embedding_dim_property(embedder):
-    assert embedder.embedding_dim == 384
\ No newline at end of file
+    assert embedder.embedding_dim == 384
+
+
+def test_embed_with_cache_matches_uncached(embedder, tmp_path):
+    cached = HFEmbedder(cache=str(tmp_path / "cache.sqlite"))
+    texts = ["First chunk", "Second chunk"]
+    first = cached.embed(texts)
+    second = cached.embed(["Second chunk", "First chunk", "Third chunk"])
+    assert cached.cache.hits == 2
+    assert np.allclose(second[:2], first[::-1], atol=1e-6)
+    assert np.allclose(first, embedder.embed(texts), atol=1e-6)
+
+
+def test_fully_cached_embed_does_not_load_the_model(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = HFEmbedder(cache=path).embed(["First chunk", "Second chunk"])
+    reopened = HFEmbedder(cache=path)
+    assert np.allclose(reopened.embed(["Second chunk", "First chunk"]), first[::-1], atol=1e-6)
+    assert not reopened.is_loaded
+
+
+def test_normalize_produces_unit_vectors():
+    embedder = HFEmbedder(normalize=True)
+    result = embedder.embed(["First chunk", "A much longer second chunk of text"])
+    assert np.allclose(np.linalg.norm(result, axis=1), 1.0, atol=1e-5)
+
+
+def test_max_tokens(embedder):
+    assert embedder.max_tokens == 254     # MiniLM reads 256 tokens incl. [CLS] and [SEP]
+
+
+def test_hashing_embedder_is_deterministic_and_lexical():
+    from ragkitpy.embedder import HashingEmbedder
+
+    embedder = HashingEmbedder(dim=256)
+    vectors = embedder.embed(["Error ERR-404 on login", "error err-404 ON LOGIN", "All systems nominal"])
+    assert vectors.shape == (3, 256) and vectors.dtype == np.float32
+    assert np.allclose(vectors[0], vectors[1])
+    assert abs(vectors[0] @ vectors[2]) < 0.5
+    assert np.array_equal(HashingEmbedder(dim=256).embed_single("Error ERR-404"), embedder.embed_single("Error ERR-404"))
+
+
+def test_hashing_embedder_keeps_one_row_per_text():
+    from ragkitpy.embedder import HashingEmbedder
+
+    vectors = HashingEmbedder(dim=64, ngrams=3).embed(["a b c", "   ", "d"])
+    assert vectors.shape == (3, 64)
+    assert not vectors[1].any()
+
+
+def test_embed_keeps_alignment_with_duplicates_and_blanks(embedder):
+    texts = ["Repeated footer", "   ", "Body text", "Repeated footer  "]
+    result = embedder.embed(texts)
+    assert result.shape == (4, 384)
+    assert np.array_equal(result[0], result[3])
+    assert np.allclose(result[2], embedder.embed(["Body text"])[0], atol=1e-6)
+
+
+def test_embed_batches_by_length_and_encodes_duplicates_once(monkeypatch):
+    embedder = HFEmbedder(batch_size=2)
+    batches = []
+    encode = embedder.model.encode
+    monkeypatch.setattr(embedder.model, "encode", lambda texts, **kwargs: batches.append(list(texts)) or encode(texts, **kwargs))
+    texts = ["a much longer chunk of text here", "tiny", "medium sized chunk", "tiny", "x"]
+    result = embedder.embed(texts)
+    assert [sorted(batch) for batch in batches] == [["tiny", "x"], ["a much longer chunk of text here", "medium sized chunk"]]
+    assert result.shape == (5, 384) and np.array_equal(result[1], result[3])
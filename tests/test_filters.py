@@ -0,0 +1,63 @@
+# tests/test_filters.py
+import datetime
+
+import numpy as np
+import pytest
+from ragkitpy.filters import MetadataTable, evaluate
+
+
+@pytest.fixture
+def table():
+    table = MetadataTable()
+    table.extend(4, {
+        "tenant": ["acme", "globex", "acme", None],
+        "year": [2021, 2022, 2023, 2024],
+        "draft": [False, True, False, False],
+    })
+    table.extend(2)   # Rows without metadata
+    table.extend(2, {"published": [datetime.date(2024, 1, 5), None], "year": np.array([2019, 2025])})
+    return table
+
+
+def matches(table, where):
+    return np.flatnonzero(evaluate(where, table.freeze(), table.n_rows)).tolist()
+
+
+def test_equality_ranges_and_sets(table):
+    assert matches(table, {"tenant": "acme"}) == [0, 2]
+    assert matches(table, {"year": {"$gte": 2022, "$lt": 2024}}) == [1, 2]
+    assert matches(table, {"year": {"$gt": 2021.5}}) == [1, 2, 3, 7]
+    assert matches(table, {"tenant": {"$in": ["acme", "initech"]}, "draft": False}) == [0, 2]
+    assert matches(table, {"published": {"$gte": "2024-01-01"}}) == [6]
+
+
+def test_missing_values_match_no_condition(table):
+    assert matches(table, {"tenant": {"$ne": "acme"}}) == [1]
+    assert matches(table, {"year": {"$nin": [2021]}}) == [1, 2, 3, 6, 7]
+    assert matches(table, {"$not": {"tenant": "acme"}}) == [1, 3, 4, 5, 6, 7]
+    assert matches(table, {"unknown_field": 1}) == []
+
+
+def test_boolean_combinators(table):
+    assert matches(table, {"$or": [{"tenant": "globex"}, {"year": 2019}]}) == [1, 6]
+    assert matches(table, {"$and": [{"tenant": "acme"}, {"year": {"$gt": 2021}}]}) == [2]
+
+
+def test_invalid_filters_and_values_raise(table):
+    with pytest.raises(ValueError):
+        matches(table, {"year": {"$like": 2020}})
+    with pytest.raises(ValueError):
+        matches(table, {"year": "2020"})
+    with pytest.raises(ValueError):
+        matches(table, {"tenant": {"$in": "acme"}})
+    with pytest.raises(ValueError):
+        table.extend(1, {"year": [2020.5]})   # No silent truncation
+    with pytest.raises(ValueError):
+        table.extend(1, {"doc_id": [1]})
+    assert table.n_rows == 8 and len(table.freeze()["year"].values) == 8
+
+
+def test_select_keeps_rows_in_order(table):
+    selected = table.select(np.array([2, 6]))
+    assert matches(selected, {"tenant": "acme"}) == [0]
+    assert matches(selected, {"published": {"$lte": datetime.date(2024, 1, 5)}}) == [1]
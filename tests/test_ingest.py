@@ -0,0 +1,95 @@
+# tests/test_ingest.py
+import pytest
+import numpy as np
+from ragkitpy.ingest import IngestionEngine
+from ragkitpy.vectorstore import VectorStore
+
+
+class CountingEmbedder:
+    """Deterministic 4-dim embedder that records the size of every batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def embed(self, texts):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(t), t.count("a"), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"Document {i} talks about retrieval. " * 20, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_run_adds_every_document(corpus, workers):
+    store = VectorStore(dim=4)
+    embedder = CountingEmbedder()
+    engine = IngestionEngine(embedder, store, chunk_size=100, overlap=10,
+                             workers=workers, batch_size=16, queue_depth=2)
+    stats = engine.run(corpus)
+
+    assert stats.doc_ids == [0, 1, 2, 3, 4]
+    assert store.sources == corpus
+    assert stats.chunks == store.total_chunks
+    assert max(embedder.batch_sizes) <= 16
+    assert sum(embedder.batch_sizes) == stats.chunks
+    assert stats.chunks_per_sec > 0
+
+
+def test_batches_span_documents(corpus):
+    store = VectorStore(dim=4)
+    embedder = CountingEmbedder()
+    IngestionEngine(embedder, store, chunk_size=100, overlap=10, batch_size=16).run(corpus)
+    # 5 docs x 8 chunks = 40 chunks → 16 + 16 + 8, not one call per document
+    assert embedder.batch_sizes == [16, 16, 8]
+
+
+def test_missing_file_raises(corpus):
+    engine = IngestionEngine(CountingEmbedder(), VectorStore(dim=4), workers=2)
+    with pytest.raises(FileNotFoundError):
+        engine.run(corpus + ["missing.txt"])
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_skip_failed_drops_only_the_bad_document(corpus, tmp_path, workers):
+    bad = tmp_path / "latin1.txt"
+    bad.write_bytes("Document about retrieval. ".encode("utf-8") * 40 + "café".encode("latin-1"))
+    store = VectorStore(dim=4)
+    engine = IngestionEngine(CountingEmbedder(), store, chunk_size=100, overlap=10,
+                             workers=workers, batch_size=16)
+    missing = str(tmp_path / "missing.txt")
+    stats = engine.run([corpus[0], str(bad), missing, corpus[1]], skip_failed=True)
+
+    assert stats.failed == [str(bad), missing]
+    assert stats.doc_ids == [0, 3]
+    assert store.sources == [corpus[0], None, None, corpus[1]]
+    assert store.total_chunks == stats.chunks
+    with pytest.raises(UnicodeDecodeError):
+        engine.run([str(bad)])
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_failed_run_leaves_the_store_unchanged(corpus, tmp_path, workers):
+    bad = tmp_path / "latin1.txt"
+    bad.write_bytes("café".encode("latin-1"))
+    store = VectorStore(dim=4)
+    engine = IngestionEngine(CountingEmbedder(), store, chunk_size=100, overlap=10,
+                             workers=workers, batch_size=16)
+    engine.run(corpus[:1])
+    chunks = store.total_chunks
+
+    with pytest.raises(UnicodeDecodeError):
+        engine.run(corpus[1:3] + [str(bad)])
+    assert (store.total_chunks, store.total_documents) == (chunks, 1)
+    assert [source for source in store.sources if source is not None] == corpus[:1]
+
+
+def test_invalid_settings_raise():
+    with pytest.raises(ValueError):
+        IngestionEngine(CountingEmbedder(), VectorStore(dim=4), batch_size=0)
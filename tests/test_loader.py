@@ -1,6 +1,7 @@
 # tests/test_loader.py
 import pytest
-from ragkitpy.loader import load_txt, load_file
+import numpy as np
+from ragkitpy.loader import PageOffsets, iter_pdf_pages, load_txt, load_file, stream_file
 import tempfile
 import os
 
@@ -37,4 +38,89 @@ def test_load_file_unsupported_type():
 
     with pytest.raises(ValueError):
         load_file(tmp_path)
-    os.unlink(tmp_path)
\ No newline at end of file
+    os.unlink(tmp_path)
+
+
+def test_stream_file_matches_load_file():
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        f.write("Ünïcode line\r\nsecond line\n" * 50)
+        tmp_path = f.name
+
+    blocks = list(stream_file(tmp_path, block_size=16))
+    assert len(blocks) > 1
+    assert "".join(blocks) == load_file(tmp_path)
+    os.unlink(tmp_path)
+
+
+def test_stream_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        stream_file("nonexistent_file.txt")
+
+
+def write_pdf(path, pages):
+    """Write a minimal PDF with one line of Helvetica text per page ("" = blank page)."""
+    n = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n)) + b"] /Count %d >>" % n,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode("latin-1") if text else b""
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+
+
+@pytest.fixture
+def long_pdf(tmp_path):
+    path = str(tmp_path / "long.pdf")
+    write_pdf(path, ["Page one text", ""] + [f"Page {n} text" for n in range(3, 41)])
+    return path
+
+
+def test_page_parallel_pdf_matches_serial(long_pdf):
+    serial = list(iter_pdf_pages(long_pdf))
+    assert serial[:3] == [(1, "Page one text"), (2, ""), (3, "Page 3 text")]
+    assert list(iter_pdf_pages(long_pdf, workers=3, pages_per_task=4)) == serial
+    assert load_file(long_pdf, pdf_workers=2) == "\n".join(text for _, text in serial if text)
+
+
+def test_stream_file_records_page_offsets(long_pdf):
+    pages = PageOffsets()
+    text = "".join(stream_file(long_pdf, pdf_workers=2, pages=pages))
+    assert pages.page_at(0) == 1
+    assert pages.page_at(text.index("Page 3 text")) == 3
+    assert pages.page_at(len(text) - 1) == 40
+
+
+def test_ingested_pdf_chunks_carry_pages(long_pdf):
+    from ragkitpy.ingest import IngestionEngine
+    from ragkitpy.vectorstore import VectorStore
+
+    class Embedder:
+        def embed(self, texts):
+            return np.array([[len(t), t.count("1"), t.count("2"), 1.0] for t in texts], dtype=np.float32)
+
+    store = VectorStore(dim=4)
+    IngestionEngine(Embedder(), store, chunk_size=40, overlap=0, pdf_workers=2).run([long_pdf])
+    results = store.search_with_provenance(np.ones(4), top_k=100)
+    text = load_file(long_pdf)
+    for r in results:
+        header = text[text.rfind("Page ", 0, r.start + 5):].split()[1]
+        assert r.page == (1 if header == "one" else int(header))
+    early = store.search_with_provenance(np.ones(4), top_k=100, where={"page": {"$lte": 3}})
+    assert early and all(r.page <= 3 for r in early)
@@ -0,0 +1,111 @@
+# tests/test_metrics.py
+import pstats
+
+import numpy as np
+import pytest
+from ragkitpy import metrics
+from ragkitpy.ingest import IngestionEngine
+from ragkitpy.metrics import LatencyHistogram, MetricsRegistry, StageEvent
+from ragkitpy.vectorstore import VectorStore
+
+
+class Collector:
+    def __init__(self):
+        self.events = []
+
+    def on_stage(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def collector():
+    observer = Collector()
+    metrics.add_observer(observer)
+    yield observer
+    metrics.remove_observer(observer)
+
+
+def embed(texts):
+    return np.array([[len(t), t.count("a"), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+
+
+class Embedder:
+    def embed(self, texts):
+        return embed(texts)
+
+
+def test_histogram_percentiles_are_close_upper_bounds():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.count == 100
+    assert 0.050 <= histogram.percentile(50) <= 0.050 * 1.13
+    assert 0.099 <= histogram.percentile(99) <= 0.100
+    assert histogram.percentile(100) == pytest.approx(0.1)
+    assert sum(n for _, n in histogram.buckets()) == 100
+
+
+def test_registry_aggregates_events():
+    registry = MetricsRegistry()
+    registry.on_stage(StageEvent("embed", 0.5, 32, 0.0))
+    registry.on_stage(StageEvent("embed", 1.5, 32, 0.0))
+    stats = registry.stage("embed")
+    assert (stats.calls, stats.items, stats.seconds) == (2, 64, 2.0)
+    assert stats.items_per_sec == 32
+    assert registry.stage("search").calls == 0
+    assert registry.snapshot()["embed"]["max_ms"] == 1500
+    registry.reset()
+    assert registry.stages == []
+
+
+def test_span_reports_time_and_late_item_count(collector):
+    with metrics.span("chunk") as span:
+        span.items = 7
+    event, = collector.events
+    assert event.stage == "chunk" and event.items == 7 and event.seconds >= 0
+
+
+def test_failing_observer_does_not_break_the_pipeline(collector):
+    class Broken:
+        def on_stage(self, event):
+            raise RuntimeError("boom")
+
+    broken = Broken()
+    metrics.add_observer(broken)
+    try:
+        with metrics.span("search", items=1):
+            pass
+    finally:
+        metrics.remove_observer(broken)
+    assert len(collector.events) == 1
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_ingest_and_search_report_every_stage(tmp_path, collector, workers):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"Document {i} talks about retrieval. " * 20, encoding="utf-8")
+        paths.append(str(path))
+    store = VectorStore(dim=4)
+    stats = IngestionEngine(Embedder(), store, chunk_size=100, overlap=10, workers=workers).run(paths)
+    store.search(embed(["retrieval"])[0], top_k=2)
+    store.search_lexical("retrieval", top_k=2)
+
+    items = {}
+    for event in collector.events:
+        items[event.stage] = items.get(event.stage, 0) + event.items
+    assert items["load"] == 3
+    assert items["chunk"] == items["embed"] == items["index_add"] == stats.chunks
+    assert items["search"] == items["lexical"] == 1
+
+
+def test_profile_only_covers_selected_stages():
+    with metrics.profile("embed") as profiler:
+        with metrics.span("embed"):
+            embed(["profiled"])
+        with metrics.span("search"):
+            sorted(range(10))
+    functions = {name for _, _, name in pstats.Stats(profiler).stats}
+    assert "embed" in functions
+    assert "<built-in method builtins.sorted>" not in functions
@@ -80,4 +80,231 @@ def test_empty_query_raises(loaded_pipeline):
 
 def test_repr(loaded_pipeline):
     r = repr(loaded_pipeline)
-    assert "RAGPipeline" in r
\ No newline at end of file
+    assert "RAGPipeline" in r
+
+
+def test_save_and_open(loaded_pipeline, tmp_path):
+    loaded_pipeline.save(str(tmp_path))
+    reopened = RAGPipeline.open(str(tmp_path))
+    assert reopened.is_ready is True
+    assert reopened.query("What is RAG?", top_k=2) == loaded_pipeline.query("What is RAG?", top_k=2)
+
+
+def test_open_index_saved_without_chunking_setting(loaded_pipeline, tmp_path):
+    import json
+
+    loaded_pipeline.save(str(tmp_path))
+    manifest_path = tmp_path / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    del manifest["chunking"]
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    assert RAGPipeline.open(str(tmp_path)).chunking == "chars"
+
+
+def test_open_with_wrong_model_raises(loaded_pipeline, tmp_path):
+    loaded_pipeline.save(str(tmp_path))
+    with pytest.raises(ValueError):
+        RAGPipeline.open(str(tmp_path), model_name="all-mpnet-base-v2")
+
+
+def test_load_documents_accumulates(sample_txt_file, tmp_path):
+    other = tmp_path / "other.txt"
+    other.write_text("Pandas is a Python library for data analysis.", encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20)
+    doc_ids = rag.load_documents([sample_txt_file, str(other)], batch_size=4)
+    assert doc_ids == [0, 1]
+    assert rag.sources == [sample_txt_file, str(other)]
+
+    top = rag.query_with_provenance("Pandas data analysis library", top_k=1)[0]
+    assert top.source == str(other)
+    assert other.read_text(encoding="utf-8")[top.start:top.end] == top.chunk
+
+
+def test_query_batch_matches_query(loaded_pipeline):
+    questions = ["What is RAG?", "What is FAISS?"]
+    results = loaded_pipeline.query_batch(questions, top_k=2)
+    assert results == [loaded_pipeline.query(q, top_k=2) for q in questions]
+
+
+def test_cosine_pipeline_min_score(sample_txt_file):
+    rag = RAGPipeline(chunk_size=200, overlap=20, metric="cosine")
+    rag.load_document(sample_txt_file)
+    results = rag.query_with_scores("What is RAG?", top_k=3)
+    assert all(-1.0 <= score <= 1.0 + 1e-6 for _, score in results)
+    assert rag.query("What is RAG?", top_k=3, min_score=1.5) == []
+
+
+def test_token_chunking_stays_within_model_budget(sample_txt_file):
+    rag = RAGPipeline(chunk_size=64, overlap=8, chunking="tokens")
+    rag.load_document(sample_txt_file)
+    tokenizer = rag.embedder.tokenizer
+    for chunk in rag.store.chunks:
+        assert len(tokenizer(chunk, add_special_tokens=False)["input_ids"]) <= 64
+
+
+def test_replace_and_remove_document(sample_txt_file, tmp_path):
+    doc = tmp_path / "changing.txt"
+    doc.write_text("The launch code is ALPHA-1.", encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20)
+    rag.load_documents([sample_txt_file, str(doc)])
+
+    doc.write_text("The launch code is BRAVO-2.", encoding="utf-8")
+    new_id = rag.replace_document(str(doc))
+    chunks = [r.chunk for r in rag.query_with_provenance("launch code", top_k=10)]
+    assert "The launch code is BRAVO-2." in chunks
+    assert "The launch code is ALPHA-1." not in chunks
+
+    assert rag.remove_document(new_id) == 1
+    assert str(doc) not in rag.sources
+
+
+def test_query_hybrid_mode(sample_txt_file):
+    rag = RAGPipeline(chunk_size=200, overlap=20)
+    rag.load_document(sample_txt_file)
+    results = rag.query("FAISS library by Meta", top_k=3, mode="hybrid")
+    assert len(results) == 3
+    assert any("FAISS" in chunk for chunk in results)
+    assert "FAISS" in rag.query("FAISS", top_k=1, mode="lexical")[0]
+    with pytest.raises(ValueError):
+        rag.query("FAISS", mode="fuzzy")
+    with pytest.raises(ValueError):
+        rag.query("FAISS", min_score=0.5, mode="hybrid")
+
+
+def test_open_defers_loading_until_first_query(loaded_pipeline, tmp_path):
+    loaded_pipeline.save(str(tmp_path))
+    reopened = RAGPipeline.open(str(tmp_path))
+    assert not reopened.embedder.is_loaded
+    assert reopened._store is None
+    assert len(reopened.query("What is RAG?", top_k=2)) == 2
+    assert reopened.embedder.is_loaded
+
+
+def test_injected_embedder_is_used_and_reopened(sample_txt_file, tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    rag = RAGPipeline(chunk_size=200, overlap=20, metric="cosine", embedder=HashingEmbedder(dim=512))
+    rag.load_document(sample_txt_file)
+    assert rag.store.dim == 512
+    assert "FAISS" in rag.query("FAISS similarity search library", top_k=1)[0]
+
+    rag.save(str(tmp_path))
+    with pytest.raises(ValueError):
+        RAGPipeline.open(str(tmp_path), embedder=HashingEmbedder(dim=256))
+    reopened = RAGPipeline.open(str(tmp_path), embedder=HashingEmbedder(dim=512))
+    assert reopened.query("FAISS similarity search library", top_k=1) == rag.query("FAISS similarity search library", top_k=1)
+
+
+def test_query_where_filters_on_document_metadata(sample_txt_file, tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    other = tmp_path / "other.txt"
+    other.write_text("FAISS appears here too, in a document for another tenant. " * 10, encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    rag.load_documents([sample_txt_file, str(other)], metadata=[{"tenant": "acme"}, {"tenant": "globex"}])
+
+    for mode in ("dense", "lexical", "hybrid"):
+        results = rag.query_with_provenance("FAISS", top_k=5, mode=mode, where={"tenant": "globex"})
+        assert results and {r.source for r in results} == {str(other)}
+    assert rag.query_batch(["FAISS"], where={"tenant": "initech"}) == [[]]
+    with pytest.raises(ValueError):
+        rag.load_documents([str(other)], metadata=[])
+
+
+def test_query_diversity_returns_non_overlapping_chunks(sample_txt_file):
+    from ragkitpy.embedder import HashingEmbedder
+
+    rag = RAGPipeline(chunk_size=200, overlap=50, embedder=HashingEmbedder(dim=256))
+    rag.load_document(sample_txt_file)
+    results = rag.query_with_provenance("FAISS", top_k=3, diversity=0.5)
+    spans = sorted((r.start, r.end) for r in results)
+    assert results and all(end < start for (_, end), (start, _) in zip(spans, spans[1:]))
+    with pytest.raises(ValueError):
+        rag.query("FAISS", mode="lexical", diversity=0.5)
+
+
+def test_sync_directory_only_ingests_changes(tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.txt").write_text("Alpha talks about FAISS indexes. " * 10, encoding="utf-8")
+    (docs / "sub" / "b.txt").write_text("Beta talks about BM25 scoring. " * 10, encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    assert rag.sync_directory(str(docs), workers=0)[:4] == (2, 0, 0, 0)
+    rag.save(str(tmp_path / "index"))
+
+    reopened = RAGPipeline.open(str(tmp_path / "index"), embedder=HashingEmbedder(dim=256))
+    assert reopened.sync_directory(str(docs), workers=0)[:4] == (0, 0, 0, 2)
+    (docs / "a.txt").write_text("Alpha now talks about quantization. " * 10, encoding="utf-8")
+    os.remove(docs / "sub" / "b.txt")
+    assert reopened.sync_directory(str(docs), workers=0)[:4] == (0, 1, 1, 0)
+    assert reopened.sources.count(None) == 2
+    assert "quantization" in reopened.query("quantization", top_k=1, mode="lexical")[0]
+
+
+def test_sync_directory_skips_files_that_fail_and_retries_them(tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Alpha talks about FAISS indexes. " * 10, encoding="utf-8")
+    (docs / "bad.txt").write_bytes("Caf\xe9 menu. ".encode("latin-1") * 10)
+    (docs / "c.txt").write_text("Gamma talks about BM25 scoring. " * 10, encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    stats = rag.sync_directory(str(docs), workers=0)
+    assert stats[:4] == (2, 0, 0, 0)
+    assert stats.failed == [str(docs / "bad.txt")]
+    assert "BM25" in rag.query("BM25 scoring", top_k=1, mode="lexical")[0]
+
+    (docs / "bad.txt").write_text("Cafe menu, now in UTF-8. " * 10, encoding="utf-8")
+    stats = rag.sync_directory(str(docs), workers=0)
+    assert stats[:4] == (1, 0, 0, 2) and stats.failed == []
+
+
+def test_sync_directory_recognises_documents_loaded_by_relative_path(tmp_path, monkeypatch):
+    from ragkitpy.embedder import HashingEmbedder
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Alpha talks about FAISS indexes. " * 10, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    rag.load_documents([os.path.join("docs", "a.txt")], workers=0)
+    n_chunks = rag.store.total_chunks
+
+    assert rag.sync_directory("docs", workers=0)[:4] == (1, 0, 0, 0)
+    assert rag.sources == [None, str(docs / "a.txt")]   # Replaced, not duplicated
+    assert rag.store.total_chunks == n_chunks
+
+
+def test_sync_that_empties_the_directory_can_be_saved(tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Alpha talks about FAISS indexes. " * 10, encoding="utf-8")
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    rag.sync_directory(str(docs), workers=0)
+    rag.save(str(tmp_path / "index"))
+
+    os.remove(docs / "a.txt")
+    assert rag.sync_directory(str(docs), workers=0)[:4] == (0, 0, 1, 0)
+    assert not rag.is_ready
+    rag.save(str(tmp_path / "index"))
+
+    reopened = RAGPipeline.open(str(tmp_path / "index"), embedder=HashingEmbedder(dim=256))
+    (docs / "b.txt").write_text("Beta talks about BM25 scoring. " * 10, encoding="utf-8")
+    assert reopened.sync_directory(str(docs), workers=0)[:4] == (1, 0, 0, 0)
+    assert "BM25" in reopened.query("BM25 scoring", top_k=1, mode="lexical")[0]
+
+
+def test_open_without_embedder_for_non_hf_index_raises(sample_txt_file, tmp_path):
+    from ragkitpy.embedder import HashingEmbedder
+
+    rag = RAGPipeline(chunk_size=200, overlap=20, embedder=HashingEmbedder(dim=256))
+    rag.load_document(sample_txt_file)
+    rag.save(str(tmp_path))
+    with pytest.raises(ValueError, match="embedder"):
+        RAGPipeline.open(str(tmp_path))
+    assert RAGPipeline.open(str(tmp_path), embedder=HashingEmbedder(dim=256)).query("FAISS", top_k=1)
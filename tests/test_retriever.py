@@ -0,0 +1,31 @@
+# tests/test_retriever.py
+import numpy as np
+from ragkitpy.retriever import chunk_neighbours, maximal_marginal_relevance, reciprocal_rank_fusion
+
+
+def test_rrf_rewards_agreement():
+    scores, ids = reciprocal_rank_fusion([np.array([1, 2, 3]), np.array([3, 1, 4])], k=60, top_k=4)
+    assert ids.tolist() == [1, 3, 2, 4]
+    assert scores[0] == 1 / 61 + 1 / 62
+
+
+def test_rrf_ignores_missing_results():
+    _, ids = reciprocal_rank_fusion([np.array([5, -1, -1]), np.array([], dtype=np.int64)])
+    assert ids.tolist() == [5]
+
+
+def test_mmr_trades_relevance_for_diversity():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([[1.0, 0.1, 0.0], [1.0, 0.12, 0.0], [0.7, 0.0, 0.7]])
+    assert maximal_marginal_relevance(query, candidates, top_k=2, diversity=0.0).tolist() == [0, 1]
+    assert maximal_marginal_relevance(query, candidates, top_k=2, diversity=0.5).tolist() == [0, 2]
+
+
+def test_mmr_drops_excluded_neighbours():
+    doc_ids = np.array([0, 0, 0, 1])
+    spans = np.array([[0, 100], [90, 190], [300, 400], [0, 100]])
+    neighbours = chunk_neighbours(doc_ids, spans)
+    assert neighbours(0).tolist() == [True, True, False, False]
+    candidates = np.eye(4)[[0, 1, 2, 3]] + 1.0
+    picked = maximal_marginal_relevance(np.ones(4), candidates, top_k=4, diversity=0.0, exclude=neighbours)
+    assert len(picked) == 3 and not {0, 1} <= set(picked.tolist())
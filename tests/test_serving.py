@@ -0,0 +1,144 @@
+# tests/test_serving.py
+import asyncio
+import pytest
+import numpy as np
+from ragkitpy.serving import AsyncRAGPipeline
+from ragkitpy.vectorstore import VectorStore
+
+
+class OneHotEmbedder:
+    """Maps "q<i>" to the i-th basis vector and records every batch size."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def embed(self, texts):
+        self.batch_sizes.append(len(texts))
+        return np.eye(8, dtype=np.float32)[[int(t[1:]) for t in texts]]
+
+
+class LoadedPipeline:
+    """Stand-in for a RAGPipeline with documents loaded."""
+
+    def __init__(self):
+        self.embedder = OneHotEmbedder()
+        self.store = VectorStore(dim=8, metric="cosine")
+        self.store.add(np.eye(8, dtype=np.float32), [f"chunk {i}" for i in range(8)])
+        self.is_ready = True
+
+    def _check_model(self):
+        pass
+
+
+def test_concurrent_queries_share_one_batch():
+    pipeline = LoadedPipeline()
+
+    async def main():
+        async with AsyncRAGPipeline(pipeline, max_batch_size=8, max_wait_ms=50) as server:
+            answers = await asyncio.gather(*(server.query(f"q{i}", top_k=1) for i in range(8)))
+            return answers, server.stats
+
+    answers, stats = asyncio.run(main())
+    assert answers == [[f"chunk {i}"] for i in range(8)]
+    assert pipeline.embedder.batch_sizes == [8]
+    assert (stats.queries, stats.batches, stats.max_batch_size) == (8, 1, 8)
+    assert stats.queue_depth == 0 and stats.max_queue_depth == 8
+
+
+def test_batches_respect_max_size_and_per_query_options():
+    pipeline = LoadedPipeline()
+
+    async def main():
+        async with AsyncRAGPipeline(pipeline, max_batch_size=3, max_wait_ms=0) as server:
+            return await asyncio.gather(
+                server.query_with_scores("q0", top_k=2, min_score=0.5),
+                server.query("q1", top_k=3),
+                server.query("q2", mode="hybrid"),
+                server.query("chunk 5", top_k=1, mode="lexical"),
+            )
+
+    best, top3, hybrid, lexical = asyncio.run(main())
+    assert best == [("chunk 0", pytest.approx(1.0))]
+    assert len(top3) == 3
+    assert hybrid[0] == "chunk 2"
+    assert lexical == ["chunk 5"]
+    assert max(pipeline.embedder.batch_sizes) <= 3
+
+
+def test_invalid_queries_fail_fast():
+    async def main():
+        async with AsyncRAGPipeline(LoadedPipeline()) as server:
+            with pytest.raises(ValueError):
+                await server.query("  ")
+            with pytest.raises(ValueError):
+                await server.query("q0", mode="fuzzy")
+
+    asyncio.run(main())
+
+
+def test_filters_apply_per_query_within_a_batch():
+    pipeline = LoadedPipeline()
+    pipeline.store = VectorStore(dim=8, metric="cosine")
+    pipeline.store.add(np.eye(8, dtype=np.float32), [f"chunk {i}" for i in range(8)],
+                       metadata={"parity": ["even", "odd"] * 4})
+
+    async def main():
+        async with AsyncRAGPipeline(pipeline, max_batch_size=8, max_wait_ms=50) as server:
+            return await asyncio.gather(
+                server.query("q0", top_k=1, where={"parity": "odd"}),
+                server.query("q0", top_k=1),
+                server.query("q0", top_k=1, where={"parity": {"$bad": 1}}),
+                return_exceptions=True,
+            )
+
+    odd, unfiltered, invalid = asyncio.run(main())
+    assert odd[0] in {f"chunk {i}" for i in (1, 3, 5, 7)}
+    assert unfiltered == ["chunk 0"]
+    assert isinstance(invalid, ValueError)
+
+
+def test_filters_keep_value_types_apart():
+    import datetime
+
+    pipeline = LoadedPipeline()
+    day = datetime.date(2024, 5, 1)
+    pipeline.store = VectorStore(dim=8, metric="cosine")
+    pipeline.store.add(np.eye(8, dtype=np.float32), [f"chunk {i}" for i in range(8)],
+                       metadata={"day": [day] * 4 + [None] * 4, "label": [None] * 4 + [day.isoformat()] * 4})
+
+    async def main():
+        async with AsyncRAGPipeline(pipeline, max_batch_size=8, max_wait_ms=50) as server:
+            return await asyncio.gather(
+                server.query("q0", top_k=8, where={"label": day.isoformat()}),
+                server.query("q0", top_k=8, where={"label": day}),
+                return_exceptions=True,
+            )
+
+    as_string, as_date = asyncio.run(main())
+    assert sorted(as_string) == [f"chunk {i}" for i in range(4, 8)]
+    assert isinstance(as_date, ValueError)   # Not merged with the string filter: a date can't match strings
+
+
+def test_index_is_loaded_off_the_event_loop():
+    import threading
+
+    class LazyPipeline(LoadedPipeline):
+        checked_on = []
+
+        @property
+        def is_ready(self):
+            self.checked_on.append(threading.current_thread())
+            return True
+
+        @is_ready.setter
+        def is_ready(self, value):
+            pass
+
+    pipeline = LazyPipeline()
+
+    async def main():
+        async with AsyncRAGPipeline(pipeline) as server:
+            return await server.query("q3", top_k=1)
+
+    assert asyncio.run(main()) == ["chunk 3"]
+    assert pipeline.checked_on and threading.main_thread() not in pipeline.checked_on
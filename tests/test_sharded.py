@@ -0,0 +1,60 @@
+# tests/test_sharded.py
+import pytest
+import numpy as np
+from ragkitpy.sharded import ShardedVectorStore
+from ragkitpy.vectorstore import VectorStore
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((200, 16)).astype(np.float32), [f"chunk {i}" for i in range(200)]
+
+
+def test_add_spreads_rows_across_shards(corpus):
+    embeddings, chunks = corpus
+    store = ShardedVectorStore(dim=16, n_shards=4)
+    store.add(embeddings[:101], chunks[:101])
+    store.add(embeddings[101:], chunks[101:])
+    assert [shard.total_chunks for shard in store.shards] == [50, 50, 50, 50]
+    assert store.total_chunks == 200
+
+
+@pytest.mark.parametrize("metric", ["l2", "cosine"])
+def test_sharded_search_matches_single_store(corpus, metric):
+    embeddings, chunks = corpus
+    single = VectorStore(dim=16, metric=metric)
+    single.add(embeddings, chunks)
+    sharded = ShardedVectorStore(dim=16, n_shards=3, metric=metric)
+    sharded.add(embeddings, chunks)
+
+    queries = embeddings[:5] + 0.1
+    for expected, got in zip(single.search_batch(queries, top_k=7), sharded.search_batch(queries, top_k=7)):
+        assert [c for c, _ in got] == [c for c, _ in expected]
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in expected], rtol=1e-5)
+
+
+def test_served_by_worker_processes(corpus, tmp_path):
+    embeddings, chunks = corpus
+    store = ShardedVectorStore(dim=16, n_shards=4)
+    store.add(embeddings, chunks, metadata={"bucket": [i % 10 for i in range(200)]})
+    store.save(str(tmp_path))
+    expected = store.search_with_scores(embeddings[3], top_k=5)
+    filtered = store.search(embeddings[3], top_k=5, where={"bucket": 4})
+    assert len(filtered) == 5 and all(int(c.split()[1]) % 10 == 4 for c in filtered)
+
+    with ShardedVectorStore.load(str(tmp_path), workers=2) as served:
+        assert served.total_chunks == 200
+        assert served.search_with_scores(embeddings[3], top_k=5) == expected
+        assert served.search(embeddings[3], top_k=5, where={"bucket": 4}) == filtered
+        with pytest.raises(RuntimeError):
+            served.add(embeddings[:1], ["new"])
+
+
+def test_load_rejects_plain_index(corpus, tmp_path):
+    embeddings, chunks = corpus
+    plain = VectorStore(dim=16)
+    plain.add(embeddings, chunks)
+    plain.save(str(tmp_path))
+    with pytest.raises(ValueError):
+        ShardedVectorStore.load(str(tmp_path))
@@ -0,0 +1,36 @@
+# tests/test_startup.py
+import subprocess
+import sys
+
+# Generous for slow CI machines; a cold "import torch" alone takes seconds
+IMPORT_BUDGET_SECONDS = 1.0
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "faiss", "pypdf")
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_import_ragkitpy_is_fast():
+    elapsed = float(run_python(
+        "import time; t = time.perf_counter(); import ragkitpy; print(time.perf_counter() - t)"
+    ))
+    assert elapsed < IMPORT_BUDGET_SECONDS
+
+
+def test_chunker_and_loader_do_not_import_heavy_modules():
+    loaded = run_python(
+        "import sys, ragkitpy; from ragkitpy import chunk_text, load_file, RAGPipeline; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    assert loaded == "[]"
+
+
+def test_pipeline_construction_defers_model_and_faiss():
+    loaded = run_python(
+        "import sys; from ragkitpy import RAGPipeline; rag = RAGPipeline(); "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules], rag.embedder.is_loaded)"
+    )
+    assert loaded == "[] False"
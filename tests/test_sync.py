@@ -0,0 +1,46 @@
+# tests/test_sync.py
+import os
+
+from ragkitpy.sync import plan_sync, read_sync_manifest, scan_tree, write_sync_manifest
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_scan_tree_matches_patterns_recursively(tmp_path):
+    write(tmp_path / "a.txt", "a")
+    nested = write(tmp_path / "x" / "y" / "b.pdf", "b")
+    write(tmp_path / "notes.md", "c")
+    found = scan_tree(str(tmp_path))
+    assert sorted(found) == [str(tmp_path / "a.txt"), nested]
+    assert found[nested][0] == 1
+
+
+def test_plan_sync_detects_added_changed_removed_and_touched(tmp_path):
+    a = write(tmp_path / "a.txt", "alpha")
+    b = write(tmp_path / "sub" / "b.txt", "beta")
+    c = write(tmp_path / "c.txt", "gamma")
+    first = plan_sync(str(tmp_path), {})
+    assert first.added == sorted([a, b, c]) and first.unchanged == 0
+
+    known = dict(first.states)
+    write(tmp_path / "a.txt", "alpha, edited")
+    os.utime(c, ns=(0, 0))   # Touched only
+    os.remove(b)
+    d = write(tmp_path / "d.txt", "delta")
+    second = plan_sync(str(tmp_path), known)
+    assert (second.added, second.changed, second.removed, second.unchanged) == ([d], [a], [b], 1)
+    assert second.states[c].mtime_ns == 0
+
+
+def test_manifest_roundtrip_and_other_roots_untouched(tmp_path):
+    write(tmp_path / "docs" / "a.txt", "alpha")
+    known = plan_sync(str(tmp_path / "docs"), {}).states
+    known[str(tmp_path / "elsewhere" / "z.txt")] = known[str(tmp_path / "docs" / "a.txt")]
+    path = str(tmp_path / "sync.json")
+    write_sync_manifest(path, known)
+    assert read_sync_manifest(path) == known
+    assert plan_sync(str(tmp_path / "docs"), known).removed == []
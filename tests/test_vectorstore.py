@@ -53,4 +53,426 @@ def test_mismatch_raises():
     embeddings = np.zeros((3, 4), dtype=np.float32)
     chunks = ["only one chunk"]               # Mismatch: 3 embeddings, 1 chunk
     with pytest.raises(ValueError):
-        store.add(embeddings, chunks)
\ No newline at end of file
+        store.add(embeddings, chunks)
+
+
+def test_save_and_load_roundtrip(sample_store, tmp_path):
+    sample_store.save(str(tmp_path), metadata={"model_name": "test-model"})
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.total_chunks == 3
+    query = np.array([[0.0, 1.0, 0.0, 0.0]], dtype=np.float32)
+    assert loaded.search(query, top_k=1) == ["chunk about RAG"]
+
+
+def test_add_after_load(sample_store, tmp_path):
+    sample_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    loaded.add(np.array([[0.0, 0.0, 0.0, 1.0]], dtype=np.float32), ["chunk about FAISS"])
+    query = np.array([[0.0, 0.0, 0.0, 1.0]], dtype=np.float32)
+    assert loaded.search(query, top_k=1) == ["chunk about FAISS"]
+
+    # Saving back into the same directory must not corrupt the mapped chunks
+    loaded.save(str(tmp_path))
+    assert list(VectorStore.load(str(tmp_path)).chunks)[-1] == "chunk about FAISS"
+
+
+def test_load_missing_directory_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        VectorStore.load(str(tmp_path / "missing"))
+
+
+def test_search_with_provenance():
+    store = VectorStore(dim=4)
+    doc_a = store.add_source("a.txt")
+    doc_b = store.add_source("b.txt")
+    store.add(np.eye(4, dtype=np.float32)[:2], ["from a", "from b"],
+              doc_ids=[doc_a, doc_b], offsets=[(0, 6), (10, 16)])
+    results = store.search_with_provenance(np.array([0.0, 1.0, 0.0, 0.0]), top_k=1)
+    assert results[0].chunk == "from b"
+    assert results[0].source == "b.txt"
+    assert (results[0].start, results[0].end) == (10, 16)
+
+
+def test_unknown_doc_id_raises():
+    store = VectorStore(dim=4)
+    with pytest.raises(ValueError):
+        store.add(np.zeros((1, 4), dtype=np.float32), ["orphan"], doc_ids=[0])
+
+
+def test_search_batch_matches_single_searches(sample_store):
+    queries = np.eye(4, dtype=np.float32)[:3]
+    batch = sample_store.search_batch(queries, top_k=2)
+    assert len(batch) == 3
+    for query, hits in zip(queries, batch):
+        assert hits == sample_store.search_with_scores(query, top_k=2)
+
+
+def test_search_batch_on_loaded_store(sample_store, tmp_path):
+    sample_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    batch = loaded.search_batch(np.eye(4, dtype=np.float32)[:3], top_k=1)
+    assert [hits[0][0] for hits in batch] == list(sample_store.chunks)
+
+
+def test_search_batch_wrong_dim_raises(sample_store):
+    with pytest.raises(ValueError):
+        sample_store.search_batch(np.zeros((2, 3), dtype=np.float32))
+
+
+@pytest.fixture(scope="module")
+def random_vectors():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((1000, 16)).astype(np.float32)
+
+
+def test_unknown_index_type_raises():
+    with pytest.raises(ValueError):
+        VectorStore(dim=4, index_type="annoy")
+
+
+def test_ivf_falls_back_to_flat_until_trained(random_vectors):
+    store = VectorStore(dim=16, index_type="ivf_flat", nlist=8)   # trains at 312 vectors
+    store.add(random_vectors[:100], [str(i) for i in range(100)])
+    assert store.is_trained is False
+    assert store.search(random_vectors[5], top_k=1) == ["5"]
+
+    store.add(random_vectors[100:], [str(i) for i in range(100, 1000)])
+    assert store.is_trained is True
+    assert store.total_chunks == 1000
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw"])
+def test_recall_against_flat(random_vectors, index_type):
+    store = VectorStore(dim=16, index_type=index_type, nlist=8, nprobe=8)
+    store.add(random_vectors, [str(i) for i in range(1000)])
+    # nprobe == nlist visits every cluster, so IVF is exact here
+    assert store.evaluate_recall(random_vectors[:20], top_k=5) >= 0.9
+
+
+def test_index_type_survives_save_and_load(random_vectors, tmp_path):
+    store = VectorStore(dim=16, index_type="hnsw", ef_search=32)
+    store.add(random_vectors[:50], [str(i) for i in range(50)])
+    store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.index_type == "hnsw" and loaded.ef_search == 32
+    assert loaded.search(random_vectors[7], top_k=1) == ["7"]
+
+
+def test_cosine_scores_are_bounded_similarities():
+    store = VectorStore(dim=4, metric="cosine")
+    store.add(np.array([[3.0, 0.0, 0.0, 0.0], [1.0, 1.0, 0.0, 0.0]]), ["x axis", "diagonal"])
+    results = store.search_with_scores(np.array([10.0, 0.0, 0.0, 0.0]), top_k=2)
+    assert results[0][0] == "x axis"
+    assert results[0][1] == pytest.approx(1.0)
+    assert results[1][1] == pytest.approx(2 ** -0.5)
+
+
+def test_min_score_cuts_off_results():
+    store = VectorStore(dim=4, metric="cosine")
+    store.add(np.eye(4, dtype=np.float32)[:3], ["a", "b", "c"])
+    query = np.array([1.0, 0.2, 0.0, 0.0])
+    assert store.search(query, top_k=3, min_score=0.5) == ["a"]
+    assert store.search_batch(np.stack([query, -query]), top_k=3, min_score=0.5) == [
+        [("a", pytest.approx(0.98, abs=0.01))], []
+    ]
+
+
+def test_min_score_with_l2_raises(sample_store):
+    with pytest.raises(ValueError):
+        sample_store.search(np.array([1.0, 0.0, 0.0, 0.0]), min_score=0.5)
+
+
+def test_metric_survives_save_and_load(tmp_path):
+    store = VectorStore(dim=4, metric="ip")
+    store.add(np.eye(4, dtype=np.float32), ["a", "b", "c", "d"])
+    store.save(str(tmp_path))
+    assert VectorStore.load(str(tmp_path)).metric == "ip"
+
+
+@pytest.fixture
+def two_doc_store():
+    store = VectorStore(dim=4, compact_threshold=0.9)
+    doc_a, doc_b = store.add_source("a.txt"), store.add_source("b.txt")
+    store.add(np.eye(4, dtype=np.float32), ["a0", "a1", "b0", "b1"], doc_ids=[doc_a, doc_a, doc_b, doc_b])
+    return store
+
+
+def test_remove_document_hides_chunks(two_doc_store):
+    assert two_doc_store.remove_document(0) == 2
+    assert two_doc_store.total_chunks == 2
+    assert two_doc_store.sources == [None, "b.txt"]
+    results = two_doc_store.search(np.array([1.0, 0.0, 0.0, 0.0]), top_k=4)
+    assert sorted(results) == ["b0", "b1"]
+
+
+def test_compact_keeps_chunk_ids(two_doc_store):
+    query = np.array([0.0, 0.0, 0.0, 1.0])
+    chunk_id = two_doc_store.search_with_provenance(query, top_k=1)[0].chunk_id
+    two_doc_store.remove_document(0)
+    assert two_doc_store.compact() == 2
+    assert two_doc_store.index.ntotal == 2
+    top = two_doc_store.search_with_provenance(query, top_k=1)[0]
+    assert (top.chunk, top.chunk_id) == ("b1", chunk_id)
+
+
+def test_auto_compact_past_threshold():
+    store = VectorStore(dim=4, compact_threshold=0.25)
+    doc = store.add_source("a.txt")
+    store.add(np.eye(4, dtype=np.float32)[:2], ["a0", "a1"], doc_ids=[doc, doc])
+    store.add(np.eye(4, dtype=np.float32)[2:], ["x", "y"])
+    store.remove_document(doc)
+    assert store.tombstone_ratio == 0.0
+    assert store.index.ntotal == 2
+
+
+def test_tombstones_survive_save_and_load(two_doc_store, tmp_path):
+    two_doc_store.remove_document(1)
+    two_doc_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.total_chunks == 2
+    assert sorted(loaded.search(np.array([0.0, 0.0, 1.0, 0.0]), top_k=4)) == ["a0", "a1"]
+    loaded.compact()
+    assert loaded.chunks.take(np.arange(2)) == ["a0", "a1"]
+
+
+def test_search_hybrid_finds_exact_identifier(sample_store):
+    # Dense side prefers "python"; the keyword side finds the exact term
+    query = np.array([1.0, 0.0, 0.0, 0.0])
+    hybrid = sample_store.search_hybrid(query, "embeddings", top_k=2)
+    assert {r.chunk for r in hybrid} == {"chunk about python", "chunk about embeddings"}
+    assert sample_store.search_lexical("embeddings", top_k=3)[0].chunk == "chunk about embeddings"
+
+
+def test_lexical_index_follows_remove_compact_and_load(two_doc_store, tmp_path):
+    two_doc_store.remove_document(0)
+    assert [r.chunk for r in two_doc_store.search_lexical("a0 b0", top_k=3)] == ["b0"]
+    two_doc_store.compact()
+    two_doc_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert [r.chunk for r in loaded.search_lexical("b1", top_k=3)] == ["b1"]
+
+
+def test_bulk_write_publishes_on_exit():
+    store = VectorStore(dim=4)
+    with store.bulk_write():
+        store.add(np.eye(4, dtype=np.float32), ["a", "b", "c", "d"])
+        assert store.total_chunks == 0          # Not visible to searches yet
+    assert store.total_chunks == 4
+    assert store.search(np.array([0.0, 1.0, 0.0, 0.0]), top_k=1) == ["b"]
+
+
+def test_searches_stay_consistent_during_writes():
+    import threading
+
+    store = VectorStore(dim=8, compact_threshold=0.2)
+    rng = np.random.default_rng(0)
+    first = store.add_source("seed")
+    store.add(rng.standard_normal((50, 8)), [f"c{i}" for i in range(50)], doc_ids=[first] * 50)
+    errors, done = [], threading.Event()
+
+    def reader():
+        queries = np.random.default_rng()
+        try:
+            while not done.is_set():
+                for r in store.search_with_provenance(queries.standard_normal(8), top_k=10):
+                    assert r.chunk == f"c{r.chunk_id}" and r.source is not None
+        except Exception as error:   # Surface failures from the thread
+            errors.append(error)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    next_id = 50
+    for _ in range(30):
+        doc = store.add_source("doc")
+        store.add(rng.standard_normal((20, 8)), [f"c{i}" for i in range(next_id, next_id + 20)],
+                  doc_ids=[doc] * 20)
+        next_id += 20
+        store.remove_document(doc - 1)
+    done.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_load_mmap_then_write(sample_store, tmp_path):
+    sample_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path), mmap=True)
+    assert loaded.search(np.array([0.0, 1.0, 0.0, 0.0]), top_k=1) == ["chunk about RAG"]
+    loaded.add(np.array([[0.0, 0.0, 0.0, 1.0]]), ["chunk about FAISS"])
+    assert loaded.search(np.array([0.0, 0.0, 0.0, 1.0]), top_k=1) == ["chunk about FAISS"]
+
+
+def test_overlapping_chunks_share_stored_text(tmp_path):
+    from ragkitpy.chunker import chunk_text_with_offsets
+
+    text = "Überblick: " + " ".join(f"wörd{i}" for i in range(400))
+    pieces = chunk_text_with_offsets(text, chunk_size=120, overlap=40)
+    store = VectorStore(dim=4)
+    doc = store.add_source("doc.txt")
+    vectors = np.random.default_rng(0).random((len(pieces), 4), dtype=np.float32)
+    store.add(vectors, [p.text for p in pieces], doc_ids=[doc] * len(pieces),
+              offsets=[(p.start, p.end) for p in pieces])
+
+    assert store.chunks.nbytes == len(text.encode("utf-8"))
+    assert list(store.chunks) == [p.text for p in pieces]
+    store.save(str(tmp_path))
+    assert list(VectorStore.load(str(tmp_path)).chunks) == [p.text for p in pieces]
+
+
+def test_save_after_compact_drops_removed_text(two_doc_store, tmp_path):
+    two_doc_store.remove_document(0)
+    two_doc_store.compact()
+    two_doc_store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.chunks.nbytes == len("b0b1")
+    loaded.add(np.eye(4, dtype=np.float32)[:1], ["new"])
+    assert list(loaded.chunks) == ["b0", "b1", "new"]
+
+
+def test_compact_frees_removed_text_in_memory(tmp_path):
+    from ragkitpy.chunker import chunk_text_with_offsets
+
+    store = VectorStore(dim=4, compact_threshold=0.9)
+    texts = {name: f"{name}: " + " ".join(f"{name}{i}" for i in range(300)) for name in ("keep", "drop")}
+    for name, text in texts.items():
+        pieces = chunk_text_with_offsets(text, chunk_size=120, overlap=40)
+        doc = store.add_source(name)
+        store.add(np.random.default_rng(0).random((len(pieces), 4)), [p.text for p in pieces],
+                  doc_ids=[doc] * len(pieces), offsets=[(p.start, p.end) for p in pieces])
+    kept = [chunk for chunk in store.chunks if chunk.startswith("keep") or " keep" in chunk]
+
+    store.remove_document(1)
+    store.compact()
+    assert store.chunks.nbytes == len(texts["keep"].encode("utf-8"))   # Overlaps still shared
+    assert list(store.chunks) == kept
+
+    store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    doc = loaded.add_source("new")
+    loaded.add(np.eye(4, dtype=np.float32)[:2], ["gone", "stays"], doc_ids=[doc, -1])
+    loaded.remove_document(doc)
+    loaded.compact()
+    assert loaded.chunks.nbytes == len(texts["keep"].encode("utf-8")) + len("stays")
+    assert list(loaded.chunks) == kept + ["stays"]
+
+
+def test_sq8_rescoring_matches_flat_and_survives_save_and_load(random_vectors, tmp_path):
+    corpus, queries = random_vectors, random_vectors[:50] + 0.1
+    store = VectorStore(dim=corpus.shape[1], index_type="sq8", rescore=4)
+    store.add(corpus, [str(i) for i in range(len(corpus))])
+    assert store.is_trained
+    assert store.bytes_per_vector() < corpus.shape[1] * 4 / 3
+    assert store.evaluate_recall(queries, top_k=10) == 1.0
+
+    store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.evaluate_recall(queries, top_k=10) == 1.0
+    exact = np.argsort(((corpus - queries[0]) ** 2).sum(axis=1))[0]
+    assert loaded.search(queries[0], top_k=1) == [str(exact)]
+
+
+def test_rescoring_vectors_follow_compact():
+    store = VectorStore(dim=4, index_type="fp16", rescore=2, compact_threshold=0.9)
+    doc_a, doc_b = store.add_source("a.txt"), store.add_source("b.txt")
+    store.add(np.eye(4, dtype=np.float32), ["a0", "a1", "b0", "b1"], doc_ids=[doc_a, doc_a, doc_b, doc_b])
+    store.remove_document(doc_a)
+    store.compact()
+    assert store.search(np.array([0.0, 0.0, 0.0, 1.0]), top_k=2) == ["b1", "b0"]
+
+
+def test_quantization_report(random_vectors):
+    from ragkitpy.vectorstore import quantization_report
+
+    report = quantization_report(random_vectors, random_vectors[:20], index_types=("flat", "fp16"))
+    assert [row["index_type"] for row in report] == ["flat", "fp16"]
+    assert report[0]["recall"] == 1.0
+    assert report[1]["bytes_per_vector"] < report[0]["bytes_per_vector"]
+
+
+@pytest.mark.parametrize("index_type,exact_rows", [("flat", 1024), ("flat", 0), ("hnsw", 16384)])
+def test_filtered_search_returns_top_k_from_matching_rows(random_vectors, monkeypatch, index_type, exact_rows):
+    import ragkitpy.vectorstore as vectorstore
+
+    # exact_rows=0 forces the FAISS ID-selector path instead of exact search over the matches
+    monkeypatch.setattr(vectorstore, "_EXACT_FILTER_ROWS", exact_rows)
+    n = len(random_vectors)
+    store = VectorStore(dim=random_vectors.shape[1], index_type=index_type)
+    store.add(random_vectors, [str(i) for i in range(n)], metadata={
+        "tenant": [f"t{i % 100}" for i in range(n)],
+        "year": [2000 + i % 25 for i in range(n)],
+    })
+    query = random_vectors[0] + 0.1
+
+    rows = np.arange(n)[np.arange(n) % 100 == 7]
+    exact = rows[np.argsort(((random_vectors[rows] - query) ** 2).sum(axis=1))[:3]]
+    assert store.search(query, top_k=3, where={"tenant": "t7"}) == [str(i) for i in exact]
+    assert all(int(c) % 25 >= 20 for c in store.search(query, top_k=5, where={"year": {"$gte": 2020}}))
+    assert store.search(query, where={"tenant": "nobody"}) == []
+    assert [r.chunk for r in store.search_lexical("7", where={"tenant": "t8"})] == []
+
+
+def test_filters_survive_compact_save_and_load(tmp_path):
+    store = VectorStore(dim=4, compact_threshold=0.9)
+    doc_a, doc_b = store.add_source("a.txt"), store.add_source("b.txt")
+    store.add(np.eye(4, dtype=np.float32), ["a0", "a1", "b0", "b1"], doc_ids=[doc_a, doc_a, doc_b, doc_b],
+              metadata={"lang": ["en", "de", "en", "de"]})
+    query = np.ones(4, dtype=np.float32)
+    assert sorted(store.search(query, top_k=4, where={"source": "b.txt"})) == ["b0", "b1"]
+
+    store.remove_document(doc_a)
+    store.compact()
+    assert store.search(query, top_k=4, where={"lang": "en"}) == ["b0"]
+    store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.search(query, top_k=4, where={"lang": "de", "doc_id": doc_b}) == ["b1"]
+    loaded.add(np.eye(4, dtype=np.float32)[:1], ["new"], metadata={"lang": ["en"]})
+    assert sorted(loaded.search(query, top_k=4, where={"lang": "en"})) == ["b0", "new"]
+
+
+def test_search_diverse_skips_near_duplicates_and_overlaps():
+    store = VectorStore(dim=4, metric="cosine")
+    doc = store.add_source("a.txt")
+    vectors = np.array([[1, 0.1, 0, 0], [1, 0.12, 0, 0], [1, 0.11, 0, 0.01], [0.8, 0, 0.6, 0]], dtype=np.float32)
+    store.add(vectors, ["c0", "c1", "c2", "c3"], doc_ids=[doc] * 4,
+              offsets=[(0, 100), (500, 600), (590, 690), (1000, 1100)])
+    query = np.array([1, 0, 0, 0], dtype=np.float32)
+    assert [r.chunk for r in store.search_diverse(query, top_k=3, diversity=0.0)] == ["c0", "c2", "c3"]
+    assert [r.chunk for r in store.search_diverse(query, top_k=2, diversity=0.7)] == ["c0", "c3"]
+    assert len(store.search_diverse(query, top_k=4, diversity=0.0, collapse_adjacent=False)) == 4
+
+
+def test_pages_follow_compact_save_and_load(tmp_path):
+    store = VectorStore(dim=4)
+    doc_a, doc_b = store.add_source("a.pdf"), store.add_source("b.txt")
+    store.add(np.eye(4, dtype=np.float32), ["a1", "a7", "b0", "b1"], doc_ids=[doc_a, doc_a, doc_b, doc_b],
+              pages=[1, 7, -1, -1])
+    store.remove_document(doc_b)
+    store.compact()
+    store.save(str(tmp_path))
+    loaded = VectorStore.load(str(tmp_path))
+    results = loaded.search_with_provenance(np.array([0, 1, 0, 0], dtype=np.float32), top_k=2)
+    assert [(r.chunk, r.page) for r in results] == [("a7", 7), ("a1", 1)]
+    assert loaded.search(np.ones(4), top_k=4, where={"page": {"$gt": 1}}) == ["a7"]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "fp16"])
+def test_single_adds_append_without_copying_the_index(index_type):
+    rng = np.random.default_rng(0)
+    store = VectorStore(dim=8, index_type=index_type)
+    doc = store.add_source("doc")
+    store.add(rng.standard_normal((1000, 8)), [f"c{i}" for i in range(1000)], doc_ids=[doc] * 1000)
+    gone = store.add_source("gone")
+    store.add(rng.standard_normal((1, 8)), ["gone"], doc_ids=[gone])
+    store.remove_document(gone)   # Searches now skip the tombstone via a bitmap
+    indexes = set()
+    for i in range(200):
+        before = store._snapshot
+        vector = rng.standard_normal((1, 8))
+        store.add(vector, [f"new{i}"])
+        indexes.add(id(store.index))
+        # The old snapshot shares the index but never returns the new row
+        _, rows = store._search(before, vector, top_k=5)
+        assert rows.max() < before.n_rows
+        assert store.search(vector[0], top_k=1) == [f"new{i}"]
+    assert len(indexes) <= 2   # Copied only when the reserved capacity runs out